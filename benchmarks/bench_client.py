@@ -0,0 +1,161 @@
+"""
+Offline throughput benchmarks against the local FakeZerionServer, the
+client overhead is measured on a stubbed transport instead
+
+    python benchmarks/bench_client.py --records 20000 --latency 0.002
+"""
+import sys
+import time
+import asyncio
+import argparse
+import pathlib
+import warnings
+import statistics
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from zerionAPI import IFB, AsyncIFB
+from zerionAPI.testing import FakeZerionServer
+
+PROFILE_ID = 1
+PAGE_ID = 2
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def report(name, count, elapsed, unit='req'):
+    print(f'{name:<40} {count:>8} {unit:<7} {elapsed:>8.3f}s {count / elapsed:>12.1f} {unit}/s')
+
+
+def benchSequential(ifb, record_ids, n):
+    elapsed, _ = timed(lambda: [ifb.Records('GET', PROFILE_ID, PAGE_ID, record_ids[i % len(record_ids)]) for i in range(n)])
+    report('sequential GET', n, elapsed)
+
+
+class StubAdapter(HTTPAdapter):
+    """Answers every request in memory, so timings contain no network or server time"""
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        response._content = b'{"id": 1, "access_token": "stub"}'
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def benchOverhead(n, rounds=50):
+    """Median per-call cost of the client over a bare session.request, both on a stubbed transport
+
+    Each round times a batch of raw requests and a batch of client calls back
+    to back; the median of the paired differences is reported, clamped at zero.
+    """
+    ifb = IFB('bench', 'bench-key', 'bench-secret-for-the-offline-benchmark', {'base_url': 'http://stub.invalid', 'coalesce_requests': False})
+    session = ifb.getSession()
+    session.mount('http://', StubAdapter())
+    url = f'http://stub.invalid/exzact/api/v80/bench/profiles/{PROFILE_ID}/pages/{PAGE_ID}/records/1'
+    ifb.Records('GET', PROFILE_ID, PAGE_ID, 1)
+
+    batch = max(1, n // rounds)
+    raw, client = [], []
+    for _ in range(rounds):
+        elapsed, _ = timed(lambda: [session.request('GET', url, timeout=ifb.getTimeout()) for _ in range(batch)])
+        raw.append(elapsed / batch)
+        elapsed, _ = timed(lambda: [ifb.Records('GET', PROFILE_ID, PAGE_ID, 1) for _ in range(batch)])
+        client.append(elapsed / batch)
+
+    overhead = max(0.0, statistics.median(c - r for c, r in zip(client, raw)))
+    print(f'{"client overhead per call":<40} {overhead * 1e6:>8.1f} us (median of {rounds} rounds, client {statistics.median(client) * 1e6:.1f} us, raw session {statistics.median(raw) * 1e6:.1f} us)')
+
+
+def benchBatch(ifb, record_ids, n, workers):
+    args = [(PROFILE_ID, PAGE_ID, record_ids[i % len(record_ids)]) for i in range(n)]
+    elapsed, _ = timed(lambda: ifb.map_resource('GET', 'Records', args, max_workers=workers))
+    report(f'call_many GET ({workers} workers)', n, elapsed)
+
+
+def benchAsync(server, record_ids, n, concurrency):
+    async def run():
+        async with AsyncIFB('bench', 'bench-key', 'bench-secret-for-the-offline-benchmark', {'base_url': server.base_url, 'max_concurrency': concurrency}) as ifb:
+            await ifb.Profiles('GET')
+            start = time.perf_counter()
+            await asyncio.gather(*[ifb.Records('GET', PROFILE_ID, PAGE_ID, record_ids[i % len(record_ids)]) for i in range(n)])
+            return time.perf_counter() - start
+
+    try:
+        report(f'async GET (concurrency {concurrency})', n, asyncio.run(run()))
+    except ImportError as e:
+        print(f'{"async GET":<40} skipped: {e}')
+
+
+def benchExport(ifb, page_size):
+    def export():
+        records, offset = [], 0
+        while True:
+            result = ifb.Records('GET', PROFILE_ID, PAGE_ID, params={'fields': 'name,value', 'limit': str(page_size), 'offset': str(offset)})
+            if result.status_code != 200 or len(result.response) == 0:
+                return records
+            records += result.response
+            offset += len(result.response)
+
+    elapsed, records = timed(export)
+    report(f'bulk export (page size {page_size})', len(records), elapsed, 'records')
+
+
+def benchScan(ifb, page_size, workers):
+    elapsed, records = timed(lambda: list(ifb.iter_records(PROFILE_ID, PAGE_ID, fields='name,value', page_size=page_size)))
+    report(f'iter_records (page size {page_size})', len(records), elapsed, 'records')
+
+    elapsed, records = timed(lambda: list(ifb.scan_records(PROFILE_ID, PAGE_ID, fields='name,value', page_size=page_size, max_workers=workers)))
+    report(f'scan_records ({workers} workers)', len(records), elapsed, 'records')
+
+
+def benchImport(ifb, n, chunk_size):
+    rows = [{'name': f'import-{i}', 'value': i} for i in range(n)]
+    elapsed, _ = timed(lambda: [ifb.Records('POST', PROFILE_ID, 3, body=rows[i:i + chunk_size]) for i in range(0, n, chunk_size)])
+    report(f'bulk import (chunk size {chunk_size})', n, elapsed, 'records')
+
+    elapsed, _ = timed(lambda: ifb.bulk_create_records(PROFILE_ID, 4, rows, chunk_size=chunk_size // 10))
+    report(f'bulk_create_records (chunk size {chunk_size // 10})', n, elapsed, 'records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.002, help='simulated server latency in seconds')
+    parser.add_argument('--workers', type=int, default=32)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    with FakeZerionServer(latency=args.latency) as server:
+        record_ids = server.seed(f'profiles/{PROFILE_ID}/pages/{PAGE_ID}/records', [{'name': f'record-{i}', 'value': i} for i in range(args.records)])
+        ifb = IFB('bench', 'bench-key', 'bench-secret-for-the-offline-benchmark', {
+            'base_url': server.base_url,
+            'batch_workers': args.workers,
+            'coalesce_requests': False
+        })
+
+        print(f'{args.records} records, {args.latency * 1000:.1f} ms simulated latency\n')
+        benchSequential(ifb, record_ids, args.requests)
+        benchBatch(ifb, record_ids, args.requests, args.workers)
+        benchAsync(server, record_ids, args.requests, args.workers)
+
+        benchScan(ifb, 1000, args.workers)
+
+        server.latency = 0
+        benchExport(ifb, 1000)
+        benchImport(ifb, args.records, 1000)
+
+    benchOverhead(args.requests)
+
+
+if __name__ == '__main__':
+    main()
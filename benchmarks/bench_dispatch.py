@@ -0,0 +1,89 @@
+"""
+Per-call cost of building a resource request, with API.call stubbed out
+
+Compares the generated resource methods against the previous dispatch that
+looked up the method name with inspect and assembled the URL from the table
+on every call.
+
+    python benchmarks/bench_dispatch.py --calls 200000
+"""
+import sys
+import time
+import inspect
+import argparse
+import pathlib
+import urllib.parse
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from zerionAPI import IFB
+
+
+class StubbedIFB(IFB):
+    def __init__(self):
+        self._IFB__host = 'https://api.iformbuilder.com/exzact/api/v80/bench'
+
+    def call(self, method, resource, body=None):
+        return resource
+
+
+class LegacyIFB(StubbedIFB):
+    """The inspect based dispatch the resource methods used before they were generated"""
+    def __methodCheck(self, method, resource):
+        if method.upper() not in self._IFB__resources[resource]['Methods']:
+            raise ValueError(f'The "{method}" method is not allowed for {resource}')
+
+    def __getResourceURI(self, resource):
+        return self._IFB__resources[resource]['URI']
+
+    def __completeURI(self, resource, resource_id=None, params=None):
+        resource = f'{self._IFB__host}/{resource}'
+
+        if resource_id is not None:
+            resource += f'/{resource_id}'
+
+        if params is not None and len(params) > 0:
+            resource += '?'
+
+            for key in params:
+                if params[key] is not None:
+                    resource += f'{key}={urllib.parse.quote(params[key])}&'
+
+        return resource
+
+    def Records(self, method, profile_id, page_id, record_id=None, *, body=None, params={}):
+        resource = inspect.currentframe().f_code.co_name
+        self.__methodCheck(method, resource)
+        request = self.__getResourceURI(resource) % (profile_id, page_id)
+        request = self.__completeURI(request, record_id, params)
+        return self.call(method, request, body)
+
+
+def bench(name, fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f'{name:<40} {elapsed / n * 1e9:>8.0f} ns/call')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    legacy, generated = LegacyIFB(), StubbedIFB()
+    params = {'fields': 'id,name', 'limit': '100'}
+
+    for label, call in (
+        ('by id', lambda ifb: ifb.Records('GET', 1, 2, 3)),
+        ('with params', lambda ifb: ifb.Records('GET', 1, 2, params=params))
+    ):
+        before = bench(f'legacy dispatch, {label}', lambda: call(legacy), args.calls)
+        after = bench(f'generated method, {label}', lambda: call(generated), args.calls)
+        print(f'{"speedup":<40} {before / after:>8.2f}x\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Memory held by a list of record dicts compared with a RecordSet of the same records
+
+    python benchmarks/bench_recordset.py --records 200000
+"""
+import sys
+import json
+import argparse
+import pathlib
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from zerionAPI.recordset import RecordSet
+
+TYPES = {'id': 'int', 'score': 'float', 'visits': 'int'}
+
+
+def makeRecords(n):
+    # Decoded from JSON like API responses, so keys and values are not shared between records
+    return json.loads(json.dumps([
+        {'id': i, 'status': ('open', 'closed', 'pending')[i % 3], 'score': i / 7, 'visits': i % 50, 'inspector': f'user{i % 20}'}
+        for i in range(n)
+    ]))
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=200000)
+    args = parser.parse_args()
+
+    rows, _ = measure(lambda: makeRecords(args.records))
+    columns, _ = measure(lambda: RecordSet(makeRecords(args.records), TYPES))
+    print(f'{"list of dicts":<20} {rows / 2 ** 20:>8.1f} MiB')
+    print(f'{"RecordSet":<20} {columns / 2 ** 20:>8.1f} MiB')
+    print(f'{"reduction":<20} {rows / columns:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
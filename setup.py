@@ -21,5 +21,10 @@ setup(
       'requests',
       'pytest'
   ],
+  extras_require={
+      'async': ['aiohttp'],
+      'fast': ['orjson'],
+      'parquet': ['pyarrow']
+  },
   zip_safe=False
 )
\ No newline at end of file
@@ -0,0 +1,21 @@
+import pytest
+from zerionAPI import IFB
+from zerionAPI.testing import FakeZerionServer
+
+SECRET = 'fake-client-secret-long-enough-for-hs256'
+
+@pytest.fixture
+def server():
+    with FakeZerionServer() as server:
+        yield server
+
+@pytest.fixture
+def make_client(server):
+    """Build a client of client_class against the fake server, params are merged over its base_url"""
+    def make(client_class=IFB, **params):
+        return client_class('fake', 'fake-key', SECRET, dict(params, base_url=server.base_url))
+    return make
+
+@pytest.fixture
+def fake_ifb(make_client):
+    return make_client(batch_workers=4)
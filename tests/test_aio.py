@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from zerionAPI import IFB, AsyncIFB
+from zerionAPI.aio import getSyncHelpers
+
+aiohttp = pytest.importorskip('aiohttp')
+
+def test_resources(server, make_client):
+    ids = server.seed('profiles/1/pages/2/records', [{'name': f'r{i}'} for i in range(5)])
+
+    async def run():
+        async with make_client(AsyncIFB) as ifb:
+            created = await ifb.Records('POST', 1, 2, body={'name': 'new'})
+            results = await asyncio.gather(*[ifb.Records('GET', 1, 2, record_id) for record_id in ids])
+            return created, results
+
+    created, results = asyncio.run(run())
+    assert created.status_code == 201
+    assert [result.response['name'] for result in results] == [f'r{i}' for i in range(5)]
+
+def test_call_many(server, make_client):
+    ids = server.seed('profiles/1/pages/2/records', [{'name': f'r{i}'} for i in range(10)])
+
+    async def run():
+        async with make_client(AsyncIFB) as ifb:
+            return await ifb.map_resource('GET', 'Records', [(1, 2, record_id) for record_id in ids] + [(1, 2, 1)], max_workers=3)
+
+    results = asyncio.run(run())
+    assert [result.response['id'] for result in results[:-1]] == ids
+    assert results[-1].status_code == 404
+
+@pytest.mark.parametrize('name, args', [('iter_records', (1, 2)), ('bulk_create_records', (1, 2, [])), ('schema_index', (1,))])
+def test_sync_helpers_raise(make_client, name, args):
+    ifb = make_client(AsyncIFB)
+    with pytest.raises(TypeError, match=name):
+        getattr(ifb, name)(*args)
+
+def test_every_sync_helper_is_replaced(make_client):
+    helpers = getSyncHelpers(IFB)
+    assert {'iter_records', 'export_form_tree', 'sync_option_list'} <= set(helpers)
+    assert 'call_many' not in helpers and 'map_resource' not in helpers
+
+    ifb = make_client(AsyncIFB)
+    for name in helpers:
+        with pytest.raises(TypeError, match=name):
+            getattr(ifb, name)()
+
+def test_reused_across_event_loops(server, make_client):
+    ids = server.seed('profiles/1/pages/2/records', [{'name': 'r'}])
+    ifb = make_client(AsyncIFB, max_concurrency=2)
+
+    async def run():
+        results = await asyncio.gather(*[ifb.Records('GET', 1, 2, ids[0], params={'fields': f'name{i}'}) for i in range(5)])
+        return [result.status_code for result in results]
+
+    assert asyncio.run(run()) == [200] * 5
+    assert asyncio.run(run()) == [200] * 5
+    assert ifb.getLoopCount() == 1
+
+def test_exit_closes_only_own_pool(server, make_client):
+    async def run():
+        first, second = make_client(AsyncIFB), make_client(AsyncIFB)
+        async with second:
+            async with first:
+                await first.Profiles('GET')
+                await second.Profiles('GET')
+            assert first.getLoopCount() == 0
+            return (await second.Profiles('GET')).status_code
+
+    assert asyncio.run(run()) == 200
+
+def test_shared_session_is_not_closed(server, make_client):
+    async def run():
+        session = aiohttp.ClientSession()
+        async with make_client(AsyncIFB, aiohttp_session=session) as ifb:
+            await ifb.Profiles('GET')
+        closed = session.closed
+        await session.close()
+        return closed
+
+    assert asyncio.run(run()) is False
+
+def test_replay_on_401(server, make_client):
+    async def run():
+        async with make_client(AsyncIFB) as ifb:
+            await ifb.Profiles('GET')
+            server.tokens.clear()
+            return await ifb.Profiles('GET')
+
+    assert asyncio.run(run()).status_code == 200
+    assert len(server.tokens) == 1
@@ -0,0 +1,47 @@
+import time
+import threading
+import pytest
+
+class TrackedResource:
+    """Stands in for a resource method, records the highest number of concurrent calls"""
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, method, *args, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if args and args[0] == 'fail':
+                raise ValueError('failed job')
+            return (method, args, kwargs)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+def test_call_many_order_and_errors(make_client):
+    api = make_client()
+    api.Records = TrackedResource()
+    results = api.call_many([('GET', 'Records', (1, 2, i)) for i in range(5)] + [('GET', 'Records', ('fail',)), ('PUT', 'Records', (1, 2), {'a': 1}, {'fields': 'a'})])
+    assert results[:5] == [('GET', (1, 2, i), {}) for i in range(5)]
+    assert isinstance(results[5], ValueError)
+    assert results[6] == ('PUT', (1, 2), {'body': {'a': 1}, 'params': {'fields': 'a'}})
+
+def test_map_resource(make_client):
+    api = make_client()
+    api.Records = TrackedResource(0)
+    assert api.map_resource('GET', 'Records', [7, (1, 2)], params={'limit': '1'}) == [
+        ('GET', (7,), {'params': {'limit': '1'}}),
+        ('GET', (1, 2), {'params': {'limit': '1'}})
+    ]
+
+@pytest.mark.parametrize('params, max_workers, peak', [({}, 3, 3), ({'batch_workers': 4}, None, 4), ({'pool_maxsize': 2}, 8, 2)])
+def test_call_many_workers(make_client, params, max_workers, peak):
+    api = make_client(**params)
+    api.Records = TrackedResource()
+    api.map_resource('GET', 'Records', range(16), max_workers=max_workers)
+    assert api.Records.peak == peak
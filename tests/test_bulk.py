@@ -0,0 +1,52 @@
+from zerionAPI.bulk import iterChunks, getIdFilter, writeChunk, parseCreated, BulkReport, RecordResult
+
+RECORDS = 'profiles/1/pages/2/records'
+
+def test_iterChunks():
+    assert list(iterChunks(iter(range(5)), 2)) == [(0, [0, 1]), (2, [2, 3]), (4, [4])]
+    assert list(iterChunks([], 2)) == []
+
+def test_getIdFilter():
+    assert getIdFilter([1, 2]) == 'id((="1")|(="2"))'
+
+def test_bulk_create_update_delete(server, fake_ifb):
+    created = fake_ifb.bulk_create_records(1, 2, ({'name': f'r{i}'} for i in range(1050)), chunk_size=100)
+    assert created.ok and len(created) == 1050
+    collection = server.getCollection(RECORDS)
+    assert [collection[id]['name'] for id in created.getIds()] == [f'r{i}' for i in range(1050)]
+
+    ids = created.getIds()
+    updated = fake_ifb.bulk_update_records(1, 2, [{'id': id, 'name': 'changed'} for id in ids[:250]] + [{'id': 999999, 'name': 'x'}])
+    assert len(updated.getSucceeded()) == 250
+    assert [(r.index, r.error) for r in updated.getFailed()] == [(250, 'Not updated')]
+    assert collection[ids[0]]['name'] == 'changed'
+
+    deleted = fake_ifb.bulk_delete_records(1, 2, ids[:300], chunk_size=50)
+    assert deleted.ok
+    assert len(server.getCollection(RECORDS)) == 750
+
+class FakeResult:
+    def __init__(self, status_code, response):
+        self.status_code = status_code
+        self.response = response
+
+def test_failures_are_isolated():
+    def request(chunk):
+        if 'bad' in chunk:
+            return FakeResult(400, {'error': 'invalid'})
+        return FakeResult(201, [{'id': f'id-{value}'} for value in chunk])
+
+    chunk = ['a', 'b', 'bad', 'c', 'd']
+    report = BulkReport(writeChunk(request, parseCreated, 10, chunk))
+    assert report.getIds() == ['id-a', 'id-b', None, 'id-c', 'id-d']
+    assert [r.index for r in report.getFailed()] == [12]
+
+    report = BulkReport(writeChunk(request, parseCreated, 0, chunk, isolate_failures=False))
+    assert not report.ok and len(report.getFailed()) == 5
+
+def test_exceptions_fail_the_chunk():
+    def request(chunk):
+        raise ConnectionError('down')
+
+    results = writeChunk(request, parseCreated, 0, [1, 2])
+    assert all(isinstance(r, RecordResult) and 'down' in r.error for r in results)
@@ -0,0 +1,61 @@
+import time
+from types import SimpleNamespace
+from zerionAPI.cache import ResponseCache, getCollection
+
+HOST = 'https://api.iformbuilder.com/exzact/api/v80/myserver'
+
+def result(status_code, headers={}):
+    return SimpleNamespace(status_code=status_code, headers=headers, content=b'{}')
+
+def test_getCollection():
+    assert getCollection(f'{HOST}/profiles/1/pages/2/elements/3?fields=name') == 'elements'
+    assert getCollection(f'{HOST}/profiles/1/optionlists') == 'optionlists'
+
+def test_only_configured_resources():
+    cache = ResponseCache()
+    cache.store(f'{HOST}/profiles/1/pages/2/records', result(200))
+    assert cache.lookup(f'{HOST}/profiles/1/pages/2/records') == (None, False)
+
+def test_fresh_hit():
+    cache = ResponseCache()
+    url = f'{HOST}/profiles/1/pages/2'
+    stored = result(200)
+    assert cache.store(url, stored) is stored
+    entry, fresh = cache.lookup(url)
+    assert fresh and entry.result is stored
+
+def test_revalidation():
+    cache = ResponseCache(ttls={'pages': 0.01})
+    url = f'{HOST}/profiles/1/pages'
+    stored = result(200, {'ETag': '"v1"'})
+    cache.store(url, stored)
+    time.sleep(0.02)
+
+    entry, fresh = cache.lookup(url)
+    assert not fresh
+    assert cache.getValidators(entry) == {'If-None-Match': '"v1"'}
+    assert cache.store(url, result(304), entry) is stored
+    assert cache.lookup(url)[1]
+
+def test_expired_without_validators():
+    cache = ResponseCache(ttls={'pages': 0.01})
+    cache.store(f'{HOST}/profiles/1/pages', result(200))
+    time.sleep(0.02)
+    assert cache.lookup(f'{HOST}/profiles/1/pages') == (None, False)
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2)
+    for page_id in (1, 2):
+        cache.store(f'{HOST}/profiles/1/pages/{page_id}', result(200))
+    cache.lookup(f'{HOST}/profiles/1/pages/1')
+    cache.store(f'{HOST}/profiles/1/pages/3', result(200))
+    assert cache.lookup(f'{HOST}/profiles/1/pages/2')[0] is None
+    assert cache.lookup(f'{HOST}/profiles/1/pages/1')[0] is not None
+
+def test_invalidate():
+    cache = ResponseCache()
+    for path in ('profiles/1/pages', 'profiles/1/pages/2', 'profiles/1/pages/2/elements', 'profiles/10/pages'):
+        cache.store(f'{HOST}/{path}', result(200))
+    cache.invalidate(f'{HOST}/profiles/1/pages/2')
+    assert len(cache) == 1
+    assert cache.lookup(f'{HOST}/profiles/10/pages')[0] is not None
@@ -0,0 +1,108 @@
+import csv
+import gzip
+import json
+import pytest
+from zerionAPI.export import resolveFormTree
+
+def seedTree(server):
+    root, child, grandchild = server.seed('profiles/1/pages', [{'name': 'audit'}, {'name': 'audit rooms'}, {'name': 'room photos'}])
+    server.seed(f'profiles/1/pages/{root}/elements', [
+        {'name': 'site', 'data_type': 1},
+        {'name': 'note', 'data_type': 16},
+        {'name': 'rooms', 'data_type': 18, 'data_size': child}
+    ])
+    server.seed(f'profiles/1/pages/{child}/elements', [
+        {'name': 'room', 'data_type': 1},
+        {'name': 'photos', 'data_type': 18, 'data_size': grandchild}
+    ])
+    server.seed(f'profiles/1/pages/{grandchild}/elements', [{'name': 'photo', 'data_type': 11}])
+
+    audits = server.seed(f'profiles/1/pages/{root}/records', [{'site': f's{i}'} for i in range(3)])
+    rooms = server.seed(f'profiles/1/pages/{child}/records', [{'room': f'r{i}', 'parent_record_id': audits[i % 3], 'parent_page_id': root} for i in range(6)])
+    server.seed(f'profiles/1/pages/{grandchild}/records', [{'photo': f'p{i}.jpg', 'parent_record_id': rooms[i % 6], 'parent_page_id': child} for i in range(12)])
+    return root, child, grandchild
+
+def test_resolveFormTree(server, fake_ifb):
+    root, child, grandchild = seedTree(server)
+    tree = resolveFormTree(fake_ifb, 1, root)
+    assert [[node.page_id for node in level] for level in tree.getLevels()] == [[root], [child], [grandchild]]
+    assert tree.columns == ['site']
+    assert tree.children[0].children[0].parent.name == 'audit rooms'
+
+def test_export_form_tree(server, fake_ifb, tmp_path):
+    root, child, grandchild = seedTree(server)
+    counts = fake_ifb.export_form_tree(1, root, str(tmp_path), format='jsonl')
+    assert {path.rsplit('/', 1)[-1]: count for path, count in counts.items()} == {
+        f'audit_{root}.jsonl': 3, f'audit_rooms_{child}.jsonl': 6, f'room_photos_{grandchild}.jsonl': 12
+    }
+
+    rooms = [json.loads(line) for line in open(tmp_path / f'audit_rooms_{child}.jsonl')]
+    audits = {json.loads(line)['id'] for line in open(tmp_path / f'audit_{root}.jsonl')}
+    assert {room['parent_record_id'] for room in rooms} == audits
+    assert set(rooms[0]) == {'id', 'parent_record_id', 'parent_page_id', 'room'}
+
+    fake_ifb.export_form_tree(1, root, str(tmp_path), format='csv')
+    with open(tmp_path / f'room_photos_{grandchild}.csv', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ['id', 'parent_record_id', 'parent_page_id', 'photo'] and len(rows) == 12
+
+def test_same_named_subforms(server, fake_ifb, tmp_path):
+    root, first, second = server.seed('profiles/1/pages', [{'name': 'visit'}, {'name': 'photos'}, {'name': 'photos'}])
+    server.seed(f'profiles/1/pages/{root}/elements', [
+        {'name': 'before', 'data_type': 18, 'data_size': first},
+        {'name': 'after', 'data_type': 18, 'data_size': second}
+    ])
+    for page_id, count in ((first, 2), (second, 3)):
+        server.seed(f'profiles/1/pages/{page_id}/elements', [{'name': 'photo', 'data_type': 11}])
+        server.seed(f'profiles/1/pages/{page_id}/records', [{'photo': f'{page_id}-{i}.jpg'} for i in range(count)])
+
+    counts = fake_ifb.export_form_tree(1, root, str(tmp_path))
+    assert {path.rsplit('/', 1)[-1]: count for path, count in counts.items()} == {
+        f'visit_{root}.jsonl': 0, f'photos_{first}.jsonl': 2, f'photos_{second}.jsonl': 3
+    }
+
+def test_unknown_format(fake_ifb, tmp_path):
+    with pytest.raises(ValueError):
+        fake_ifb.export_form_tree(1, 1, str(tmp_path), format='xml')
+
+def seedPage(server):
+    page, = server.seed('profiles/1/pages', [{'name': 'visits'}])
+    server.seed(f'profiles/1/pages/{page}/elements', [
+        {'name': 'score', 'data_type': 2, 'sort_order': 2},
+        {'name': 'visitor', 'data_type': 1, 'sort_order': 1},
+        {'name': 'heading', 'data_type': 16, 'sort_order': 0}
+    ])
+    server.seed(f'profiles/1/pages/{page}/records', [{'visitor': f'v{i}', 'score': i} for i in range(2500)])
+    return page
+
+def test_export_records_csv_gzip(server, fake_ifb, tmp_path):
+    page = seedPage(server)
+    path = str(tmp_path / 'visits.csv.gz')
+    assert fake_ifb.export_records(1, page, path, page_size=1000) == 2500
+
+    with gzip.open(path, 'rt', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['id', 'visitor', 'score']
+    assert len(rows) == 2501 and rows[1][1:] == ['v0', '0']
+
+def test_export_records_transform(server, fake_ifb, tmp_path):
+    page = seedPage(server)
+    path = tmp_path / 'visits.jsonl'
+
+    def transform(record):
+        if record['score'] % 2:
+            return None
+        return {'id': record['id'], 'label': record['visitor'].upper()}
+
+    assert fake_ifb.export_records(1, page, str(path), fields='visitor,score(<"10")', transform=transform) == 5
+    assert [json.loads(line)['label'] for line in open(path)] == ['V0', 'V2', 'V4', 'V6', 'V8']
+
+def test_export_records_parquet(server, fake_ifb, tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    page = seedPage(server)
+    path = str(tmp_path / 'visits.parquet')
+    assert fake_ifb.export_records(1, page, path) == 2500
+
+    table = parquet.read_table(path)
+    assert table.column_names == ['id', 'visitor', 'score']
+    assert str(table.schema.field('score').type) == 'double'
@@ -0,0 +1,74 @@
+import pytest
+from zerionAPI import DFA, dfa_utilities
+from zerionAPI.cache import ResponseCache
+from zerionAPI.testing import parseFields
+
+def test_parseFields():
+    (name, sort, predicate), = parseFields('data_type((="11")|(="18"))')
+    assert name == 'data_type' and sort is None
+    assert predicate(11) and predicate('18') and not predicate(28)
+
+    (name, sort, predicate), = parseFields('id:<(>="5"&<"10")')
+    assert sort == '<'
+    assert predicate(5) and not predicate(10)
+
+    with pytest.raises(ValueError):
+        parseFields('id(>="5"):<')
+
+def test_token(fake_ifb):
+    assert fake_ifb.getAccessToken() is not None
+
+def test_pagination(server, fake_ifb):
+    server.seed('profiles/1/pages/2/records', [{'name': f'r{i}'} for i in range(150)])
+    result = fake_ifb.Records('GET', 1, 2, params={'fields': 'name', 'offset': '100'})
+    assert result.status_code == 200
+    assert result.headers['Total-Count'] == '150'
+    assert len(result.response) == 50
+
+def test_field_grammar(server, fake_ifb):
+    server.seed('profiles/1/pages/2/records', [{'name': f'r{i}', 'age': i} for i in range(20)])
+    result = fake_ifb.Records('GET', 1, 2, params={'fields': 'name,age:>(>="15")'})
+    assert [r['age'] for r in result.response] == [19, 18, 17, 16, 15]
+    assert fake_ifb.Records('GET', 1, 2, params={'fields': 'name,age(>="15"):>'}).status_code == 400
+
+def test_crud(fake_ifb):
+    record = fake_ifb.Records('POST', 1, 2, body={'name': 'new'}).response
+    assert fake_ifb.Records('PUT', 1, 2, record['id'], body={'name': 'changed'}).status_code == 200
+    assert fake_ifb.Records('GET', 1, 2, record['id']).response['name'] == 'changed'
+    assert fake_ifb.Records('DELETE', 1, 2, record['id']).status_code == 200
+    assert fake_ifb.Records('GET', 1, 2, record['id']).status_code == 404
+
+@pytest.mark.parametrize('options', [{'compress_requests': True}, {'stream_requests': True}, {'compress_requests': True, 'stream_requests': True}])
+def test_encoded_bodies(server, make_client, options):
+    ifb = make_client(compress_min_size=0, **options)
+    result = ifb.Records('POST', 1, 2, body=[{'name': f'r{i}'} for i in range(500)])
+    assert result.status_code == 201
+    assert len(server.getCollection('profiles/1/pages/2/records')) == 500
+
+def test_rate_limit_retry(server, make_client):
+    api = make_client(rate_limit_retry=True)
+    api.getAccessToken()
+    server.rate_limit_every = 2
+    assert all(api.Profiles('GET').status_code == 200 for _ in range(4))
+    assert api.getApiCount() > 4
+
+def test_cache_revalidation(server, make_client):
+    cache = ResponseCache(ttls={'pages': 0})
+    api = make_client(cache=cache)
+    server.seed('profiles/1/pages', [{'name': 'page'}])
+    first = api.Pages('GET', 1)
+    second = api.Pages('GET', 1)
+    assert first.response == second.response == [{'id': 1000, 'name': 'page'}]
+    assert len(cache) == 1
+
+def test_call_many(server, fake_ifb):
+    ids = server.seed('profiles/1/pages/2/records', [{'name': f'r{i}'} for i in range(20)])
+    results = fake_ifb.map_resource('GET', 'Records', [(1, 2, record_id) for record_id in ids] + [(1, 2, 1)])
+    assert [r.response['id'] for r in results[:-1]] == ids
+    assert results[-1].status_code == 404
+
+def test_dfa_copy(make_client):
+    dfa = make_client(DFA)
+    dataflow_id = dfa.Dataflows('POST', body={'name': 'original'}).response['_id']
+    assert dfa_utilities.copyDataflow(dfa, dataflow_id, 'copy') != dataflow_id
+    assert dfa_utilities.copyDataflow(dfa, dataflow_id, 'copy') == 'New Dataflow name is not available'
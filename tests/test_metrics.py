@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+from zerionAPI.metrics import Metrics, getEndpoint
+
+def result(status_code, content=b'[]'):
+    return SimpleNamespace(status_code=status_code, content=content)
+
+def test_getEndpoint():
+    url = 'https://api.iformbuilder.com/exzact/api/v80/myserver/profiles/123/pages/456/records?fields=id'
+    assert getEndpoint(url) == 'profiles/{id}/pages/{id}/records'
+    assert getEndpoint('https://dataflownode.zerionsoftware.com/zcrypt/v1.0/dataflows/5f3e9c2b8a1d4e0012345678') == 'dataflows/{id}'
+
+def test_snapshot():
+    metrics = Metrics()
+    url = 'https://api.iformbuilder.com/exzact/api/v80/myserver/profiles/1/users'
+    for latency in (0.1, 0.2, 0.3, 0.4):
+        metrics.onResponse('GET', url, result(200), latency, 0)
+    metrics.onResponse('GET', url, result(429), 0.05, 0)
+    metrics.onRetry('GET', url)
+
+    stats = metrics.snapshot()['profiles/{id}/users']['GET']
+    assert stats['count'] == 5
+    assert stats['rate_limited'] == 1
+    assert stats['retries'] == 1
+    assert stats['bytes_in'] == 10
+    assert stats['latency']['p50'] == 0.2
+    assert stats['latency']['max'] == 0.4
+
+def test_hooks():
+    calls = []
+    metrics = Metrics()
+    metrics.addRequestHook(lambda method, url, body: calls.append((method, url)))
+    metrics.addResponseHook(lambda method, url, result: calls.append(result.status_code))
+    metrics.onRequest('POST', 'https://example.com/profiles')
+    metrics.onResponse('POST', 'https://example.com/profiles', result(201), 0.1, 2)
+    assert calls == [('POST', 'https://example.com/profiles'), 201]
+
+def test_toPrometheus():
+    metrics = Metrics()
+    metrics.onResponse('GET', 'https://example.com/profiles/1', result(200), 0.07, 0)
+    text = metrics.toPrometheus()
+    assert 'zerion_requests_total{method="GET",endpoint="profiles/{id}"} 1' in text
+    assert 'zerion_request_duration_seconds_bucket{method="GET",endpoint="profiles/{id}",le="0.1"} 1' in text
+    assert 'zerion_request_duration_seconds_bucket{method="GET",endpoint="profiles/{id}",le="0.05"} 0' in text
+
+def test_hooks_get_request_body(server, make_client):
+    bodies = []
+    metrics = Metrics()
+    metrics.addRequestHook(lambda method, url, body: bodies.append(body))
+    ifb = make_client(metrics=metrics, stream_requests=True)
+    assert ifb.Records('POST', 1, 2, body=[{'name': f'r{i}'} for i in range(3)]).status_code == 201
+    assert bodies[-1].isStream() and bodies[-1].size > 0
+    assert len(server.getCollection('profiles/1/pages/2/records')) == 3
@@ -0,0 +1,80 @@
+from zerionAPI.mirror import SQLiteMirror, getTableName
+
+OLD = {'created_date': '2020-01-01T00:00:00+00:00', 'modified_date': '2020-01-01T00:00:00+00:00'}
+
+def seedForm(server):
+    parent, child = server.seed('profiles/1/pages', [{'name': 'inspection'}, {'name': 'inspection items'}])
+    server.seed(f'profiles/1/pages/{parent}/elements', [
+        {'name': 'site', 'data_type': 1},
+        {'name': 'score', 'data_type': 2},
+        {'name': 'location', 'data_type': 37},
+        {'name': 'heading', 'data_type': 16},
+        {'name': 'items', 'data_type': 18, 'data_size': child}
+    ])
+    server.seed(f'profiles/1/pages/{child}/elements', [{'name': 'item', 'data_type': 1}])
+    records = server.seed(f'profiles/1/pages/{parent}/records', [
+        dict(OLD, site=f'site {i}', score=i / 2, location={'latitude': 1, 'longitude': 2}) for i in range(25)
+    ])
+    server.seed(f'profiles/1/pages/{child}/records', [dict(OLD, item=f'item {i}', parent_record_id=records[i % 5]) for i in range(40)])
+    return parent, child
+
+def test_getTableName():
+    assert getTableName('inspection items') == 'inspection_items'
+
+def test_mirror(server, fake_ifb, tmp_path):
+    parent, child = seedForm(server)
+    inspection, items = f'inspection_{parent}', f'inspection_items_{child}'
+
+    with SQLiteMirror(fake_ifb, 1, str(tmp_path / 'mirror.db'), batch_size=10) as mirror:
+        assert mirror.sync(parent) == {
+            inspection: {'insert': 25, 'update': 0, 'delete': 0},
+            items: {'insert': 40, 'update': 0, 'delete': 0}
+        }
+        assert mirror.getTable(child) == items
+        assert mirror.query(f'SELECT count(*) AS n FROM {inspection} WHERE score >= 10')[0]['n'] == 5
+
+        joined = mirror.query(f'SELECT count(*) AS n FROM {inspection} JOIN {items} ON {items}.parent_record_id = {inspection}.id')
+        assert joined[0]['n'] == 40
+        assert mirror.query(f'SELECT location FROM {inspection} LIMIT 1')[0]['location'] == '{"latitude": 1, "longitude": 2}'
+
+        # Nothing changed, the second sync reads no records
+        assert mirror.sync(parent, recursive=False)[inspection]['insert'] == 0
+
+        server.seed(f'profiles/1/pages/{parent}/elements', [{'name': 'inspector', 'data_type': 1}])
+        server.seed(f'profiles/1/pages/{parent}/records', [{'site': 'new', 'inspector': 'ann'}])
+        assert mirror.sync(parent, recursive=False)[inspection]['insert'] == 1
+        assert mirror.query(f"SELECT inspector FROM {inspection} WHERE site = 'new'") == [{'inspector': 'ann'}]
+
+def test_same_named_subforms(server, fake_ifb, tmp_path):
+    parent, first, second = server.seed('profiles/1/pages', [{'name': 'visit'}, {'name': 'items'}, {'name': 'items'}])
+    server.seed(f'profiles/1/pages/{parent}/elements', [
+        {'name': 'before', 'data_type': 18, 'data_size': first},
+        {'name': 'after', 'data_type': 18, 'data_size': second}
+    ])
+    server.seed(f'profiles/1/pages/{first}/elements', [{'name': 'label', 'data_type': 1}])
+    server.seed(f'profiles/1/pages/{second}/elements', [{'name': 'weight', 'data_type': 2}])
+    server.seed(f'profiles/1/pages/{first}/records', [dict(OLD, label=f'l{i}') for i in range(3)])
+    server.seed(f'profiles/1/pages/{second}/records', [dict(OLD, weight=i) for i in range(4)])
+
+    with SQLiteMirror(fake_ifb, 1, str(tmp_path / 'mirror.db'), reconcile_interval=0) as mirror:
+        counts = mirror.sync(parent)
+        assert counts[f'items_{first}']['insert'] == 3 and counts[f'items_{second}']['insert'] == 4
+        assert [row['label'] for row in mirror.query(f'SELECT * FROM items_{first}')] == ['l0', 'l1', 'l2']
+        assert 'label' not in mirror.query(f'SELECT * FROM items_{second}')[0]
+
+        # Reconciling one page leaves the rows of the other alone
+        counts = mirror.sync(parent)
+        assert counts[f'items_{first}']['delete'] == 0 and counts[f'items_{second}']['delete'] == 0
+        assert mirror.query(f'SELECT count(*) AS n FROM items_{second}')[0]['n'] == 4
+
+def test_renamed_page(server, fake_ifb, tmp_path):
+    parent, child = seedForm(server)
+
+    with SQLiteMirror(fake_ifb, 1, str(tmp_path / 'mirror.db')) as mirror:
+        mirror.sync(parent, recursive=False)
+        server.getCollection('profiles/1/pages')[parent]['name'] = 'audit v2'
+
+        assert mirror.sync(parent, recursive=False) == {f'audit_v2_{parent}': {'insert': 0, 'update': 0, 'delete': 0}}
+        assert mirror.getTable(parent) == f'audit_v2_{parent}'
+        assert mirror.query(f'SELECT count(*) AS n FROM audit_v2_{parent}')[0]['n'] == 25
+        assert mirror.query("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'inspection%'") == []
@@ -0,0 +1,64 @@
+import pytest
+from zerionAPI.options import diffOptions
+
+OPTIONS = 'profiles/1/optionlists/2/options'
+
+def test_diffOptions():
+    current = [
+        {'id': 1, 'key_value': 'a', 'label': 'A', 'sort_order': 0},
+        {'id': 2, 'key_value': 'b', 'label': 'B', 'sort_order': 1},
+        {'id': 3, 'key_value': 'c', 'label': 'C', 'sort_order': 2}
+    ]
+    desired = [{'key_value': 'a', 'label': 'A', 'sort_order': '0'}, {'key_value': 'b', 'label': 'Bee'}, {'key_value': 'd', 'label': 'D'}]
+    diff = diffOptions(current, desired)
+    assert diff.creates == [{'key_value': 'd', 'label': 'D'}]
+    assert diff.updates == [{'id': 2, 'label': 'Bee'}]
+    assert diff.deletes == [3] and diff.unchanged == 1 and len(diff) == 3
+    assert diffOptions(current, desired, delete=False).deletes == []
+
+    with pytest.raises(ValueError):
+        diffOptions(current, [{'key_value': 'a'}, {'key_value': 'a'}])
+    with pytest.raises(ValueError):
+        diffOptions(current, [{'label': 'no key'}])
+
+def test_diffOptions_duplicates():
+    current = [
+        {'id': 1, 'key_value': 'a', 'label': 'A'},
+        {'id': 2, 'key_value': 'a', 'label': 'A'},
+        {'id': 3, 'key_value': 'b', 'label': 'B'},
+        {'id': 4, 'key_value': 'a', 'label': 'old'},
+        {'id': 5, 'key_value': 'b', 'label': 'B'}
+    ]
+    diff = diffOptions(current, [{'key_value': 'a', 'label': 'A2'}])
+    assert diff.updates == [{'id': 1, 'label': 'A2'}]
+    assert sorted(diff.deletes) == [2, 3, 4, 5]
+    assert diffOptions(current, [{'key_value': 'a', 'label': 'A'}], delete=False).deletes == [2, 4]
+
+def test_sync_option_list(server, fake_ifb):
+    ids = server.seed(OPTIONS, [{'key_value': f'k{i}', 'label': f'L{i}', 'sort_order': i, 'condition_value': ''} for i in range(2500)])
+    desired = [{'key_value': f'k{i}', 'label': f'L{i}' if i % 10 else f'new {i}', 'sort_order': i} for i in range(100, 2600)]
+
+    plan = fake_ifb.sync_option_list(1, 2, desired, dry_run=True)
+    assert plan.getCounts() == {'created': 100, 'updated': 240, 'deleted': 100}
+    assert len(server.getCollection(OPTIONS)) == 2500
+
+    report = fake_ifb.sync_option_list(1, 2, desired, chunk_size=50)
+    assert report.ok and report.getCounts() == {'created': 100, 'updated': 240, 'deleted': 100}
+    assert report.diff.unchanged == 2160
+
+    options = {option['key_value']: option for option in server.getCollection(OPTIONS).values()}
+    assert sorted(options) == sorted(option['key_value'] for option in desired)
+    assert options['k110']['label'] == 'new 110' and options['k110']['id'] == ids[110]
+    assert options['k2599']['sort_order'] == 2599
+
+    assert fake_ifb.sync_option_list(1, 2, desired).getCounts() == {'created': 0, 'updated': 0, 'deleted': 0}
+
+def test_sync_option_list_stays_within_pool(server, make_client, caplog):
+    server.seed(OPTIONS, [{'key_value': f'k{i}', 'label': f'L{i}', 'sort_order': i} for i in range(600)])
+    desired = [{'key_value': f'k{i}', 'label': f'new {i}', 'sort_order': i} for i in range(300, 900)]
+    ifb = make_client(pool_maxsize=4)
+
+    with caplog.at_level('WARNING', logger='urllib3.connectionpool'):
+        report = ifb.sync_option_list(1, 2, desired, chunk_size=10, max_workers=16)
+    assert report.getCounts() == {'created': 300, 'updated': 300, 'deleted': 300}
+    assert 'Connection pool is full' not in caplog.text
@@ -0,0 +1,67 @@
+import pytest
+from zerionAPI.pagination import splitFields, canUseKeyset, iterBatches, ResponseError
+from zerionAPI.testing import FakeZerionServer
+
+@pytest.fixture
+def server():
+    with FakeZerionServer() as server:
+        server.seed('profiles/1/pages/2/records', [{'name': f'r{i}', 'age': i % 7} for i in range(250)])
+        yield server
+
+def test_splitFields():
+    assert splitFields('name,data_type((="11")|(="18")),label(="a,b")') == ['name', 'data_type((="11")|(="18"))', 'label(="a,b")']
+    assert canUseKeyset(['name', 'age(>"3")'])
+    assert not canUseKeyset(['id(>"3")'])
+    assert not canUseKeyset(['name:<'])
+    assert canUseKeyset(['label(=":<")'])
+
+def test_keyset(server, fake_ifb):
+    requests = []
+    records = list(iterBatches(lambda p: requests.append(dict(p)) or fake_ifb.Records('GET', 1, 2, params=p), 'name', page_size=100))
+    assert [len(page) for page in records] == [100, 100, 50]
+    assert requests[1]['fields'].startswith('id:<(>"') and 'offset' not in requests[1]
+    # The last page is recognised from Total-Count, no trailing empty request
+    assert len(requests) == 3
+
+def test_iter_records(fake_ifb):
+    records = list(fake_ifb.iter_records(1, 2, fields='name,age(="3")', page_size=10))
+    assert len(records) == 36
+    assert [r['id'] for r in records] == sorted(r['id'] for r in records)
+
+def test_offset_fallback(fake_ifb):
+    records = list(fake_ifb.iter_records(1, 2, fields='age:>', page_size=100))
+    assert len(records) == 250
+    assert [r['age'] for r in records] == sorted((r['age'] for r in records), reverse=True)
+
+    with pytest.raises(ValueError):
+        list(fake_ifb.iter_records(1, 2, fields='age:>', keyset=True))
+
+def test_stops_on_empty_page(server, fake_ifb):
+    server.seed('profiles/1/pages/3/records', [])
+    assert list(fake_ifb.iter_records(1, 3)) == []
+    assert list(fake_ifb.iter_records(1, 3, keyset=False)) == []
+
+def test_failed_page(server, make_client):
+    ifb = make_client(rate_limit_retry=False)
+    server.rate_limit_every = 1
+    with pytest.raises(ResponseError) as e:
+        list(ifb.iter_records(1, 2))
+    assert e.value.result.status_code == 429
+
+@pytest.mark.parametrize('fields', ['name', 'name,age(="3")', 'age:>'])
+def test_scan_records(server, fake_ifb, fields):
+    expected = list(fake_ifb.iter_records(1, 2, fields=fields, page_size=20))
+    scanned = list(fake_ifb.scan_records(1, 2, fields=fields, page_size=20, partitions=7, max_workers=4, ordered=True))
+    assert scanned == expected
+
+    unordered = list(fake_ifb.scan_records(1, 2, fields=fields, page_size=20, max_workers=4))
+    assert sorted(r['id'] for r in unordered) == sorted(r['id'] for r in expected)
+
+def test_scan_stops_early(server, fake_ifb):
+    scan = fake_ifb.scan_records(1, 2, page_size=10, max_workers=4)
+    assert len([next(scan) for _ in range(5)]) == 5
+    scan.close()
+
+def test_scan_empty(server, fake_ifb):
+    server.seed('profiles/1/pages/3/records', [])
+    assert list(fake_ifb.scan_records(1, 3)) == []
@@ -0,0 +1,76 @@
+import warnings
+import pytest
+from datetime import date
+from zerionAPI.query import Query, QueryWarning
+
+def seedPage(server):
+    page_id, = server.seed('profiles/1/pages', [{'name': 'inspections', 'version': 1}])
+    server.seed(f'profiles/1/pages/{page_id}/elements', [
+        {'name': 'site', 'data_type': 1, 'sort_order': 0},
+        {'name': 'score', 'data_type': 6, 'sort_order': 1},
+        {'name': 'status', 'data_type': 1, 'sort_order': 2},
+        {'name': 'heading', 'data_type': 16, 'sort_order': 3}
+    ])
+    server.seed(f'profiles/1/pages/{page_id}/records', [
+        {'site': f's{i}', 'score': i * 10, 'status': 'open' if i % 2 else 'closed', 'notes': 'x' * 100} for i in range(10)
+    ])
+    return page_id
+
+def test_compile():
+    query = Query().select('name', 'id').where('score', '>', 50).where('status', 'in', ['open', 'closed']).orderBy('score', descending=True)
+    assert query.getFields() == 'score:>(>"50"),name,status((="open")|(="closed"))'
+    assert Query().where('a', 'between', (1, 5)).getFields() == 'a(>="1"&<="5")'
+    assert Query().where('a', 'in', [1, 2]).where('a', '!=', 3).getFields() == 'a(((="1")|(="2"))&!="3")'
+    assert Query().where('a', 'not null').where('b', '~', 'abc%').getFields() == 'a(!=""),b(~"abc%")'
+    assert Query().where('created_date', '>=', date(2024, 1, 2)).getFields() == 'created_date(>="2024-01-02")'
+    assert Query().select('a').limit(10, 20).getParams() == {'fields': 'a', 'limit': '10', 'offset': '20'}
+
+def test_invalid_values():
+    with pytest.raises(ValueError):
+        Query().where('a', '=', 'say "hi"').getFields()
+    with pytest.raises(ValueError):
+        Query().where('a', 'in', [])
+    with pytest.raises(ValueError):
+        Query().where('a', 'like', 'x')
+    with pytest.raises(ValueError):
+        Query().orderBy('a').orderBy('a', descending=True)
+
+def test_validate(server, fake_ifb):
+    page_id = seedPage(server)
+    schema = fake_ifb.schema_index(1)
+    assert fake_ifb.query(1, page_id).where('score', '>=', '20').select('site', 'modified_date').getFields()
+
+    with pytest.raises(ValueError) as error:
+        fake_ifb.query(1, page_id).select('missing', 'heading').where('score', '=', 'high').getFields()
+    assert 'missing is not an element' in str(error.value) and 'heading holds no record data' in str(error.value)
+    assert "'high' is not a number" in str(error.value)
+
+    assert Query(page_id, schema).selectAll().getColumns() == ['site', 'score', 'status']
+    with pytest.raises(ValueError):
+        Query().select('missing').validate(schema, page_id)
+
+def test_unused_columns():
+    query = Query().select('site', 'score', 'status').where('status', '=', 'open').uses('site')
+    with pytest.warns(QueryWarning, match='score'):
+        query.getFields()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        Query().select('site').where('status', '=', 'open').uses('site').getFields()
+
+def test_records(server, fake_ifb):
+    page_id = seedPage(server)
+    query = fake_ifb.query(1, page_id).select('site').where('score', '>=', 20).orderBy('score', descending=True)
+    records = list(query.records(fake_ifb, 1, page_size=3))
+    assert [record['score'] for record in records] == [90, 80, 70, 60, 50, 40, 30, 20]
+    assert set(records[0]) == {'id', 'site', 'score'}
+
+    records = list(query.limit(4, 2).records(fake_ifb, 1, page_size=3))
+    assert [record['score'] for record in records] == [70, 60, 50, 40]
+
+    query = Query().select('site').where('status', '=', 'open')
+    assert sorted(record['site'] for record in fake_ifb.iter_records(1, page_id, fields=query)) == ['s1', 's3', 's5', 's7', 's9']
+    assert len(list(Query().select('site').limit(5).records(fake_ifb, 1, page_id, page_size=2))) == 5
+
+    query = Query().select('site').where('site', 'in', ['s1', 's4']).where('score', 'between', (0, 20))
+    assert [record['site'] for record in fake_ifb.iter_records(1, page_id, fields=query)] == ['s1']
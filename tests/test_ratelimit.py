@@ -0,0 +1,53 @@
+import pytest
+import time
+from zerionAPI.ratelimit import RateLimiter, parseRetryAfter, getRateLimitWait, MAX_BACKOFF
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+def test_burst():
+    limiter = RateLimiter(1, burst=3)
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 0]
+    assert limiter.reserve() > 0
+
+def test_acquire_waits():
+    limiter = RateLimiter(20, burst=1)
+    limiter.acquire()
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.04
+
+def test_retry_after_pauses():
+    limiter = RateLimiter(100)
+    limiter.updateFromHeaders({'Retry-After': '2'})
+    assert limiter.reserve() > 1
+
+def test_rate_headers_lower_rate():
+    limiter = RateLimiter(100)
+    limiter.updateFromHeaders({'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '5'})
+    assert limiter.getRate() == 2
+
+def test_parseRetryAfter():
+    assert parseRetryAfter('5') == 5
+    assert parseRetryAfter(None) is None
+    assert parseRetryAfter('not a date') is None
+
+def test_getRateLimitWait():
+    assert getRateLimitWait({'Retry-After': '3'}, None, 0) == 3
+    assert getRateLimitWait({}, None, 0) == 60
+
+    limiter = RateLimiter(10)
+    assert getRateLimitWait({}, limiter, 3) == 0
+    assert 7.5 < limiter.reserve() <= 8
+    getRateLimitWait({}, limiter, 20)
+    assert limiter.reserve() <= MAX_BACKOFF
+
+def test_rate_limit_retries_capped(server, make_client):
+    api = make_client(rate_limit_retry=True, rate_limit_max_retries=3)
+    api.getAccessToken()
+    server.rate_limit_every = 1
+    count = server.request_count
+    assert api.Profiles('GET').status_code == 429
+    assert server.request_count - count == 4
+
@@ -0,0 +1,65 @@
+import math
+import pytest
+from zerionAPI.recordset import RecordSet, Column
+
+RECORDS = [
+    {'id': 1, 'name': 'a', 'score': 1.5, 'count': 3},
+    {'id': 2, 'name': 'b', 'score': None, 'count': '4'},
+    {'id': 3, 'name': 'a', 'score': '2', 'count': None, 'extra': {'x': 1}}
+]
+TYPES = {'id': 'int', 'score': 'float', 'count': 'int'}
+
+def test_columns():
+    records = RecordSet(RECORDS, TYPES)
+    assert len(records) == 3
+    assert records.getColumns() == ['id', 'name', 'score', 'count', 'extra']
+    assert records.getTypes() == {'id': 'int', 'name': 'object', 'score': 'float', 'count': 'int', 'extra': 'object'}
+    assert records['count'] == [3, 4, None]
+    assert records['score'] == [1.5, None, 2.0]
+    assert records['extra'] == [None, None, {'x': 1}]
+    assert records.column('name')[0] is records.column('name')[2]
+
+def test_rows():
+    records = RecordSet(RECORDS, TYPES)
+    assert dict(records[0]) == {'id': 1, 'name': 'a', 'score': 1.5, 'count': 3, 'extra': None}
+    assert records[-1]['extra'] == {'x': 1}
+    assert [row['id'] for row in records] == [1, 2, 3]
+    assert [row['id'] for row in records.filter(lambda row: row['name'] == 'a')] == [1, 3]
+    assert records[1:]['id'] == [2, 3]
+    with pytest.raises(IndexError):
+        records[3]
+
+def test_column_demotes_on_mismatch():
+    column = Column('int')
+    for value in (1, None, 'text'):
+        column.append(value)
+    assert column.type == 'object' and column.toList() == [1, None, 'text']
+
+def test_toArrow():
+    pytest.importorskip('pyarrow')
+    table = RecordSet(RECORDS, TYPES).toArrow()
+    assert table.column('id').to_pylist() == [1, 2, 3]
+    assert table.column('count').to_pylist() == [3, 4, None]
+
+def test_toNumpy():
+    pytest.importorskip('numpy')
+    records = RecordSet(RECORDS, TYPES)
+    assert records.toNumpy('id').tolist() == [1, 2, 3]
+    assert records.toNumpy('count').mask.tolist() == [False, False, True]
+
+def test_toPandas():
+    pytest.importorskip('pandas')
+    frame = RecordSet(RECORDS, TYPES).toPandas()
+    assert list(frame['id']) == [1, 2, 3]
+    assert math.isnan(frame['score'][1])
+
+def test_get_record_set(server, fake_ifb):
+    page, = server.seed('profiles/1/pages', [{'name': 'visits'}])
+    server.seed(f'profiles/1/pages/{page}/elements', [{'name': 'visitor', 'data_type': 1}, {'name': 'score', 'data_type': 2}])
+    server.seed(f'profiles/1/pages/{page}/records', [{'visitor': f'v{i % 3}', 'score': i} for i in range(50)])
+
+    for parallel in (False, True):
+        records = fake_ifb.get_record_set(1, page, page_size=20, parallel=parallel)
+        assert len(records) == 50
+        assert records.getTypes()['score'] == 'float'
+        assert sum(records['score']) == sum(range(50))
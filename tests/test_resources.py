@@ -0,0 +1,76 @@
+import pytest
+import inspect
+from zerionAPI.resources import resourceMethods, ifbQuery, dfaQuery
+
+@resourceMethods(ifbQuery)
+class Client:
+    def __init__(self):
+        self.__host = 'https://host/api'
+        self.calls = []
+
+    def call(self, method, resource, body=None):
+        self.calls.append((method, resource, body))
+        return resource
+
+    __resources = {
+        'Items': {
+            'Methods': ('GET', 'POST'),
+            'URI': 'profiles/%s/items',
+            'Path': ('profile_id',),
+            'Id': 'item_id',
+            'Keywords': ('body', 'params')
+        },
+        'Feed': {
+            'Methods': ('GET',),
+            'URI': 'profiles/%s/items/%s/feed',
+            'Path': ('profile_id', 'item_id'),
+            'Id': None,
+            'Keywords': ()
+        },
+        'Custom': {
+            'Methods': ('GET',),
+            'URI': 'custom'
+        }
+    }
+
+    def Custom(self):
+        return 'hand written'
+
+def test_generated_urls():
+    client = Client()
+    assert client.Items('GET', 1) == 'https://host/api/profiles/1/items'
+    assert client.Items('get', 1, 2) == 'https://host/api/profiles/1/items/2'
+    assert client.Items('GET', 1, params={'fields': 'a,b', 'limit': 10, 'skip': None}) == 'https://host/api/profiles/1/items?fields=a%2Cb&limit=10'
+    assert client.Feed('GET', 1, 2) == 'https://host/api/profiles/1/items/2/feed'
+
+def test_body_is_passed_through():
+    client = Client()
+    client.Items('POST', 1, body={'name': 'x'})
+    assert client.calls == [('POST', 'https://host/api/profiles/1/items', {'name': 'x'})]
+
+def test_method_not_allowed():
+    with pytest.raises(ValueError):
+        Client().Items('DELETE', 1)
+
+def test_hand_written_methods_are_kept():
+    assert Client().Custom() == 'hand written'
+    assert Client.Items.__qualname__ == 'Client.Items'
+
+def test_arguments_by_name():
+    client = Client()
+    assert client.Items('GET', profile_id=1, item_id=2) == 'https://host/api/profiles/1/items/2'
+    assert client.Feed(method='GET', profile_id=1, item_id=2) == 'https://host/api/profiles/1/items/2/feed'
+    with pytest.raises(TypeError):
+        client.Feed('GET', 1)
+    with pytest.raises(TypeError):
+        client.Items('GET', 1, 2, 3)
+    with pytest.raises(TypeError):
+        client.Feed('GET', 1, 2, body={})
+
+def test_signature_and_doc():
+    assert str(inspect.signature(Client.Items)) == '(self, method, profile_id, item_id=None, *, body=None, params={})'
+    assert str(inspect.signature(Client.Feed)) == '(self, method, profile_id, item_id)'
+    assert Client.Items.__doc__.startswith('GET, POST profiles/{profile_id}/items[/{item_id}]')
+
+def test_dfa_query():
+    assert dfaQuery({'limit': 10, 'offset': None, 'sort': 'id'}) == '/limit/10/sort/id'
@@ -0,0 +1,63 @@
+import pytest
+import time
+import requests
+from zerionAPI.retry import RetryPolicy, CircuitBreaker, CircuitOpenError
+
+def test_retry_idempotent_methods():
+    policy = RetryPolicy()
+    assert policy.shouldRetry('GET', 0, 503)
+    assert policy.shouldRetry('delete', 0)
+    assert not policy.shouldRetry('POST', 0, 503)
+
+def test_retry_post_opt_in():
+    policy = RetryPolicy(retry_post=True)
+    assert policy.shouldRetry('POST', 0, 502)
+
+def test_retry_limits():
+    policy = RetryPolicy(max_retries=2)
+    assert not policy.shouldRetry('GET', 2, 503)
+    assert not policy.shouldRetry('GET', 0, 404)
+
+def test_backoff():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+    assert [policy.getBackoff(i) for i in range(4)] == [1, 2, 4, 5]
+    assert 0 <= RetryPolicy(backoff_factor=1).getBackoff(3) <= 8
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+    breaker.recordFailure()
+    breaker.before()
+    breaker.recordFailure()
+    assert breaker.getState() == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+    time.sleep(0.06)
+    breaker.before()
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+    breaker.recordSuccess()
+    assert breaker.getState() == CircuitBreaker.CLOSED
+
+def test_circuit_breaker_release():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    assert breaker.before() is False
+    breaker.recordFailure()
+    assert breaker.before() is True
+    breaker.release()
+    assert breaker.before() is True
+
+def test_trial_released_on_error(make_client):
+    ifb = make_client(circuit_breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=0))
+    assert ifb.Profiles('GET', 999).status_code == 404
+    ifb.getCircuitBreaker().recordFailure()
+
+    def invalid(*args, **kwargs):
+        raise requests.exceptions.InvalidURL('bad url')
+    ifb.getSession().request = invalid
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.InvalidURL):
+            ifb.Profiles('GET', 1)
+    assert ifb.getCircuitBreaker().getState() == CircuitBreaker.HALF_OPEN
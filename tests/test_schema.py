@@ -0,0 +1,70 @@
+import json
+from zerionAPI.schema import SchemaIndex
+
+def seedProfile(server):
+    pages = [{'name': 'audit', 'version': 1}, {'name': 'audit rooms', 'version': 1}, {'name': 'room photos', 'version': 1}]
+    root, child, grandchild = server.seed('profiles/1/pages', pages)
+    server.seed(f'profiles/1/pages/{root}/elements', [
+        {'name': 'site', 'data_type': 1, 'sort_order': 0},
+        {'name': 'note', 'data_type': 16, 'sort_order': 1},
+        {'name': 'rooms', 'data_type': 18, 'data_size': child, 'sort_order': 2}
+    ])
+    server.seed(f'profiles/1/pages/{child}/elements', [
+        {'name': 'area', 'data_type': 2, 'sort_order': 1},
+        {'name': 'photos', 'data_type': 18, 'data_size': grandchild, 'sort_order': 2},
+        {'name': 'room', 'data_type': 1, 'sort_order': 0}
+    ])
+    server.seed(f'profiles/1/pages/{grandchild}/elements', [{'name': 'photo', 'data_type': 11, 'sort_order': 0}])
+    return root, child, grandchild
+
+def test_lookups(server, fake_ifb):
+    root, child, grandchild = seedProfile(server)
+    schema = SchemaIndex(fake_ifb, 1)
+    assert sorted(schema.refresh()) == [root, child, grandchild]
+
+    assert schema.getPageId('audit rooms') == child and schema.getPageId('missing') is None
+    assert schema.getPageName(grandchild) == 'room photos'
+    assert [element['name'] for element in schema.getElements(child)] == ['room', 'area', 'photos']
+    assert [element['name'] for element in schema.getDataElements(root)] == ['site']
+    assert schema.getElementType(child, 'area') == 2 and schema.getElementType(child, 'missing') is None
+    assert schema.getValueTypes(child) == {'room': 'str', 'area': 'float'}
+    assert schema.getChildren(root) == [child] and schema.getParents(grandchild) == [child]
+    assert schema.getDescendants(root) == [child, grandchild]
+    assert schema.getRootPages() == [root]
+
+def test_incremental_refresh(server, fake_ifb):
+    root, child, grandchild = seedProfile(server)
+    schema = SchemaIndex(fake_ifb, 1)
+    schema.refresh()
+    assert schema.refresh() == []
+
+    server.getCollection('profiles/1/pages')[child]['version'] = 2
+    server.seed(f'profiles/1/pages/{child}/elements', [{'name': 'floor', 'data_type': 6, 'sort_order': 3}])
+    del server.getCollection('profiles/1/pages')[grandchild]
+
+    assert schema.refresh() == [child]
+    assert schema.getElementType(child, 'floor') == 6
+    assert not schema.hasPage(grandchild) and schema.getDescendants(root) == [child, grandchild]
+    assert sorted(schema.refresh(force=True)) == [root, child]
+
+def test_persisted(server, fake_ifb, tmp_path):
+    root, child, grandchild = seedProfile(server)
+    path = str(tmp_path / 'schema.json')
+    SchemaIndex(fake_ifb, 1, path=path).refresh()
+    assert json.load(open(path))['profile_id'] == 1
+
+    schema = SchemaIndex(fake_ifb, 1, path=path)
+    assert schema.getPageId('audit') == root and schema.getChildren(child) == [grandchild]
+    assert schema.refresh() == []
+    assert SchemaIndex(fake_ifb, 2, path=path).getPageIds() == []
+
+def test_kept_on_client(server, fake_ifb, tmp_path):
+    root, child, grandchild = seedProfile(server)
+    assert fake_ifb.getSchemaIndex(1) is None
+    schema = fake_ifb.schema_index(1)
+    assert fake_ifb.getSchemaIndex(1) is schema and fake_ifb.schema_index(1, refresh=False) is schema
+
+    server.getCollection(f'profiles/1/pages/{child}/elements').clear()
+    server.getCollection('profiles/1/pages')[child]['name'] = 'renamed'
+    counts = fake_ifb.export_form_tree(1, root, str(tmp_path))
+    assert sorted(path.rsplit('/', 1)[-1] for path in counts) == [f'audit_{root}.jsonl', f'audit_rooms_{child}.jsonl', f'room_photos_{grandchild}.jsonl']
@@ -0,0 +1,55 @@
+import json
+import gzip
+import pytest
+from zerionAPI.serialization import iterArray, loads, dumps, iterDumps, gzipChunks, RequestBody
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def test_loads():
+    assert loads(b'{"id": 1}') == {'id': 1}
+
+@pytest.mark.parametrize('size', [1, 2, 5, 64, 100000])
+def test_iterArray(size):
+    records = [{'id': i, 'name': 'é' * i} for i in range(20)] + [12345, 'text', [1, 2]]
+    assert list(iterArray(chunked(json.dumps(records).encode(), size))) == records
+
+def test_iterArray_empty():
+    assert list(iterArray([])) == []
+    assert list(iterArray([b' [ ] '])) == []
+
+def test_iterArray_object():
+    assert list(iterArray([b'{"count":', b' 3}'])) == [{'count': 3}]
+
+def test_iterArray_truncated():
+    with pytest.raises(ValueError):
+        list(iterArray([b'[{"id": 1}, {"id"']))
+
+@pytest.mark.parametrize('size', [1, 16, 65536])
+def test_iterDumps(size):
+    records = [{'id': i, 'name': 'é' * i} for i in range(50)]
+    assert json.loads(b''.join(iterDumps(records, size))) == records
+    assert json.loads(b''.join(iterDumps([], size))) == []
+    assert json.loads(b''.join(iterDumps({'id': 1}, size))) == {'id': 1}
+
+def test_gzipChunks():
+    chunks = [dumps({'id': i}) for i in range(100)]
+    assert gzip.decompress(b''.join(gzipChunks(chunks))) == b''.join(chunks)
+
+def test_RequestBody():
+    small = RequestBody({'id': 1}, compress=True)
+    assert small.headers == {} and loads(small.getData()) == {'id': 1}
+
+    records = [{'name': 'x' * 10} for _ in range(200)]
+    large = RequestBody(records, compress=True)
+    assert large.headers == {'Content-Encoding': 'gzip'}
+    assert loads(gzip.decompress(large.getData())) == records
+    assert large.size == len(large.getData())
+
+    streamed = RequestBody(records, compress=True, stream=True, chunk_size=100)
+    assert streamed.isStream()
+    # Every send gets a fresh generator so retries resend the whole body
+    for _ in range(2):
+        data = b''.join(streamed.getData())
+        assert loads(gzip.decompress(data)) == records
+        assert streamed.size == len(data)
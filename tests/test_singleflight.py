@@ -0,0 +1,32 @@
+import time
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from zerionAPI.singleflight import SingleFlight
+
+def test_concurrent_calls_share_result():
+    group = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 'page'
+
+    with ThreadPoolExecutor(8) as executor:
+        leader = executor.submit(group.do, 'url', fetch)
+        started.wait()
+        followers = [executor.submit(group.do, 'url', fetch) for _ in range(7)]
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == ['page'] * 8
+    assert len(calls) == 1
+    assert len(group) == 0
+
+def test_exception_is_shared():
+    group = SingleFlight()
+    with pytest.raises(KeyError):
+        group.do('url', lambda: {}['missing'])
+    assert group.do('url', lambda: 'retry') == 'retry'
@@ -0,0 +1,64 @@
+import pytest
+from zerionAPI.sync import FileWatermarkStore, SQLiteWatermarkStore, RecordSync, parseDate
+from zerionAPI.testing import FakeZerionServer
+
+RECORDS = 'profiles/1/pages/2/records'
+OLD = '2020-01-01T00:00:00+00:00'
+
+@pytest.fixture
+def server():
+    with FakeZerionServer() as server:
+        server.seed(RECORDS, [{'name': f'r{i}', 'created_date': OLD, 'modified_date': OLD} for i in range(30)])
+        yield server
+
+@pytest.fixture(params=['file', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'file':
+        return FileWatermarkStore(str(tmp_path / 'watermarks.json'))
+    return SQLiteWatermarkStore(str(tmp_path / 'watermarks.db'))
+
+def test_store(store):
+    assert store.load('a') is None
+    store.save('a', {'id': 1})
+    store.save('b', {'id': 2})
+    assert store.load('a') == {'id': 1}
+    store.delete('a')
+    assert store.load('a') is None and store.load('b') == {'id': 2}
+
+def test_parseDate():
+    assert parseDate('2020-01-01T00:00:00Z') == parseDate(OLD)
+    assert parseDate('not a date') is None
+
+def test_modified_date_sync(server, fake_ifb, store):
+    changes = list(fake_ifb.sync_records(1, 2, store, fields='name', overlap=0))
+    assert len(changes) == 30 and {kind for kind, record in changes} == {'insert'}
+
+    ids = [record['id'] for kind, record in changes]
+    assert fake_ifb.Records('PUT', 1, 2, ids[3], body={'name': 'changed'}).status_code == 200
+    fake_ifb.Records('POST', 1, 2, body={'name': 'new'})
+
+    changes = list(fake_ifb.sync_records(1, 2, store, fields='name', overlap=0))
+    assert sorted((kind, record['name']) for kind, record in changes) == [('insert', 'new'), ('update', 'changed')]
+
+def test_watermark_saved_only_when_consumed(fake_ifb, store):
+    changes = fake_ifb.sync_records(1, 2, store)
+    next(changes)
+    changes.close()
+    assert store.load('fake/1/2') is None
+
+def test_id_sync(server, fake_ifb, store):
+    assert len(list(fake_ifb.sync_records(1, 2, store, mode='id'))) == 30
+    server.seed(RECORDS, [{'name': 'appended'}])
+    assert [(kind, record['name']) for kind, record in fake_ifb.sync_records(1, 2, store, mode='id', fields='name')] == [('insert', 'appended')]
+
+def test_reconcile_deletes(server, fake_ifb, store):
+    mirror = {}
+    sync = RecordSync(fake_ifb, 1, 2, store, known_ids=lambda: list(mirror), reconcile_interval=0)
+    for kind, record in sync.changes():
+        mirror[record['id']] = record
+
+    deleted = list(mirror)[:2]
+    for id in deleted:
+        fake_ifb.Records('DELETE', 1, 2, id)
+
+    assert [(kind, record['id']) for kind, record in sync.changes() if kind == 'delete'] == [('delete', id) for id in deleted]
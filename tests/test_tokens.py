@@ -0,0 +1,57 @@
+import os
+import json
+import time
+import requests
+from zerionAPI.tokens import TokenProvider
+from zerionAPI.transport import PoolAdapter
+
+SECRET = 'token-test-secret-long-enough-for-hs256'
+
+def test_cache_file(server, tmp_path):
+    url = f'{server.base_url}/oauth2/token'
+    token = TokenProvider(url, 'key', SECRET, cache_dir=str(tmp_path), background_refresh=False).getToken()
+    path, = [name for name in os.listdir(tmp_path) if name.endswith('.json')]
+    assert json.load(open(tmp_path / path))['access_token'] == token
+    assert os.stat(tmp_path / path).st_mode & 0o777 == 0o600
+
+    assert TokenProvider(url, 'key', SECRET, cache_dir=str(tmp_path), background_refresh=False).getToken() == token
+    assert server.tokens == {token}
+
+def test_refresh(server):
+    provider = TokenProvider(f'{server.base_url}/oauth2/token', 'key', SECRET, background_refresh=False)
+    token = provider.getToken()
+    assert provider.getToken() == token
+
+    renewed = provider.renew(token)
+    assert renewed != token and provider.renew(token) == renewed
+    assert len(server.tokens) == 2
+
+def test_pooled_session(server, monkeypatch):
+    provider = TokenProvider(f'{server.base_url}/oauth2/token', 'key', SECRET, background_refresh=False)
+    assert isinstance(provider.getSession().get_adapter(server.base_url), PoolAdapter)
+
+    monkeypatch.setattr(requests, 'post', None)
+    assert provider.getToken() is not None and provider.refresh() is not None
+
+def test_failure_cooldown(server):
+    provider = TokenProvider(f'{server.base_url}/oauth2/token', 'key', SECRET, background_refresh=False, retry_backoff=0.1)
+    server.rate_limit_every = 1
+    assert provider.getToken() is None
+    assert provider.getToken() is None and server.request_count == 1
+
+    server.rate_limit_every = 0
+    time.sleep(0.15)
+    assert provider.getToken() is not None and server.request_count == 2
+
+def test_shared(server, tmp_path):
+    url = f'{server.base_url}/oauth2/token'
+    provider = TokenProvider.getShared(url, 'key', SECRET)
+    assert TokenProvider.getShared(url, 'key', SECRET) is provider
+    assert TokenProvider.getShared(url, 'key', SECRET, cache_dir=str(tmp_path)) is not provider
+    assert TokenProvider.getShared(url, 'key', SECRET, background_refresh=False) is not provider
+
+def test_replay_on_401(server, fake_ifb):
+    assert fake_ifb.Profiles('GET').status_code == 200
+    server.tokens.clear()
+    assert fake_ifb.Profiles('GET').status_code == 200
+    assert len(server.tokens) == 1
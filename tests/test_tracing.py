@@ -0,0 +1,36 @@
+import logging
+from datetime import timedelta
+from types import SimpleNamespace
+from zerionAPI.tracing import Tracer, enableQueueLogging
+
+def result(status_code):
+    return SimpleNamespace(status_code=status_code, content=b'{}', elapsed=timedelta(seconds=0.5))
+
+def test_ring_buffer():
+    tracer = Tracer(buffer_size=3)
+    for i in range(5):
+        tracer.onResponse('GET', f'https://example.com/{i}', result(200))
+    traces = tracer.getTraces()
+    assert [t['url'] for t in traces] == [f'https://example.com/{i}' for i in (2, 3, 4)]
+    assert tracer.getTraces(1)[0]['elapsed'] == 0.5
+
+def test_sampling():
+    tracer = Tracer(sample_rate=0)
+    tracer.onResponse('GET', 'https://example.com', result(200))
+    tracer.onError('GET', 'https://example.com', ConnectionError())
+    assert tracer.getTraces() == []
+
+def test_queue_logging():
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    listener = enableQueueLogging(handler, name='zerionAPI.test')
+    logging.getLogger('zerionAPI.test').debug('queued')
+    listener.stop()
+    assert [r.getMessage() for r in records] == ['queued']
+
+def test_tracer_param(make_client):
+    ifb = make_client(tracer=True)
+    assert isinstance(ifb.getTracer(), Tracer)
+    ifb.Profiles('GET')
+    assert len(ifb.getTracer().getTraces()) == 1
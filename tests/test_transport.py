@@ -0,0 +1,34 @@
+import socket
+import pytest
+from zerionAPI.transport import PoolAdapter, createSession, getPoolSize, getTimeout
+
+@pytest.mark.parametrize('params, size', [({}, 10), ({'batch_workers': 32}, 32), ({'batch_workers': 32, 'pool_maxsize': 4}, 4)])
+def test_pool_size(params, size):
+    assert getPoolSize(params) == size
+    adapter = createSession(params).get_adapter('https://example.com')
+    assert isinstance(adapter, PoolAdapter) and adapter._pool_maxsize == size
+    assert adapter.poolmanager.connection_pool_kw['maxsize'] == size
+
+def test_pool_options():
+    session = createSession({'pool_connections': 3, 'pool_block': True})
+    adapter = session.get_adapter('http://example.com')
+    assert adapter._pool_connections == 3 and adapter._pool_block
+    assert session.get_adapter('https://example.com') is adapter
+
+def test_keep_alive():
+    assert createSession().headers['Connection'] == 'keep-alive'
+    assert createSession({'keep_alive': False}).headers['Connection'] == 'close'
+
+def test_tcp_keepalive():
+    pool_kw = createSession().get_adapter('https://example.com').poolmanager.connection_pool_kw
+    assert 'socket_options' not in pool_kw
+
+    options = createSession({'tcp_keepalive': True}).get_adapter('https://example.com').poolmanager.connection_pool_kw['socket_options']
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in options
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        assert (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60) in options
+
+def test_timeout():
+    assert getTimeout() == (10, 120)
+    assert getTimeout({'connect_timeout': 2, 'read_timeout': 30}) == (2, 30)
+    assert getTimeout({'read_timeout': None}) == (10, None)
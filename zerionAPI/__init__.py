@@ -1,5 +1,9 @@
 __version__ = "0.0.6"
 
+import logging
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 from .ifb import IFB
 from .dfa import DFA
+from .aio import AsyncIFB, AsyncDFA
 from . import dfa_utilities, ifb_utilities
\ No newline at end of file
@@ -0,0 +1,237 @@
+import re
+import asyncio
+import time
+from datetime import timedelta
+from .api import API, Response
+from .attempts import RequestAttempts
+from .transport import ACCEPT_ENCODING
+from .ifb import IFB
+from .dfa import DFA
+
+try:
+    import aiohttp
+    TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+except ImportError:
+    aiohttp = None
+
+
+# snake_case names with an underscore, the helpers IFB and DFA add on top of their resource methods
+HELPER_NAME = re.compile(r'[a-z]+(_[a-z]+)+')
+
+
+def getSyncHelpers(cls):
+    """Helpers the synchronous client classes of cls define, they call resource methods and expect Responses back"""
+    return sorted({
+        name for klass in cls.__mro__ if klass is not API and issubclass(klass, API)
+        for name, value in vars(klass).items() if callable(value) and HELPER_NAME.fullmatch(name)
+    })
+
+
+def syncOnly(cls):
+    """Class decorator replacing the inherited synchronous helpers with methods that raise TypeError"""
+    def unavailable(name):
+        def method(self, *args, **kwargs):
+            raise TypeError(f'{name} is not available on {type(self).__name__}, use the synchronous client for it')
+        method.__name__ = name
+        return method
+
+    for name in getSyncHelpers(cls):
+        setattr(cls, name, unavailable(name))
+    return cls
+
+
+async def iterChunks(chunks):
+    """Hand a streamed request body to aiohttp, which only streams async iterables"""
+    for chunk in chunks:
+        yield chunk
+
+
+class AsyncResult:
+    """Fully-read aiohttp response exposing the attributes Response expects"""
+    def __init__(self, status_code, headers, content, elapsed):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+
+
+class LoopState:
+    """What an async client holds for one event loop: its connection pool, concurrency limit and coalesced GETs"""
+    def __init__(self, session, semaphore, owned=True):
+        self.session = session
+        self.semaphore = semaphore
+        self.owned = owned
+        self.in_flight = {}
+
+
+class AsyncAPI:
+    """Mixin that turns every resource method of an API subclass into a coroutine
+
+    Each client keeps one aiohttp connection pool and one semaphore per event
+    loop, so the same client can be used under several asyncio.run() calls.
+    The semaphore bounds the client's in-flight requests to the
+    `max_concurrency` param. Pass an `aiohttp_session` to share one pool
+    between clients; the client then never closes it. Leaving `async with`
+    or awaiting close() closes this client's pool on the running loop, the
+    state of loops that have since closed is dropped on the next request.
+    """
+    def __init__(self, server=None, client_key=None, client_secret=None, params={}):
+        if aiohttp is None:
+            raise ImportError('aiohttp is required for async clients: pip install zerionAPI[async]')
+
+        super().__init__(server, client_key, client_secret, params)
+        self.__max_concurrency = params.get('max_concurrency', 100)
+        self.__connection_limit = params.get('connection_limit', 100)
+        self.__keepalive_timeout = params.get('keepalive_timeout', 15)
+        self.__session = params.get('aiohttp_session')
+        self.__coalesce_requests = params.get('coalesce_requests', True)
+        self.__states = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def __getState(self):
+        loop = asyncio.get_running_loop()
+        for closed in [other for other in self.__states if other.is_closed()]:
+            del self.__states[closed]
+
+        state = self.__states.get(loop)
+        if state is None or state.session.closed:
+            if self.__session is not None:
+                session, owned = self.__session, False
+            else:
+                connect_timeout, read_timeout = self.getTimeout()
+                connector = aiohttp.TCPConnector(limit=self.__connection_limit, keepalive_timeout=self.__keepalive_timeout)
+                timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+                session, owned = aiohttp.ClientSession(connector=connector, timeout=timeout), True
+            state = self.__states[loop] = LoopState(session, asyncio.Semaphore(self.__max_concurrency), owned)
+
+        return state
+
+    async def close(self):
+        """Close this client's connection pool on the running event loop"""
+        state = self.__states.pop(asyncio.get_running_loop(), None)
+        if state is not None and state.owned:
+            await state.session.close()
+
+    def getLoopCount(self):
+        """Number of event loops this client currently holds a connection pool for"""
+        return len(self.__states)
+
+    def getMaxConcurrency(self):
+        return self.__max_concurrency
+
+    async def call_many(self, jobs, max_workers=None):
+        """Run (method, resource, args, body[, params]) jobs concurrently, at most max_workers at a time
+        Results are returned in input order, a failed job returns its exception instead of a Response
+        """
+        semaphore = asyncio.Semaphore(max_workers or self.__max_concurrency)
+
+        async def run(method, resource, args=(), body=None, params=None):
+            kwargs = {}
+            if body is not None:
+                kwargs['body'] = body
+            if params is not None:
+                kwargs['params'] = params
+            async with semaphore:
+                return await getattr(self, resource)(method, *args, **kwargs)
+
+        return await asyncio.gather(*[run(*job) for job in jobs], return_exceptions=True)
+
+    async def call(self, method, resource, body=None):
+        token, expiration = self.getTokenProvider().peek()
+        if token is None or time.time() > expiration:
+            # Token requests are blocking, keep them off the event loop
+            token = await asyncio.get_running_loop().run_in_executor(None, self.getAccessToken)
+        else:
+            token = self.getAccessToken()
+
+        method = method.upper()
+
+        if method not in ('GET','POST','PUT','DELETE'):
+            raise ValueError(f'{method} is not an accepted method')
+
+        if self.__coalesce_requests and method == 'GET':
+            # Identical GETs already in flight share that request
+            in_flight = self.__getState().in_flight
+            task = in_flight.get(resource)
+            if task is None:
+                task = asyncio.ensure_future(self.__request(method, resource, None, token))
+                in_flight[resource] = task
+                task.add_done_callback(lambda _: in_flight.pop(resource, None))
+            return Response(await asyncio.shield(task))
+
+        return Response(await self.__request(method, resource, body, token))
+
+    async def __request(self, method, resource, body, token):
+        headers = {'Content-Type': 'application/json', 'Accept-Encoding': ACCEPT_ENCODING}
+        if token is not None:
+            headers['Authorization'] = "Bearer %s" % token
+
+        payload = self._encodeBody(method, body)
+        attempts = RequestAttempts(self, method, resource, payload)
+        cached, validators = attempts.lookup()
+        if cached is not None:
+            return cached
+        headers.update(payload.headers if payload is not None else validators)
+        state = self.__getState()
+        limiter = self.getRateLimiter()
+
+        async with state.semaphore:
+            while True:
+                attempts.before()
+
+                try:
+                    if limiter is not None:
+                        while (wait := limiter.reserve()) > 0:
+                            await asyncio.sleep(wait)
+
+                    data = payload.getData() if payload is not None else None
+                    if payload is not None and payload.isStream():
+                        data = iterChunks(data)
+
+                    attempts.sending()
+                    start = time.perf_counter()
+                    async with state.session.request(method, resource, data=data, headers=headers) as r:
+                        content = await r.read()
+                        result = AsyncResult(r.status, r.headers, content, timedelta(seconds=time.perf_counter() - start))
+                except TRANSIENT_ERRORS as e:
+                    wait = attempts.onError(e)
+                    if wait is None:
+                        raise
+                    await asyncio.sleep(wait)
+                    continue
+                except BaseException:
+                    # Cancellation too must free a half-open trial slot
+                    attempts.abort()
+                    raise
+
+                attempts.onResponse(result)
+
+                if attempts.shouldRenew(result, token):
+                    # Token requests are blocking, keep them off the event loop
+                    token = await asyncio.get_running_loop().run_in_executor(None, self.getTokenProvider().renew, token)
+                    if token is None:
+                        break
+                    headers['Authorization'] = "Bearer %s" % token
+                    continue
+
+                wait = attempts.getRetryWait(result)
+                if wait is None:
+                    break
+                await asyncio.sleep(wait)
+
+        return attempts.finish(result)
+
+
+@syncOnly
+class AsyncIFB(AsyncAPI, IFB):
+    """IFB client whose resource methods return awaitables"""
+
+
+@syncOnly
+class AsyncDFA(AsyncAPI, DFA):
+    """DFA client whose resource methods return awaitables"""
@@ -1,20 +1,62 @@
 import time
 import re
-import jwt
 import requests
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
+from .ratelimit import RateLimiter
+from .attempts import RequestAttempts
+from .retry import RetryPolicy, CircuitBreaker
+from .tokens import TokenProvider
+from .transport import createSession, getTimeout, getPoolSize
+from .serialization import loads, iterArray, RequestBody
+from .metrics import Metrics
+from .tracing import Tracer
+from .cache import ResponseCache
+from .singleflight import SingleFlight
 from abc import abstractmethod, ABC
 
-import logging
-logging.basicConfig(filename='app.log', level=logging.DEBUG,
-                    format='%(asctime)s - %(message)s', datefmt='%d-%b-%y %H:%M:%S')
+
+TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
 
 class Response:
+    """Wraps a requests response, the JSON body is only decoded when `response` is first read"""
     def __init__(self, r):
         self.headers = r.headers
         self.status_code = r.status_code
-        self.response = r.json()
+        self.__r = r
+        self.__decoded = False
+        self.__response = None
+
+    @property
+    def content(self):
+        """Raw response body as bytes"""
+        return self.__r.content
+
+    @property
+    def response(self):
+        """Decoded JSON body, None if the body is empty or not JSON"""
+        if not self.__decoded:
+            try:
+                self.__response = loads(self.content) if self.content else None
+            except ValueError:
+                self.__response = None
+            self.__decoded = True
+        return self.__response
+
+    @response.setter
+    def response(self, value):
+        self.__response = value
+        self.__decoded = True
+
+    def iter_items(self, chunk_size=65536):
+        """Yield the elements of a JSON array body one at a time without building the full list"""
+        content = self.content
+        return iterArray(content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
 
     def __repr__(self):
         return str(self.status_code)
@@ -31,67 +73,100 @@ class API(ABC):
         self.__client_key = client_key
         self.__client_secret = client_secret
         self.__params = params
-        self.__access_token = None
-        self.__access_token_expiration = None
         self.__start_time = None
-        self.__session = requests.Session()
-        self.__session.headers.update({'Content-Type': 'application/json'})
+        self.__session = createSession(params)
+        self.__timeout = getTimeout(params)
         self.__api_calls = 0
         self.__last_execution_time = None
-        self.__rate_limit_retry = params.get('rate_limit_retry', False)
         self.__ifb_api_credentials = params.get('ifb_api_credentials', False)
         self.__region = params.get('region', 'us')
         self.__version = params.get('version', 8.0)
+        self.__batch_workers = params.get('batch_workers', 10)
+        self.__pool_size = getPoolSize(params)
+        self.__lock = threading.Lock()
+        self.__rate_limiter = params.get('rate_limiter')
+
+        if self.__rate_limiter is None and params.get('rate_limit') is not None:
+            self.__rate_limiter = RateLimiter(params['rate_limit'], params.get('rate_limit_burst'))
+
+        self.__retry_policy = params.get('retry_policy')
+        self.__circuit_breaker = params.get('circuit_breaker')
+
+        self.__metrics = params.get('metrics')
+        self.__tracer = params.get('tracer')
+        self.__cache = params.get('cache')
+        self.__single_flight = SingleFlight() if params.get('coalesce_requests', True) else None
+        self.__compress_requests = params.get('compress_requests', False)
+        self.__stream_requests = params.get('stream_requests', False)
+
+        if self.__cache is True:
+            self.__cache = ResponseCache()
+
+        if self.__metrics is True:
+            self.__metrics = Metrics()
+        if self.__retry_policy is True:
+            self.__retry_policy = RetryPolicy()
+        if self.__circuit_breaker is True:
+            self.__circuit_breaker = CircuitBreaker()
+        if self.__tracer is True:
+            self.__tracer = Tracer()
+
+        if params.get('token_provider') is not None:
+            self.__token_provider = params['token_provider']
+        else:
+            self.__token_provider = TokenProvider.getShared(
+                self.__getTokenURL(), client_key, client_secret,
+                cache_dir=params.get('token_cache_dir'),
+                background_refresh=params.get('token_background_refresh', True)
+            )
+
+        if not params.get('lazy_token', True):
+            self.getAccessToken()
+
+    def __getTokenURL(self):
+        base_url = self.__params.get('base_url')
+        if self.__ifb_api_credentials:
+            base_url = base_url or f"https://{self.__region+'-api' if self.__region != 'us' else 'api'}.iformbuilder.com"
+            return f"{base_url}/exzact/api/v{str(self.__version).replace('.','')}/{self.__server}/oauth/token"
+        return f"{base_url or 'https://identity.zerionsoftware.com'}/oauth2/token"
+
+    def __applyAccessToken(self, token):
+        if token is not None and self.__session.headers.get('Authorization') != "Bearer %s" % token:
+            if self.__start_time is None:
+                self.__start_time = time.time()
+            self.__session.headers.update(
+                {'Authorization': "Bearer %s" % token})
+        return token
 
-        self.requestAccessToken()
-        
     def requestAccessToken(self):
         """Create JWT and request iFormBuilder Access Token
         If token is successfully returned, stored in session header
         Else null token is stored in session header
         """
-        try:
-            if self.__ifb_api_credentials:
-                url = f"https://{self.__region+'-api' if self.__region != 'us' else 'api'}.iformbuilder.com/exzact/api/v{str(self.__version).replace('.','')}/{self.__server}/oauth/token"
-                # url = f"https://{self.__server}.iformbuilder.com/exzact/api/oauth/token"
-            else:
-                url = "https://identity.zerionsoftware.com/oauth2/token"
-            # url = "https://qa-identity.zerionsoftware.com/oauth2/token" if self.__isQA else "https://identity.zerionsoftware.com/oauth2/token"
-
-            jwt_payload = {
-                'iss': self.__client_key,
-                'aud': url,
-                'iat': time.time(),
-                'exp': time.time() + 300
-            }
-
-            encoded_jwt = jwt.encode(
-                jwt_payload, self.__client_secret, algorithm='HS256')
-            token_body = {
-                'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer',
-                'assertion': encoded_jwt
-            }
-
-            result = requests.post(url, data=token_body, timeout=5)
-            result.raise_for_status()
-        except Exception as e:
-            print(f'Exception: {e}')
-            return
-        else:
-            self.__start_time = time.time()
-            self.__access_token = result.json()['access_token']
-            self.__session.headers.update(
-                {'Authorization': "Bearer %s" % self.__access_token})
-            self.__access_token_expiration = time.time() + 3300
+        return self.__applyAccessToken(self.__token_provider.refresh())
+
+    def getTokenProvider(self):
+        return self.__token_provider
+
+    def getSession(self):
+        return self.__session
+
+    def getTimeout(self):
+        return self.__timeout
+
+    def getServer(self):
+        return self.__server
 
     def getParams(self):
         return self.__params
 
     def getAccessToken(self):
-        return self.__access_token
+        """Return the current access token, requesting one on first use"""
+        return self.__applyAccessToken(self.__token_provider.getToken())
 
     def getAccessTokenExpiration(self):
-        return self.__access_token_expiration
+        self.getAccessToken()
+        return self.__token_provider.peek()[1]
 
     def getApiCount(self):
         return self.__api_calls
@@ -99,43 +174,139 @@ class API(ABC):
     def getLastExecution(self):
         return self.__last_execution_time
 
+    def getBatchWorkers(self):
+        return self.__batch_workers
+
+    def getRateLimiter(self):
+        return self.__rate_limiter
+
+    def getMetrics(self):
+        return self.__metrics
+
+    def getCache(self):
+        return self.__cache
+
+    def getTracer(self):
+        return self.__tracer
+
+    def getRetryPolicy(self):
+        return self.__retry_policy
+
+    def getCircuitBreaker(self):
+        return self.__circuit_breaker
+
     def getStartTime(self):
+        self.getAccessToken()
         return self.__start_time
 
     def getApiLifetime(self):
-        return round(time.time() - self.__start_time, 2)
+        return round(time.time() - self.getStartTime(), 2)
+
+    def _recordCall(self, elapsed):
+        with self.__lock:
+            self.__api_calls += 1
+            self.__last_execution_time = elapsed
+
+    def _encodeBody(self, method, body):
+        """RequestBody for a POST or PUT, None for other methods"""
+        if method not in ('POST', 'PUT'):
+            return None
+
+        return RequestBody(
+            body,
+            compress=self.__compress_requests,
+            min_size=self.__params.get('compress_min_size', 1024),
+            level=self.__params.get('compress_level', 6),
+            stream=self.__stream_requests,
+            chunk_size=self.__params.get('stream_chunk_size', 65536)
+        )
 
     def call(self, method, resource, body=None):
-        if self.getAccessToken() is not None and time.time() > self.getAccessTokenExpiration():
-            self.requestAccessToken()
+        self.getAccessToken()
 
         method = method.upper()
         
         if method not in ('GET','POST','PUT','DELETE'):
             raise ValueError(f'{method} is not an accepted method')
 
-        isRateLimited = False
+        if self.__single_flight is not None and method == 'GET':
+            # Identical GETs already in flight on other threads share that request
+            return Response(self.__single_flight.do(resource, lambda: self.__request(method, resource)))
 
-        while not isRateLimited:
-            if method == 'GET':
-                result = self.__session.get(resource)
-            elif method == 'POST':
-                result = self.__session.post(resource, data=json.dumps(body))
-            elif method == 'PUT':
-                result = self.__session.put(resource, data=json.dumps(body))
-            elif method == 'DELETE':
-                result = self.__session.delete(resource)
+        return Response(self.__request(method, resource, body))
 
-            self.__api_calls += 1
-            self.__last_execution_time = result.elapsed
+    def __request(self, method, resource, body=None):
+        payload = self._encodeBody(method, body)
+        attempts = RequestAttempts(self, method, resource, payload)
+        cached, headers = attempts.lookup()
+        if cached is not None:
+            return cached
+        headers = payload.headers if payload is not None else headers
+
+        while True:
+            attempts.before()
+
+            try:
+                if self.__rate_limiter is not None:
+                    self.__rate_limiter.acquire()
+
+                data = payload.getData() if payload is not None else None
+                attempts.sending()
+                authorization = self.__session.headers.get('Authorization')
+                result = self.__session.request(method, resource, data=data, headers=headers, timeout=self.__timeout)
+            except TRANSIENT_ERRORS as e:
+                wait = attempts.onError(e)
+                if wait is None:
+                    raise
+                time.sleep(wait)
+                continue
+            except BaseException:
+                attempts.abort()
+                raise
+
+            attempts.onResponse(result)
+
+            token = authorization.replace('Bearer ', '', 1) if authorization is not None else None
+            if attempts.shouldRenew(result, token):
+                # The token was revoked or expired early, replay once with a fresh one
+                if self.__applyAccessToken(self.__token_provider.renew(token)) is None:
+                    break
+                continue
+
+            wait = attempts.getRetryWait(result)
+            if wait is None:
+                break
+            time.sleep(wait)
+
+        return attempts.finish(result)
+
+    def __runJob(self, method, resource, args=(), body=None, params=None):
+        kwargs = {}
+        if body is not None:
+            kwargs['body'] = body
+        if params is not None:
+            kwargs['params'] = params
+        return getattr(self, resource)(method, *args, **kwargs)
+
+    def call_many(self, jobs, max_workers=None):
+        """Run (method, resource, args, body[, params]) jobs on a thread pool
+        Results are returned in input order, a failed job returns its exception instead of a Response
+        max_workers is capped at the session's pool_maxsize, more threads could not reuse pooled connections
+        """
+        with ThreadPoolExecutor(max_workers=min(max_workers or self.__batch_workers, self.__pool_size)) as executor:
+            futures = [executor.submit(self.__runJob, *job) for job in jobs]
+
+        results = []
+        for future in futures:
+            error = future.exception()
+            results.append(error if error is not None else future.result())
 
-            if result.status_code == 429 and self.__rate_limit_retry == True:
-                print(f'Rate Limited for {resource}, waiting 60 seconds to retry...')
-                time.sleep(60)
-            else:
-                isRateLimited = True
+        return results
 
-        return Response(result)
+    def map_resource(self, method, resource, args_list, *, body=None, params=None, max_workers=None):
+        """Call one resource method for every args tuple in args_list, see call_many"""
+        jobs = [(method, resource, args if isinstance(args, (tuple, list)) else (args,), body, params) for args in args_list]
+        return self.call_many(jobs, max_workers)
 
     @abstractmethod
     def describeResources(self):
@@ -0,0 +1,127 @@
+from .ratelimit import getRateLimitWait
+
+
+class RequestAttempts:
+    """What happens around the sends of one request, shared by the sync and async clients
+
+    The clients only perform the I/O: they send, wait and renew tokens the
+    way their transport needs, while this object feeds the circuit breaker,
+    metrics, tracer, rate limiter and response cache and decides whether a
+    response or transient error is retried, after how long, and whether a
+    401 gets a fresh token. One instance is used for one request.
+    """
+    def __init__(self, client, method, resource, payload=None):
+        params = client.getParams()
+        self.__client = client
+        self.__method = method
+        self.__resource = resource
+        self.__payload = payload
+        self.__limiter = client.getRateLimiter()
+        self.__policy = client.getRetryPolicy()
+        self.__breaker = client.getCircuitBreaker()
+        self.__metrics = client.getMetrics()
+        self.__tracer = client.getTracer()
+        self.__cache = client.getCache() if method == 'GET' else None
+        self.__rate_limit_retry = params.get('rate_limit_retry', False)
+        self.__rate_limit_max_retries = params.get('rate_limit_max_retries', 5)
+        self.__attempt = 0
+        self.__rate_limited = 0
+        self.__reauthorized = False
+        self.__trial = False
+        self.__cached = None
+
+    def lookup(self):
+        """Cached result of a fresh GET or None, (result, conditional request headers)"""
+        if self.__cache is None:
+            return None, {}
+        self.__cached, fresh = self.__cache.lookup(self.__resource)
+        if fresh:
+            return self.__cached.result, {}
+        return None, self.__cache.getValidators(self.__cached)
+
+    def before(self):
+        """Call before each send, raises CircuitOpenError while the breaker rejects requests"""
+        self.__trial = self.__breaker.before() if self.__breaker is not None else False
+
+    def sending(self):
+        """Call right before the request goes out, after any rate limit wait"""
+        if self.__metrics is not None:
+            self.__metrics.onRequest(self.__method, self.__resource, self.__payload)
+
+    def abort(self):
+        """Call when sending raised anything but a transient error, frees a half-open trial slot"""
+        if self.__trial:
+            self.__breaker.release()
+
+    def onError(self, error):
+        """Record a transient error, returns the backoff before sending again or None to raise it"""
+        if self.__breaker is not None:
+            self.__breaker.recordFailure()
+
+        if self.__metrics is not None:
+            self.__metrics.onError(self.__method, self.__resource, error)
+
+        if self.__tracer is not None:
+            self.__tracer.onError(self.__method, self.__resource, error)
+
+        if self.__policy is None or not self.__policy.shouldRetry(self.__method, self.__attempt):
+            return None
+        return self.__retry()
+
+    def onResponse(self, result):
+        """Record a response with the breaker, call counters, metrics, tracer and rate limiter"""
+        if self.__breaker is not None:
+            if result.status_code >= 500:
+                self.__breaker.recordFailure()
+            else:
+                self.__breaker.recordSuccess()
+
+        self.__client._recordCall(result.elapsed)
+
+        if self.__metrics is not None:
+            self.__metrics.onResponse(self.__method, self.__resource, result, result.elapsed.total_seconds(),
+                                      self.__payload.size if self.__payload is not None else 0)
+
+        if self.__tracer is not None:
+            self.__tracer.onResponse(self.__method, self.__resource, result)
+
+        if self.__limiter is not None:
+            self.__limiter.updateFromHeaders(result.headers)
+
+    def shouldRenew(self, result, token):
+        """True once per request when the token was rejected, the client then renews it and sends again"""
+        if result.status_code != 401 or self.__reauthorized or token is None:
+            return False
+        self.__reauthorized = True
+        return True
+
+    def getRetryWait(self, result):
+        """Seconds to wait before sending again, None when result is final"""
+        if result.status_code == 429 and self.__rate_limit_retry == True and self.__rate_limited < self.__rate_limit_max_retries:
+            wait = getRateLimitWait(result.headers, self.__limiter, self.__rate_limited)
+            self.__rate_limited += 1
+            if wait > 0:
+                print(f'Rate Limited for {self.__resource}, waiting {wait} seconds to retry...')
+            return wait
+
+        if self.__policy is not None and self.__policy.shouldRetry(self.__method, self.__attempt, result.status_code):
+            return self.__retry()
+        return None
+
+    def __retry(self):
+        if self.__metrics is not None:
+            self.__metrics.onRetry(self.__method, self.__resource)
+        wait = self.__policy.getBackoff(self.__attempt)
+        self.__attempt += 1
+        return wait
+
+    def finish(self, result):
+        """Store or invalidate the cached entry for the final result and return the result to hand back"""
+        cache = self.__client.getCache()
+        if cache is None:
+            return result
+        if self.__method == 'GET':
+            return cache.store(self.__resource, result, self.__cached)
+        if result.status_code < 400:
+            cache.invalidate(self.__resource)
+        return result
@@ -0,0 +1,138 @@
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class RecordResult:
+    """Outcome of writing the input at position index"""
+    def __init__(self, index, id=None, status_code=None, error=None):
+        self.index = index
+        self.id = id
+        self.status_code = status_code
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return f'RecordResult(index={self.index}, id={self.id}, status_code={self.status_code}, error={self.error!r})'
+
+
+class BulkReport:
+    """Per input results of a bulk write, in input order"""
+    def __init__(self, results):
+        self.results = sorted(results, key=lambda result: result.index)
+
+    @property
+    def ok(self):
+        return all(result.ok for result in self.results)
+
+    def getSucceeded(self):
+        return [result for result in self.results if result.ok]
+
+    def getFailed(self):
+        return [result for result in self.results if not result.ok]
+
+    def getIds(self):
+        """Record id for every input position, None where the write failed"""
+        return [result.id if result.ok else None for result in self.results]
+
+    def __len__(self):
+        return len(self.results)
+
+    def __repr__(self):
+        return f'BulkReport({len(self.getSucceeded())} succeeded, {len(self.getFailed())} failed)'
+
+
+def iterChunks(items, chunk_size):
+    """Yield (start index, list) chunks of an iterable without materializing it"""
+    items = iter(items)
+    start = 0
+    while chunk := list(islice(items, chunk_size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+def getResponseIds(result):
+    response = result.response
+    if not isinstance(response, list):
+        response = [response]
+    return [item.get('id') if isinstance(item, dict) else None for item in response]
+
+
+def writeChunk(request, parse, start, chunk, isolate_failures=True):
+    """Send one chunk and return its RecordResults
+
+    A chunk rejected with a 4xx other than 429 is split in halves and
+    resent, so a single invalid record only fails itself.
+    """
+    try:
+        result = request(chunk)
+    except Exception as e:
+        return [RecordResult(start + i, error=repr(e)) for i in range(len(chunk))]
+
+    if 200 <= result.status_code < 300:
+        return parse(start, chunk, result)
+
+    if isolate_failures and len(chunk) > 1 and 400 <= result.status_code < 500 and result.status_code != 429:
+        middle = len(chunk) // 2
+        return (writeChunk(request, parse, start, chunk[:middle], isolate_failures) +
+                writeChunk(request, parse, start + middle, chunk[middle:], isolate_failures))
+
+    return [RecordResult(start + i, status_code=result.status_code, error=result.response or str(result.status_code)) for i in range(len(chunk))]
+
+
+def bulkWrite(request, parse, items, chunk_size=100, max_workers=10, isolate_failures=True):
+    """Split items into chunks, send them concurrently and collect a BulkReport
+
+    request(chunk) sends one chunk and returns its Response, parse(start,
+    chunk, result) turns a successful Response into RecordResults. At most
+    2 * max_workers chunks are held in memory at a time.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for start, chunk in iterChunks(items, chunk_size):
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results += future.result()
+            pending.add(executor.submit(writeChunk, request, parse, start, chunk, isolate_failures))
+
+        for future in pending:
+            results += future.result()
+
+    return BulkReport(results)
+
+
+def parseCreated(start, chunk, result):
+    """Created ids come back in input order"""
+    ids = getResponseIds(result)
+    return [
+        RecordResult(start + i, ids[i], result.status_code) if i < len(ids) and ids[i] is not None
+        else RecordResult(start + i, status_code=result.status_code, error='No id returned')
+        for i in range(len(chunk))
+    ]
+
+
+def parseMatched(start, ids, result, error):
+    """Map the ids the server reports back to the positions of the requested ids"""
+    returned = {str(id) for id in getResponseIds(result)}
+    return [
+        RecordResult(start + i, id, result.status_code) if str(id) in returned
+        else RecordResult(start + i, id, result.status_code, error)
+        for i, id in enumerate(ids)
+    ]
+
+
+def parseUpdated(start, chunk, result):
+    return parseMatched(start, [record.get('id') for record in chunk], result, 'Not updated')
+
+
+def parseDeleted(start, chunk, result):
+    return parseMatched(start, chunk, result, 'Not deleted')
+
+
+def getIdFilter(ids):
+    """Field grammar selecting exactly the given ids, e.g. id((="1")|(="2"))"""
+    return 'id(%s)' % '|'.join(f'(="{id}")' for id in ids)
@@ -0,0 +1,119 @@
+import time
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from .metrics import getEndpoint
+
+METADATA_TTLS = {
+    'pages': 300,
+    'elements': 300,
+    'optionlists': 300,
+    'options': 300
+}
+
+
+def getCollection(url):
+    """Name of the resource collection a URL points into, e.g. elements for .../pages/1/elements/2"""
+    segments = [segment for segment in getEndpoint(url).split('/') if segment != '{id}']
+    return segments[-1] if segments else None
+
+
+class CacheEntry:
+    def __init__(self, result, expires):
+        self.result = result
+        self.expires = expires
+        self.etag = result.headers.get('ETag')
+        self.last_modified = result.headers.get('Last-Modified')
+
+
+class ResponseCache:
+    """LRU cache of GET responses with a TTL per resource collection
+
+    Only collections listed in ttls are cached, by default the metadata
+    resources in METADATA_TTLS. Expired entries that came with an ETag or
+    Last-Modified header are revalidated with a conditional request instead
+    of being fetched again. Any POST, PUT or DELETE drops the cached entries
+    under the path it wrote to.
+    """
+    def __init__(self, ttls=METADATA_TTLS, maxsize=1024):
+        self.__ttls = dict(ttls)
+        self.__maxsize = maxsize
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def getTTL(self, url):
+        return self.__ttls.get(getCollection(url))
+
+    def lookup(self, url):
+        """Return (entry, is_fresh), entry is None on a miss"""
+        if self.getTTL(url) is None:
+            return None, False
+
+        with self.__lock:
+            entry = self.__entries.get(url)
+            if entry is None:
+                return None, False
+
+            self.__entries.move_to_end(url)
+            if time.monotonic() < entry.expires:
+                return entry, True
+
+            if entry.etag is None and entry.last_modified is None:
+                del self.__entries[url]
+                return None, False
+
+            return entry, False
+
+    def getValidators(self, entry):
+        """Conditional request headers for revalidating a stale entry"""
+        headers = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified is not None:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url, result, entry=None):
+        """Cache a GET result and return the result to hand back to the caller
+        A 304 answer to a revalidation renews entry and returns its cached result
+        """
+        ttl = self.getTTL(url)
+        if ttl is None:
+            return result
+
+        with self.__lock:
+            if result.status_code == 304 and entry is not None:
+                entry.expires = time.monotonic() + ttl
+                self.__entries[url] = entry
+                self.__entries.move_to_end(url)
+                return entry.result
+
+            if result.status_code == 200:
+                self.__entries[url] = CacheEntry(result, time.monotonic() + ttl)
+                self.__entries.move_to_end(url)
+                while len(self.__entries) > self.__maxsize:
+                    self.__entries.popitem(last=False)
+
+        return result
+
+    def invalidate(self, url):
+        """Drop every cached URL under the collection url writes to"""
+        path = urlsplit(url).path.rstrip('/')
+        segments = path.split('/')
+        if getCollection(url) != segments[-1]:
+            # Writes to a single item, e.g. PUT .../pages/123, also change the collection listing
+            path = '/'.join(segments[:-1])
+
+        with self.__lock:
+            for key in list(self.__entries):
+                key_path = urlsplit(key).path.rstrip('/')
+                if key_path == path or key_path.startswith(path + '/'):
+                    del self.__entries[key]
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
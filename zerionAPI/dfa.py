@@ -1,73 +1,98 @@
 import re
-import inspect
-import urllib.parse
 import json
-from pprint import pprint
-from .api import API, Response
+from .api import API
+from .resources import resourceMethods, dfaQuery
 
+@resourceMethods(dfaQuery)
 class DFA(API):
     def __init__(self, server, client_key, client_secret, params={}):
         super().__init__(server, client_key, client_secret, params)
 
         self.__server = server
         self.__isQA = True if params.get('isQA',False) or self.__server == 'qatest' or re.search(r'^support', self.__server) else False
-        self.__host = f'https://{"qa-dataflownode" if self.__isQA else "dataflownode"}.zerionsoftware.com/zcrypt/v1.0'
+        self.__base_url = params.get('base_url', f'https://{"qa-dataflownode" if self.__isQA else "dataflownode"}.zerionsoftware.com')
+        self.__host = f'{self.__base_url}/zcrypt/v1.0'
 
     __resources = {
+        # Dataflow Resources: https://gnosiz.docs.apiary.io/reference/dataflows-resource
         'Dataflows': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'dataflows'
+            'URI': 'dataflows',
+            'Path': (),
+            'Id': 'dataflow_id',
+            'Keywords': ('body', 'params')
         },
         'DataflowCount': {
-            'Methods': ('GET'),
+            'Methods': ('GET',),
             'URI': 'dataflows/count'
         },
         'DataflowExport': {
-            'Methods': ('POST'),
+            'Methods': ('POST',),
             'URI': 'dataflows/%s/export'
         },
         'DataflowImport': {
-            'Methods': ('POST'),
+            'Methods': ('POST',),
             'URI': 'dataflows/import'
         },
         'RecordSets': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'dataflows/%s/recordsets'
+            'URI': 'dataflows/%s/recordsets',
+            'Path': ('dataflow_id',),
+            'Id': 'recordset_id',
+            'Keywords': ('body', 'params')
         },
         'RecordSetLinks': {
-            'Methods': ('POST'),
+            'Methods': ('POST',),
             'URI': 'dataflows/%s/recordsets/%s/postactions'
         },
         'Records': {
             'Methods': ('GET', 'DELETE'),
-            'URI': 'dataflows/%s/recordsets/%s/records'
+            'URI': 'dataflows/%s/recordsets/%s/records',
+            'Path': ('dataflow_id', 'recordset_id'),
+            'Id': 'record_id',
+            'Keywords': ('body', 'params')
         },
         'Webhooks': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'dataflows/%s/recordsets/%s/webhooks'
+            'URI': 'dataflows/%s/recordsets/%s/webhooks',
+            'Path': ('dataflow_id', 'recordset_id'),
+            'Id': 'webhook_id',
+            'Keywords': ('body', 'params')
         },
         'Actions': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'dataflows/%s/recordsets/%s/postactions'
+            'URI': 'dataflows/%s/recordsets/%s/postactions',
+            'Path': ('dataflow_id', 'recordset_id'),
+            'Id': 'action_id',
+            'Keywords': ('body', 'params')
         },
         'ActionErrors': {
-            'Methods': ('GET'),
-            'URI': 'dataflows/%s/recordsets/%s/postactions/%s/errors'
+            'Methods': ('GET',),
+            'URI': 'dataflows/%s/recordsets/%s/postactions/%s/errors',
+            'Path': ('dataflow_id', 'recordset_id', 'action_id'),
+            'Id': None,
+            'Keywords': ('body', 'params')
         },
         'RerunActionErrors': {
-            'Methods': ('POST'),
-            'URI': 'dataflows/%s/recordsets/%s/postactions/%s/rerunErrorMessages'
+            'Methods': ('POST',),
+            'URI': 'dataflows/%s/recordsets/%s/postactions/%s/rerunErrorMessages',
+            'Path': ('dataflow_id', 'recordset_id', 'action_id'),
+            'Id': None,
+            'Keywords': ('body', 'params')
         },
         'Events': {
-            'Methods': ('GET'),
-            'URI': 'dataflows/%s/recordsets/%s/events'
+            'Methods': ('GET',),
+            'URI': 'dataflows/%s/recordsets/%s/events',
+            'Path': ('dataflow_id', 'recordset_id'),
+            'Id': 'event_id',
+            'Keywords': ('body', 'params')
         }
     }
 
     def __methodCheck(self, method, resource):
         if method.upper() not in self.__resources[resource]['Methods']:
             raise ValueError(f'The "{method}" is not allowed for {resource}')
-    
+
     def __getResourceURI(self, resource):
         return self.__resources[resource]['URI']
 
@@ -76,12 +101,9 @@ class DFA(API):
 
         if resource_id is not None:
             resource += f'/{resource_id}'
-        
-        if params is not None and len(params) > 0:
 
-            for key in params:
-                if params[key] is not None:
-                    resource += f'/{key}/{params[key]}'
+        if params:
+            resource += dfaQuery(params)
 
         return resource
 
@@ -92,92 +114,26 @@ class DFA(API):
         return self.__resources.get(resource, 'Resource is not defined')
 
     """
-    Dataflow Resources: https://gnosiz.docs.apiary.io/reference/dataflows-resource
+    Resource methods not listed below are generated from __resources by resourceMethods
     """
-    def Dataflows(self, method, dataflow_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = f'{self.__getResourceURI(resource)}'
-        request = self.__completeURI(request, dataflow_id, params)
-        print(request)
-        return API.call(self, method, request, body)
-
     def DataflowCount(self, dataflow_name):
-        resource = inspect.currentframe().f_code.co_name
-        request = f'{self.__getResourceURI(resource)}'
-        request = self.__completeURI(request, dataflow_name, {})
-        print(request)
-        return API.call(self, 'GET', request)
+        request = self.__completeURI(self.__getResourceURI('DataflowCount'), dataflow_name)
+        return self.call('GET', request)
 
     def DataflowExport(self, dataflow_id):
-        resource = inspect.currentframe().f_code.co_name
-        request = f'{self.__getResourceURI(resource)}' % dataflow_id
-        request = self.__completeURI(request, None, {})
-        return API.call(self, 'POST', request, {})
+        request = self.__completeURI(self.__getResourceURI('DataflowExport') % dataflow_id)
+        return self.call('POST', request, {})
 
     def DataflowImport(self, body):
-        resource = inspect.currentframe().f_code.co_name
-        request = f'{self.__getResourceURI(resource)}'
-        request = self.__completeURI(request, None, {})
+        request = self.__completeURI(self.__getResourceURI('DataflowImport'))
         body = {
             'requestedServer': self.__host.split('/zcrypt')[0],
             'content': json.dumps(body)
         }
-        return API.call(self, 'POST', request, body)
-
-    def RecordSets(self, method, dataflow_id, recordset_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(inspect.currentframe().f_code.co_name) % dataflow_id
-        request = self.__completeURI(request, recordset_id, params)
-        print(request)
-        return API.call(self, method, request, body)
+        return self.call('POST', request, body)
 
     def RecordSetLinks(self, method, dataflow_id, recordset_id, destination_recordset_id):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (dataflow_id, recordset_id)
+        self.__methodCheck(method, 'RecordSetLinks')
+        request = self.__getResourceURI('RecordSetLinks') % (dataflow_id, recordset_id)
         request = self.__completeURI(request)
-        return API.call(self, method, request, {'actionType': 'pushrs', 'actionOutputRecordSetId': destination_recordset_id})
-
-    def Records(self, method, dataflow_id, recordset_id, record_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (dataflow_id, recordset_id)
-        request = self.__completeURI(request, record_id, params)
-        return API.call(self, method, request, body)
-
-    def Webhooks(self, method, dataflow_id, recordset_id, webhook_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (dataflow_id, recordset_id)
-        request = self.__completeURI(request, webhook_id, params)
-        return API.call(self, method, request, body)
-
-    def Actions(self, method, dataflow_id, recordset_id, action_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (dataflow_id, recordset_id)
-        request = self.__completeURI(request, action_id, params)
-        return API.call(self, method, request, body)
-
-    def ActionErrors(self, method, dataflow_id, recordset_id, action_id, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (dataflow_id, recordset_id, action_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request, body)
-
-    def RerunActionErrors(self, method, dataflow_id, recordset_id, action_id, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (dataflow_id, recordset_id, action_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request, body)
-
-    def Events(self, method, dataflow_id, recordset_id, event_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (dataflow_id, recordset_id)
-        request = self.__completeURI(request, event_id, params)
-        return API.call(self, method, request, body)
\ No newline at end of file
+        return self.call(method, request, {'actionType': 'pushrs', 'actionOutputRecordSetId': destination_recordset_id})
@@ -0,0 +1,44 @@
+SUBFORM = 18
+# Labels, dividers and image labels hold no record data
+NO_DATA = (16, 17, 35)
+# Python type of the values of number, range and toggle elements, everything else is text
+VALUE_TYPES = {
+    2: 'float',
+    6: 'int',
+    10: 'float'
+}
+
+
+def getElements(ifb, profile_id, page_id):
+    """Elements of a page in form order, from the profile's SchemaIndex when the client keeps one"""
+    schema = ifb.getSchemaIndex(profile_id)
+    if schema is not None and schema.hasPage(page_id):
+        return schema.getElements(page_id)
+
+    elements = list(ifb.iter_elements(profile_id, page_id, fields='name,data_type,data_size,sort_order'))
+    return sorted(elements, key=lambda element: element.get('sort_order') or 0)
+
+
+def getPageName(ifb, profile_id, page_id):
+    """Name of a page, from the profile's SchemaIndex when the client keeps one"""
+    schema = ifb.getSchemaIndex(profile_id)
+    if schema is not None and schema.hasPage(page_id):
+        return schema.getPageName(page_id)
+
+    result = ifb.Pages('GET', profile_id, page_id, params={'fields': 'name'})
+    if result.status_code != 200:
+        raise ValueError(f'Page {page_id} could not be read: {result.status_code} {result.response}')
+    return result.response['name']
+
+
+def isDataElement(element):
+    """True for elements that store a value in the page's records"""
+    return element['data_type'] not in NO_DATA + (SUBFORM,)
+
+
+def getSubformPageIds(elements):
+    return [element['data_size'] for element in elements if element['data_type'] == SUBFORM]
+
+
+def getValueType(element):
+    return VALUE_TYPES.get(element['data_type'], 'str')
@@ -0,0 +1,292 @@
+import os
+import re
+import csv
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from .serialization import dumps
+from .elements import getElements, getPageName, isDataElement, getSubformPageIds, getValueType
+from .mirror import getTableName
+from .pagination import getTerms
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+BUFFER_SIZE = 1 << 20
+
+
+def toCell(value):
+    """CSV cell for a record value, lists and objects are written as JSON"""
+    if value is None:
+        return ''
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def openFile(path, mode, compress=False, **kwargs):
+    """Open an output file with a 1 MiB write buffer, gzip compressed if compress is set"""
+    if compress:
+        return gzip.open(path, mode.replace('b', '') + ('b' if 'b' in mode else 't'), compresslevel=6, **kwargs)
+    return open(path, mode, buffering=BUFFER_SIZE, **kwargs)
+
+
+class JSONLWriter:
+    """Writes one JSON document per line, only the given columns if columns is set"""
+    def __init__(self, path, columns=None, compress=False):
+        self.__columns = columns
+        self.__file = openFile(path, 'wb', compress)
+
+    def write(self, record):
+        if self.__columns is not None:
+            record = {column: record.get(column) for column in self.__columns}
+        self.__file.write(dumps(record) + b'\n')
+
+    def close(self):
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CSVWriter:
+    """Writes a header row of columns followed by one row per record"""
+    def __init__(self, path, columns, compress=False):
+        self.__columns = columns
+        self.__file = openFile(path, 'w', compress, newline='', encoding='utf-8')
+        self.__writer = csv.writer(self.__file)
+        self.__writer.writerow(columns)
+
+    def write(self, record):
+        self.__writer.writerow([toCell(record.get(column)) for column in self.__columns])
+
+    def close(self):
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetWriter:
+    """Writes records to a Parquet file in row groups of chunk_size records
+
+    types maps columns to 'int', 'float' or 'str'. Columns without a type are
+    written as strings, lists and objects as JSON text. compress selects gzip
+    instead of Parquet's default snappy compression.
+    """
+    ARROW_TYPES = {
+        'int': 'int64',
+        'float': 'float64',
+        'str': 'string'
+    }
+
+    def __init__(self, path, columns, types=None, compress=False, chunk_size=10000):
+        if pyarrow is None:
+            raise ImportError('pyarrow is required for Parquet exports: pip install zerionAPI[parquet]')
+
+        types = types or {}
+        self.__columns = columns
+        self.__types = {column: types.get(column, 'str') for column in columns}
+        self.__schema = pyarrow.schema([(column, self.ARROW_TYPES[self.__types[column]]) for column in columns])
+        self.__writer = pyarrow.parquet.ParquetWriter(path, self.__schema, compression='gzip' if compress else 'snappy')
+        self.__chunk_size = chunk_size
+        self.__rows = {column: [] for column in columns}
+        self.__count = 0
+
+    def __convert(self, column, value):
+        if value is None or value == '':
+            return None
+        if self.__types[column] == 'str':
+            return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+        try:
+            return int(value) if self.__types[column] == 'int' else float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def write(self, record):
+        for column in self.__columns:
+            self.__rows[column].append(self.__convert(column, record.get(column)))
+        self.__count += 1
+        if self.__count >= self.__chunk_size:
+            self.__flush()
+
+    def __flush(self):
+        if self.__count:
+            self.__writer.write_table(pyarrow.Table.from_pydict(self.__rows, schema=self.__schema))
+            self.__rows = {column: [] for column in self.__columns}
+            self.__count = 0
+
+    def close(self):
+        self.__flush()
+        self.__writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def checkFormat(format):
+    if format not in FORMATS:
+        raise ValueError(f'Unsupported export format {format}, expected one of {", ".join(FORMATS)}')
+
+
+def openWriter(path, format, columns, compress=False, types=None):
+    checkFormat(format)
+    if format == 'jsonl':
+        return JSONLWriter(path, columns, compress)
+    if format == 'csv':
+        return CSVWriter(path, columns, compress)
+    return ParquetWriter(path, columns, types, compress)
+
+
+class FormNode:
+    """A page of a form tree with its data columns, their value types and subform pages"""
+    def __init__(self, page_id, name, columns, parent=None, types=None):
+        self.page_id = page_id
+        self.name = name
+        self.columns = columns
+        self.types = types or {}
+        self.parent = parent
+        self.children = []
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    def getLevels(self):
+        """Nodes of the tree grouped by depth, root first"""
+        levels, level = [], [self]
+        while level:
+            levels.append(level)
+            level = [child for node in level for child in node.children]
+        return levels
+
+    def __repr__(self):
+        return f'FormNode({self.page_id}, {self.name!r}, {len(self.children)} subforms)'
+
+
+def resolveFormTree(ifb, profile_id, page_id, max_workers=10):
+    """Read the page and element metadata of a form and its nested subforms once
+
+    The pages of each depth are read concurrently. A subform page is only
+    resolved the first time it is seen.
+    """
+    def resolve(page_id):
+        elements = getElements(ifb, profile_id, page_id)
+        return getPageName(ifb, profile_id, page_id), elements, getSubformPageIds(elements)
+
+    seen = {page_id}
+    root = None
+    level = [(page_id, None)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while level:
+            next_level = []
+            for (page_id, parent), (name, elements, subforms) in zip(level, executor.map(lambda item: resolve(item[0]), level)):
+                columns = [element['name'] for element in elements if isDataElement(element)]
+                node = FormNode(page_id, name, columns, parent, {element['name']: getValueType(element) for element in elements})
+                if parent is None:
+                    root = node
+                else:
+                    parent.children.append(node)
+
+                for subform_page_id in subforms:
+                    if subform_page_id not in seen:
+                        seen.add(subform_page_id)
+                        next_level.append((subform_page_id, node))
+            level = next_level
+
+    return root
+
+
+def writeRecords(records, writer, transform=None):
+    """Write records through an optional transform, which may return None to drop a record
+    Returns the number of records written
+    """
+    count = 0
+    for record in records:
+        if transform is not None:
+            record = transform(record)
+            if record is None:
+                continue
+        writer.write(record)
+        count += 1
+    return count
+
+
+def exportPage(ifb, profile_id, node, path, format='jsonl', page_size=1000, compress=False):
+    """Stream every record of one form tree page into a file, returns the number of records"""
+    columns = ['id'] + (['parent_record_id', 'parent_page_id'] if node.parent is not None else []) + node.columns
+    fields = ','.join(column for column in columns if column != 'id')
+    types = dict(node.types, id='int', parent_record_id='int', parent_page_id='int')
+
+    with openWriter(path, format, columns, compress, types) as writer:
+        return writeRecords(ifb.iter_records(profile_id, node.page_id, fields=fields, page_size=page_size), writer)
+
+
+def getFormat(path):
+    """Export format and compression implied by a file name such as records.csv.gz"""
+    name = path[:-3] if path.endswith('.gz') else path
+    return name.rsplit('.', 1)[-1].lower(), path.endswith('.gz')
+
+
+def exportRecords(ifb, profile_id, page_id, path, *, format=None, compress=None, fields=None, columns=None,
+                  transform=None, page_size=1000):
+    """Stream the records of a page into a JSONL, CSV or Parquet file with flat memory use
+
+    format and compress default to what the file name implies, e.g.
+    records.jsonl.gz. CSV and Parquet columns default to id followed by the
+    page's data elements in form order, or the names in fields when given.
+    transform(record) may reshape each record or return None to skip it.
+    Returns the number of records written.
+    """
+    implied_format, implied_compress = getFormat(path)
+    format = format or implied_format
+    compress = implied_compress if compress is None else compress
+    checkFormat(format)
+
+    elements = getElements(ifb, profile_id, page_id)
+    types = {element['name']: getValueType(element) for element in elements}
+    types['id'] = 'int'
+
+    if fields is None:
+        fields = ','.join(element['name'] for element in elements if isDataElement(element))
+    terms = getTerms(fields)
+    if columns is None:
+        names = [re.split(r'[(:]', term, 1)[0].strip() for term in terms]
+        columns = ['id'] + [name for name in names if name != 'id']
+
+    records = ifb.iter_records(profile_id, page_id, fields=terms, page_size=page_size)
+    with openWriter(path, format, None if format == 'jsonl' and transform is not None else columns, compress, types) as writer:
+        return writeRecords(records, writer, transform)
+
+
+def exportFormTree(ifb, profile_id, page_id, directory, *, format='jsonl', compress=False, page_size=1000, max_workers=None):
+    """Export a form and all nested subforms, one file per page named <page name>_<page id>
+
+    Subform records carry parent_record_id and parent_page_id so they can be
+    joined back to their parent. The pages of each depth are exported
+    concurrently and only one page of records per worker is held in memory.
+    compress gzips JSONL and CSV files and switches Parquet to gzip.
+    Returns {file path: number of records}.
+    """
+    checkFormat(format)
+
+    max_workers = max_workers or ifb.getBatchWorkers()
+    os.makedirs(directory, exist_ok=True)
+    tree = resolveFormTree(ifb, profile_id, page_id, max_workers)
+    counts = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for level in tree.getLevels():
+            paths = [os.path.join(directory, f'{getTableName(node.name)}_{node.page_id}.{format}{".gz" if compress and format != "parquet" else ""}') for node in level]
+            counts.update(zip(paths, executor.map(lambda node, path: exportPage(ifb, profile_id, node, path, format, page_size, compress), level, paths)))
+
+    return counts
@@ -1,8 +1,17 @@
 import re
-import urllib.parse
-import inspect
 from .api import API
-
+from .resources import resourceMethods, ifbQuery
+from .pagination import iterItems, planPartitions, scanBatches
+from .bulk import bulkWrite, parseCreated, parseUpdated, parseDeleted, getIdFilter
+from .sync import RecordSync
+from .export import exportFormTree, exportRecords
+from .elements import getElements, isDataElement, getValueType
+from .recordset import RecordSet
+from .schema import SchemaIndex
+from .query import Query
+from .options import syncOptionList
+
+@resourceMethods(ifbQuery)
 class IFB(API):
     def __init__(self, server, client_key, client_secret, params={}):
         super().__init__(server, client_key, client_secret, params)
@@ -11,137 +20,242 @@ class IFB(API):
         self.__version = params.get('version', 8.0)
         self.__region = params.get('region', 'us')
         self.__rate_limit_retry = params.get('rate_limit_retry',False)
-        self.__host = f'https://{self.__region+"-api" if self.__region != "us" else "api"}.iformbuilder.com/exzact/api/v{str(self.__version).replace(".","")}/{self.__server}'
+        self.__base_url = params.get('base_url', f'https://{self.__region+"-api" if self.__region != "us" else "api"}.iformbuilder.com')
+        self.__host = f'{self.__base_url}/exzact/api/v{str(self.__version).replace(".","")}/{self.__server}'
+        self.__schemas = {}
 
     __resources = {
+        # Profile Resources: https://iformbuilder80.docs.apiary.io/reference/profile-resource
         'Profiles': {
             'Methods': ('POST', 'GET', 'PUT'),
-            'URI': 'profiles'
+            'URI': 'profiles',
+            'Path': (),
+            'Id': 'profile_id',
+            'Keywords': ('body', 'params')
         },
         'CompanyInfo': {
             'Methods': ('GET', 'PUT'),
-            'URI': 'profiles/%s/company_info'
+            'URI': 'profiles/%s/company_info',
+            'Path': ('profile_id',),
+            'Id': None,
+            'Keywords': ('body',)
         },
+        # User Resources: https://iformbuilder80.docs.apiary.io/reference/user-resource
         'Users': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/users'
+            'URI': 'profiles/%s/users',
+            'Path': ('profile_id',),
+            'Id': 'user_id',
+            'Keywords': ('body', 'params')
         },
         'UserPageAssignments': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/users/%s/page_assignments'
+            'URI': 'profiles/%s/users/%s/page_assignments',
+            'Path': ('profile_id', 'user_id'),
+            'Id': 'page_id',
+            'Keywords': ('body', 'params')
         },
         'UserRecordAssignments': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/users/%s/record_assignments'
+            'URI': 'profiles/%s/users/%s/record_assignments',
+            'Path': ('profile_id', 'user_id'),
+            'Id': 'record_id',
+            'Keywords': ('body', 'params')
         },
+        # User Group Resources: https://iformbuilder80.docs.apiary.io/reference/user-group-resource
         'UserGroups': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/user_groups'
+            'URI': 'profiles/%s/user_groups',
+            'Path': ('profile_id',),
+            'Id': 'usergroup_id',
+            'Keywords': ('body', 'params')
         },
         'UserGroupUserAssignments': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/user_groups/%s/users'
+            'URI': 'profiles/%s/user_groups/%s/users',
+            'Path': ('profile_id', 'usergroup_id'),
+            'Id': 'user_id',
+            'Keywords': ('body', 'params')
         },
         'UserGroupPageAssignments': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/user_groups%s/page_assignments'
+            'URI': 'profiles/%s/user_groups/%s/page_assignments',
+            'Path': ('profile_id', 'usergroup_id'),
+            'Id': 'page_id',
+            'Keywords': ('body', 'params')
         },
+        # Page Resources: https://iformbuilder80.docs.apiary.io/reference/page-resource
         'Pages': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages'
+            'URI': 'profiles/%s/pages',
+            'Path': ('profile_id',),
+            'Id': 'page_id',
+            'Keywords': ('body', 'params')
         },
         'PageFeeds': {
-            'Methods': ('GET'),
-            'URI': 'profiles/%s/pages/%s/feed'
+            'Methods': ('GET',),
+            'URI': 'profiles/%s/pages/%s/feed',
+            'Path': ('profile_id', 'page_id'),
+            'Id': None,
+            'Keywords': ('params',)
         },
         'PageLocalizations': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/localizations'
+            'URI': 'profiles/%s/pages/%s/localizations',
+            'Path': ('profile_id', 'page_id'),
+            'Id': 'language_code',
+            'Keywords': ('body', 'params')
         },
-        'PageUserAssignments': 
-        {
+        'PageUserAssignments': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/assignments'
+            'URI': 'profiles/%s/pages/%s/assignments',
+            'Path': ('profile_id', 'page_id'),
+            'Id': 'user_id',
+            'Keywords': ('body', 'params')
         },
         'PageRecordAssignments': {
             'Methods': ('GET', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/record_assignments'
+            'URI': 'profiles/%s/pages/%s/record_assignments',
+            'Path': ('profile_id', 'page_id'),
+            'Id': None,
+            'Keywords': ()
         },
         'PageEndpoints': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/http_callbacks'
+            'URI': 'profiles/%s/pages/%s/http_callbacks',
+            'Path': ('profile_id', 'page_id'),
+            'Id': 'endpoint_id',
+            'Keywords': ('body', 'params')
         },
         'PageEmailAlerts': {
             'Methods': ('POST', 'GET', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/email_alerts'
+            'URI': 'profiles/%s/pages/%s/email_alerts',
+            'Path': ('profile_id', 'page_id'),
+            'Id': None,
+            'Keywords': ('body', 'params')
         },
         'PageTriggerPost': {
-            'Methods': ('POST'),
-            'URI': 'profiles/%s/pages/%s/trigger_posts'
+            'Methods': ('POST',),
+            'URI': 'profiles/%s/pages/%s/trigger_posts',
+            'Path': ('profile_id', 'page_id'),
+            'Id': None,
+            'Keywords': ('body',)
         },
         'PageShares': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/shared_page'
+            'URI': 'profiles/%s/pages/%s/shared_page',
+            'Path': ('profile_id', 'page_id'),
+            'Id': None,
+            'Keywords': ('body', 'params')
         },
         'PageDynamicAttributes': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/dynamic_attributes'
+            'URI': 'profiles/%s/pages/%s/dynamic_attributes',
+            'Path': ('profile_id', 'page_id'),
+            'Id': 'dynamic_attribute',
+            'Keywords': ('body', 'params')
         },
+        # Page Group Resources: https://iformbuilder80.docs.apiary.io/reference/page-group-resource
         'PageGroups': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/page_groups'
+            'URI': 'profiles/%s/page_groups',
+            'Path': ('profile_id',),
+            'Id': 'pagegroup_id',
+            'Keywords': ('body', 'params')
         },
         'PageGroupAssignments': {
             'Methods': ('POST', 'GET', 'DELETE'),
-            'URI': 'profiles/%s/page_groups/%s/pages'
+            'URI': 'profiles/%s/page_groups/%s/pages',
+            'Path': ('profile_id', 'pagegroup_id'),
+            'Id': None,
+            'Keywords': ('body', 'params')
         },
         'PageGroupUserAssignments': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/page_groups/%s/assignments'
+            'URI': 'profiles/%s/page_groups/%s/assignments',
+            'Path': ('profile_id', 'pagegroup_id'),
+            'Id': None,
+            'Keywords': ('body', 'params')
         },
+        # Elements Resources: https://iformbuilder80.docs.apiary.io/reference/element-resource
         'Elements': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/elements'
+            'URI': 'profiles/%s/pages/%s/elements',
+            'Path': ('profile_id', 'page_id'),
+            'Id': 'element_id',
+            'Keywords': ('body', 'params')
         },
         'ElementLocalizations': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/elements/%s/localizations'
+            'URI': 'profiles/%s/pages/%s/elements/%s/localizations',
+            'Path': ('profile_id', 'page_id', 'element_id'),
+            'Id': 'language_code',
+            'Keywords': ('body', 'params')
         },
         'ElementDynamicAttributes': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/elements/%s/dynamic_attributes'
+            'URI': 'profiles/%s/pages/%s/elements/%s/dynamic_attributes',
+            'Path': ('profile_id', 'page_id', 'element_id'),
+            'Id': 'dynamic_attribute',
+            'Keywords': ('body', 'params')
         },
+        # Option Lists Resources: https://iformbuilder80.docs.apiary.io/reference/optionlist-resource
         'OptionLists': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE', 'COPY'),
-            'URI': 'profiles/%s/optionlists'
+            'URI': 'profiles/%s/optionlists',
+            'Path': ('profile_id',),
+            'Id': 'optionlist_id',
+            'Keywords': ('body', 'params')
         },
         'Options': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/optionlists/%s/options'
+            'URI': 'profiles/%s/optionlists/%s/options',
+            'Path': ('profile_id', 'optionlist_id'),
+            'Id': 'option_id',
+            'Keywords': ('body', 'params')
         },
         'OptionLocalizations': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/optionlists/%s/options/%s/localizations'
+            'URI': 'profiles/%s/optionlists/%s/options/%s/localizations',
+            'Path': ('profile_id', 'optionlist_id', 'option_id'),
+            'Id': 'language_code',
+            'Keywords': ('body', 'params')
         },
+        # Record Resources: https://iformbuilder80.docs.apiary.io/reference/record-resource
         'Records': {
             'Methods': ('POST', 'GET', 'PUT', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/records'
+            'URI': 'profiles/%s/pages/%s/records',
+            'Path': ('profile_id', 'page_id'),
+            'Id': 'record_id',
+            'Keywords': ('body', 'params')
         },
         'RecordAssignments': {
             'Methods': ('POST', 'GET', 'DELETE'),
-            'URI': 'profiles/%s/pages/%s/records/%s/assignments'
+            'URI': 'profiles/%s/pages/%s/records/%s/assignments',
+            'Path': ('profile_id', 'page_id', 'record_id'),
+            'Id': None,
+            'Keywords': ('body', 'params')
         },
+        # Notification Resources: https://iformbuilder80.docs.apiary.io/reference/notification-resource
         'Notifications': {
-            'Methods': ('POST'),
-            'URI': 'profiles/%s/notifications'
+            'Methods': ('POST',),
+            'URI': 'profiles/%s/notifications',
+            'Path': ('profile_id',),
+            'Id': None,
+            'Keywords': ('body', 'params')
         },
+        # Private Media Resources: https://iformbuilder80.docs.apiary.io/reference/private-media-resource
         'PrivateMedia': {
-            'Methods': ('GET'),
+            'Methods': ('GET',),
             'URI': 'profiles/%s/media'
         },
+        # Device License Resources: https://iformbuilder80.docs.apiary.io/reference/device-license-resource
         'DeviceLicenses': {
-            'Methods': ('GET'),
-            'URI': 'profiles/%s/licenses'
+            'Methods': ('GET',),
+            'URI': 'profiles/%s/licenses',
+            'Path': ('profile_id',),
+            'Id': 'license_id',
+            'Keywords': ('body', 'params')
         }
     }
 
@@ -157,13 +271,9 @@ class IFB(API):
 
         if resource_id is not None:
             resource += f'/{resource_id}'
-        
-        if params is not None and len(params) > 0:
-            resource += '?'
 
-            for key in params:
-                if params[key] is not None:
-                    resource += f'{key}={urllib.parse.quote(params[key])}&'
+        if params:
+            resource += ifbQuery(params)
 
         return resource
 
@@ -177,259 +287,120 @@ class IFB(API):
         return self.__version
 
     """
-    Profile Resources: https://iformbuilder80.docs.apiary.io/reference/profile-resource
-    """
-    def Profiles(self, method, profile_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource)
-        request = self.__completeURI(request, profile_id, params)
-        return API.call(self, method, request, body)
-
-    def CompanyInfo(self, method, profile_id, *, body=None):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
-        request = self.__completeURI(request)
-        return API.call(self, method, request, body)
-
-    """
-    User Resources: https://iformbuilder80.docs.apiary.io/reference/user-resource
-    """
-    def Users(self, method, profile_id, user_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
-        request = self.__completeURI(request, user_id, params)
-        return API.call(self, method, request, body)
-
-    def UserPageAssignments(self, method, profile_id, user_id, page_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, user_id)
-        request = self.__completeURI(request, page_id, params)
-        return API.call(self, method, request, body)
-
-    def UserRecordAssignments(self, method, profile_id, user_id, record_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, user_id)
-        request = self.__completeURI(request, record_id, params)
-        return API.call(self, method, request, body)
-
-    """
-    User Group Resources: https://iformbuilder80.docs.apiary.io/reference/user-group-resource
-    """
-    def UserGroups(self, method, profile_id, usergroup_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
-        request = self.__completeURI(request, usergroup_id, params)
-        return API.call(self, method, request, body)
-
-    def UserGroupUserAssignments(self, method, profile_id, usergroup_id, user_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, usergroup_id)
-        request = self.__completeURI(request, user_id, params)
-        return API.call(self, method, request, body)
-
-    def UserGroupPageAssignments(self, method, profile_id, usergroup_id, page_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, usergroup_id)
-        request = self.__completeURI(request, page_id, params)
-        return API.call(self, method, request, body)
-
-    """
-    Page Resources: https://iformbuilder80.docs.apiary.io/reference/page-resource
-    """
-    def Pages(self, method, profile_id, page_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
-        request = self.__completeURI(request, page_id, params)
-        return API.call(self, method, request, body)
-
-    def PageFeeds(self, method, profile_id, page_id, *, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request)
-
-    def PageLocalizations(self, method, profile_id, page_id, language_code=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, language_code, params)
-        return API.call(self, method, request, body)
-
-    def PageUserAssignments(self, method, profile_id, page_id, user_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, user_id, params)
-        return API.call(self, method, request, body)
-
-    def PageRecordAssignments(self, method, profile_id, page_id):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request)
-        return API.call(self, method, request)
-    
-    def PageEndpoints(self, method, profile_id, page_id, endpoint_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, endpoint_id, params)
-        return API.call(self, method, request, body)
-
-    def PageEmailAlerts(self, method, profile_id, page_id, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request, body)
-
-    def PageTriggerPost(self, method, profile_id, page_id, *, body=None):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request)
-        return API.call(self, method, request, body)
-
-    def PageShares(self, method, profile_id, page_id, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request, body)
-
-    def PageDynamicAttributes(self, method, profile_id, page_id, dynamic_attribute=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, dynamic_attribute, params)
-        return API.call(self, method, request, body)
-
-    """
-    Page Group Resources: https://iformbuilder80.docs.apiary.io/reference/page-group-resource
-    """
-    def PageGroups(self, method, profile_id, pagegroup_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
-        request = self.__completeURI(request, pagegroup_id, params)
-        return API.call(self, method, request, body)
-
-    def PageGroupAssignments(self, method, profile_id, pagegroup_id, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, pagegroup_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request, body)
-
-    def PageGroupUserAssignments(self, method, profile_id, pagegroup_id, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, pagegroup_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request, body)
-
-    """
-    Elements Resources: https://iformbuilder80.docs.apiary.io/reference/element-resource
+    Paginated iterators, each yields the items of a list resource one at a time, see pagination.iterBatches
     """
-    def Elements(self, method, profile_id, page_id, element_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, element_id, params)
-        return API.call(self, method, request, body)
-
-    def ElementLocalizations(self, method, profile_id, page_id, element_id, language_code=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id, element_id)
-        request = self.__completeURI(request, language_code, params)
-        return API.call(self, method, request, body)
-
-    def ElementDynamicAttributes(self, method, profile_id, page_id, element_id, dynamic_attribute=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id, element_id)
-        request = self.__completeURI(request, dynamic_attribute, params)
-        return API.call(self, method, request, body)
+    def iter_users(self, profile_id, *, fields=None, page_size=100, keyset=None, params=None):
+        return iterItems(lambda p: self.Users('GET', profile_id, params=p), fields, page_size, keyset, params)
+
+    def iter_pages(self, profile_id, *, fields=None, page_size=100, keyset=None, params=None):
+        return iterItems(lambda p: self.Pages('GET', profile_id, params=p), fields, page_size, keyset, params)
+
+    def iter_elements(self, profile_id, page_id, *, fields=None, page_size=100, keyset=None, params=None):
+        return iterItems(lambda p: self.Elements('GET', profile_id, page_id, params=p), fields, page_size, keyset, params)
+
+    def iter_option_lists(self, profile_id, *, fields=None, page_size=100, keyset=None, params=None):
+        return iterItems(lambda p: self.OptionLists('GET', profile_id, params=p), fields, page_size, keyset, params)
+
+    def iter_options(self, profile_id, optionlist_id, *, fields=None, page_size=1000, keyset=None, params=None):
+        return iterItems(lambda p: self.Options('GET', profile_id, optionlist_id, params=p), fields, page_size, keyset, params)
+
+    def iter_records(self, profile_id, page_id, *, fields=None, page_size=1000, keyset=None, params=None):
+        return iterItems(lambda p: self.Records('GET', profile_id, page_id, params=p), fields, page_size, keyset, params)
+
+    def scan_records(self, profile_id, page_id, *, fields=None, page_size=1000, partitions=None, max_workers=None, ordered=False, params=None):
+        """Like iter_records, but the records are split into id ranges (or offset windows) that are read concurrently
+        Records are yielded as pages arrive, or in id order when ordered is set
+        """
+        max_workers = max_workers or self.getBatchWorkers()
+        fetch = lambda p: self.Records('GET', profile_id, page_id, params=p)
+        sources = planPartitions(fetch, fields, page_size, partitions or 4 * max_workers, params)
+        for page in scanBatches(sources, max_workers, ordered):
+            yield from page
+
+    def get_record_set(self, profile_id, page_id, *, fields=None, page_size=1000, parallel=False, max_workers=None):
+        """Read the records of a page into a columnar recordset.RecordSet with column types taken from the page's elements
+        fields defaults to every data element, parallel reads the page with scan_records
+        """
+        elements = getElements(self, profile_id, page_id)
+        types = {element['name']: getValueType(element) for element in elements}
+        types.update(id='int', parent_record_id='int')
+
+        if fields is None:
+            fields = ','.join(element['name'] for element in elements if isDataElement(element))
+
+        if parallel:
+            records = self.scan_records(profile_id, page_id, fields=fields, page_size=page_size, max_workers=max_workers, ordered=True)
+        else:
+            records = self.iter_records(profile_id, page_id, fields=fields, page_size=page_size)
+        return RecordSet(records, types)
+
+    def schema_index(self, profile_id, *, path=None, refresh=True, max_workers=None):
+        """Build, or refresh, the schema.SchemaIndex of a profile and keep it on this client
+        While kept, element and page name lookups of the exporters, record sets and mirrors use it instead of the API
+        """
+        schema = self.__schemas.get(profile_id)
+        if schema is None:
+            schema = self.__schemas[profile_id] = SchemaIndex(self, profile_id, path=path, max_workers=max_workers)
+            refresh = refresh or schema.getRefreshedAt() is None
+        if refresh:
+            schema.refresh()
+        return schema
+
+    def getSchemaIndex(self, profile_id):
+        """The SchemaIndex kept for a profile by schema_index, None if there is none"""
+        return self.__schemas.get(profile_id)
+
+    def query(self, profile_id, page_id):
+        """A query.Query for the records of a page, validated against the profile's kept SchemaIndex if there is one
+        Pass it as fields to iter_records, scan_records, export_records or get_record_set, or read it with query.records
+        """
+        return Query(page_id, self.getSchemaIndex(profile_id))
+
+    def sync_records(self, profile_id, page_id, store, **kwargs):
+        """Yield the changes to a page since the watermark in store, see sync.RecordSync for the options"""
+        return RecordSync(self, profile_id, page_id, store, **kwargs).changes()
+
+    def export_records(self, profile_id, page_id, path, **kwargs):
+        """Stream the records of a page into a JSONL, CSV or Parquet file, see export.exportRecords for the options"""
+        return exportRecords(self, profile_id, page_id, path, **kwargs)
+
+    def export_form_tree(self, profile_id, page_id, directory, *, format='jsonl', compress=False, page_size=1000, max_workers=None):
+        """Stream a form and its nested subforms to one file per page, see export.exportFormTree"""
+        return exportFormTree(self, profile_id, page_id, directory, format=format, compress=compress, page_size=page_size, max_workers=max_workers)
 
     """
-    Option Lists Resources: https://iformbuilder80.docs.apiary.io/reference/optionlist-resource
+    Bulk record writes, each returns a bulk.BulkReport with one result per input in input order
     """
-    def OptionLists(self, method, profile_id, optionlist_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
-        request = self.__completeURI(request, optionlist_id, params)
-        return API.call(self, method, request, body)
-
-    def Options(self, method, profile_id, optionlist_id, option_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, optionlist_id)
-        request = self.__completeURI(request, option_id, params)
-        return API.call(self, method, request, body)
-
-    def OptionLocalizations(self, method, profile_id, optionlist_id, option_id, language_code=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, optionlist_id, option_id)
-        request = self.__completeURI(request, language_code, params)
-        return API.call(self, method, request, body)
+    def bulk_create_records(self, profile_id, page_id, records, *, chunk_size=100, max_workers=None, isolate_failures=True):
+        return bulkWrite(
+            lambda chunk: self.Records('POST', profile_id, page_id, body=chunk),
+            parseCreated, records, chunk_size, max_workers or self.getBatchWorkers(), isolate_failures
+        )
+
+    def bulk_update_records(self, profile_id, page_id, records, *, chunk_size=100, max_workers=None, isolate_failures=True):
+        """records must each carry their id"""
+        return bulkWrite(
+            lambda chunk: self.Records('PUT', profile_id, page_id, body=chunk),
+            parseUpdated, records, chunk_size, max_workers or self.getBatchWorkers(), isolate_failures
+        )
+
+    def bulk_delete_records(self, profile_id, page_id, record_ids, *, chunk_size=100, max_workers=None, isolate_failures=True):
+        """record_ids may also be records carrying their id"""
+        return bulkWrite(
+            lambda chunk: self.Records('DELETE', profile_id, page_id, params={'fields': getIdFilter(chunk), 'limit': str(len(chunk))}),
+            parseDeleted, (record['id'] if isinstance(record, dict) else record for record in record_ids),
+            chunk_size, max_workers or self.getBatchWorkers(), isolate_failures
+        )
+
+    def sync_option_list(self, profile_id, optionlist_id, options, **kwargs):
+        """Apply only the creates, updates and deletes that turn an option list into options, see options.syncOptionList"""
+        return syncOptionList(self, profile_id, optionlist_id, options, **kwargs)
 
     """
-    Record Resources: https://iformbuilder80.docs.apiary.io/reference/record-resource
-    """
-    def Records(self, method, profile_id, page_id, record_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id)
-        request = self.__completeURI(request, record_id, params)
-        return API.call(self, method, request, body)
-
-    def RecordAssignments(self, method, profile_id, page_id, record_id, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id, page_id, record_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request, body)
-
-    """
-    Notification Resources: https://iformbuilder80.docs.apiary.io/reference/notification-resource
-    """
-
-    def Notifications(self, method, profile_id, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
-        request = self.__completeURI(request, None, params)
-        return API.call(self, method, request, body)
-
-    """
-    Private Media Resources: https://iformbuilder80.docs.apiary.io/reference/private-media-resource
+    Resource methods not listed below are generated from __resources by resourceMethods
     """
     def PrivateMedia(self, method, profile_id, media_url=None):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
+        self.__methodCheck(method, 'PrivateMedia')
+        request = self.__getResourceURI('PrivateMedia') % (profile_id)
         request = self.__completeURI(request)
-        return API.call(self, method, request, {'URL': media_url})
-
-    """
-    Device License Resources: https://iformbuilder80.docs.apiary.io/reference/device-license-resource
-    """
-
-    def DeviceLicenses(self, method, profile_id, license_id=None, *, body=None, params={}):
-        resource = inspect.currentframe().f_code.co_name
-        self.__methodCheck(method, resource)
-        request = self.__getResourceURI(resource) % (profile_id)
-        return API.call(self, method, request, body)
\ No newline at end of file
+        return self.call(method, request, {'URL': media_url})
@@ -1,8 +1,8 @@
 from zerionAPI import IFB
+from zerionAPI.pagination import ResponseError
 from pprint import pprint
 import json
 import os
-import requests
 import shutil
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -41,23 +41,15 @@ def exportImages(api, profile_id, page_id, isRecursive=False, directory = '.'):
             # Image Element Loop
             if len(image_elements) > 0:
                 print('Getting records...')
-                result = api.Records('GET', profile_id, page['id'], params={'fields': ','.join([e['name'] for e in image_elements])})
+                exported = 0
 
-                if result.status_code == 200 and len(result.response) > 0:
-                    records = result.response
-                    total = int(result.headers.get('Total-Count'))
-
-                    print(f'Retrieved {len(records)}/{total} records...')
-                    while len(records) < total:
-                        result = api.Records('GET', profile_id, page['id'], params={'fields': ','.join([e['name'] for e in image_elements]), 'offset': len(records)})
-                        if result.status_code == 200 and len(result.response) > 0:
-                            records += result.response
-
-                    for record in records:
+                try:
+                    for record in api.iter_records(profile_id, page['id'], fields=','.join([e['name'] for e in image_elements])):
+                        exported += 1
                         record_id = record['id']
                         elements = {key: record[key] for key in record if key != 'id' and record[key] != None}
                         for element in elements:
-                            r = requests.get(record[element], verify=False, stream=True)
+                            r = api.getSession().get(record[element], verify=False, stream=True, timeout=api.getTimeout(), headers={'Authorization': None})
                             r.raw.decode_content = True
 
                             filename = f'{record_id}_{element}.{record[element].split(".")[-1]}'
@@ -65,7 +57,10 @@ def exportImages(api, profile_id, page_id, isRecursive=False, directory = '.'):
                             with open(filepath, 'wb') as f:
                                 print(f'Exporting <{record[element]}> as "{filepath}"')
                                 shutil.copyfileobj(r.raw, f)
-                else:
+                except ResponseError as e:
+                    print(f'Getting records failed: {e}')
+
+                if exported == 0:
                     print('No records found...')
 
             else:
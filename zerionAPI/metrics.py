@@ -0,0 +1,166 @@
+import re
+import math
+import threading
+from collections import deque, defaultdict
+from urllib.parse import urlsplit
+
+ID_SEGMENT = re.compile(r'^(\d+|[0-9a-f]{24})$')
+API_PREFIX = re.compile(r'^/(exzact/api/v\d+/[^/]+|zcrypt/v[\d.]+)')
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def getEndpoint(url):
+    """Collapse a request URL into a resource template, e.g. profiles/{id}/pages/{id}/records"""
+    path = API_PREFIX.sub('', urlsplit(url).path)
+    segments = [segment for segment in path.split('/') if segment]
+    return '/'.join('{id}' if ID_SEGMENT.match(segment) else segment for segment in segments)
+
+
+class EndpointStats:
+    def __init__(self, sample_size):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.status = defaultdict(int)
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.samples = deque(maxlen=sample_size)
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class Metrics:
+    """Per-endpoint, per-method request counters and latency histograms
+
+    One instance can be shared by several clients through the `metrics` param.
+    Request hooks are called as hook(method, url, body) before every attempt
+    and response hooks as hook(method, url, result) after it, where body is
+    the serialization.RequestBody or None and result is the raw HTTP
+    response; a streamed body only knows its size once it has been sent.
+    Latency percentiles are computed from the most recent sample_size
+    requests of each endpoint.
+    """
+    def __init__(self, sample_size=1024):
+        self.__sample_size = sample_size
+        self.__stats = {}
+        self.__request_hooks = []
+        self.__response_hooks = []
+        self.__lock = threading.Lock()
+
+    def addRequestHook(self, hook):
+        self.__request_hooks.append(hook)
+
+    def addResponseHook(self, hook):
+        self.__response_hooks.append(hook)
+
+    def __getStats(self, method, url):
+        key = (method, getEndpoint(url))
+        stats = self.__stats.get(key)
+        if stats is None:
+            stats = self.__stats[key] = EndpointStats(self.__sample_size)
+        return stats
+
+    def onRequest(self, method, url, body=None):
+        for hook in self.__request_hooks:
+            hook(method, url, body)
+
+    def onResponse(self, method, url, result, latency, bytes_out=0):
+        with self.__lock:
+            stats = self.__getStats(method, url)
+            stats.count += 1
+            stats.status[result.status_code] += 1
+            stats.bytes_out += bytes_out
+            stats.bytes_in += len(result.content)
+            stats.latency_sum += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            stats.samples.append(latency)
+
+            if result.status_code == 429:
+                stats.rate_limited += 1
+            if result.status_code >= 400:
+                stats.errors += 1
+
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats.buckets[i] += 1
+
+        for hook in self.__response_hooks:
+            hook(method, url, result)
+
+    def onError(self, method, url, error):
+        with self.__lock:
+            stats = self.__getStats(method, url)
+            stats.count += 1
+            stats.errors += 1
+
+    def onRetry(self, method, url):
+        with self.__lock:
+            self.__getStats(method, url).retries += 1
+
+    def reset(self):
+        with self.__lock:
+            self.__stats = {}
+
+    def snapshot(self):
+        """Return {endpoint: {method: stats}} as plain dicts"""
+        with self.__lock:
+            snapshot = {}
+            for (method, endpoint), stats in sorted(self.__stats.items()):
+                observed = sum(stats.status.values())
+                snapshot.setdefault(endpoint, {})[method] = {
+                    'count': stats.count,
+                    'errors': stats.errors,
+                    'retries': stats.retries,
+                    'rate_limited': stats.rate_limited,
+                    'bytes_in': stats.bytes_in,
+                    'bytes_out': stats.bytes_out,
+                    'status': dict(stats.status),
+                    'latency': {
+                        'mean': stats.latency_sum / observed if observed else None,
+                        'max': stats.latency_max,
+                        'p50': stats.percentile(0.50),
+                        'p95': stats.percentile(0.95),
+                        'p99': stats.percentile(0.99)
+                    }
+                }
+            return snapshot
+
+    def toPrometheus(self, prefix='zerion'):
+        """Render all metrics in the Prometheus text exposition format"""
+        counters = (
+            ('requests_total', 'count'),
+            ('request_errors_total', 'errors'),
+            ('request_retries_total', 'retries'),
+            ('rate_limited_total', 'rate_limited'),
+            ('response_bytes_total', 'bytes_in'),
+            ('request_bytes_total', 'bytes_out')
+        )
+        lines = []
+
+        with self.__lock:
+            series = [(f'method="{method}",endpoint="{endpoint}"', stats) for (method, endpoint), stats in sorted(self.__stats.items())]
+
+            for name, attribute in counters:
+                lines.append(f'# TYPE {prefix}_{name} counter')
+                for labels, stats in series:
+                    lines.append(f'{prefix}_{name}{{{labels}}} {getattr(stats, attribute)}')
+
+            name = f'{prefix}_request_duration_seconds'
+            lines.append(f'# TYPE {name} histogram')
+            for labels, stats in series:
+                observed = sum(stats.status.values())
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {observed}')
+                lines.append(f'{name}_sum{{{labels}}} {stats.latency_sum}')
+                lines.append(f'{name}_count{{{labels}}} {observed}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,180 @@
+import re
+import json
+import sqlite3
+from .sync import RecordSync
+from .elements import getElements, getPageName, isDataElement, getSubformPageIds, getValueType
+
+COLUMN_TYPES = {
+    'float': 'REAL',
+    'int': 'INTEGER',
+    'str': 'TEXT'
+}
+SYSTEM_COLUMNS = {
+    'id': 'INTEGER PRIMARY KEY',
+    'parent_record_id': 'INTEGER',
+    'created_date': 'TEXT',
+    'modified_date': 'TEXT'
+}
+
+
+def getTableName(name):
+    """SQLite table name for an IFB page name"""
+    return re.sub(r'\W', '_', name)
+
+
+def quote(identifier):
+    return '"%s"' % identifier.replace('"', '""')
+
+
+def toColumn(value):
+    """Store lists and objects, e.g. locations or multi selects, as JSON text"""
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+class SQLiteMirror:
+    """Local SQLite copy of IFB pages for offline querying
+
+    sync(page_id) creates one table per page, named <page name>_<page id>,
+    with a column per data element; a renamed page has its table renamed; subform elements get child tables whose
+    parent_record_id column points at the parent table's id. The first sync
+    loads every record, later ones apply only the changes found by
+    sync.RecordSync, whose watermarks live in the same database and are
+    committed in the same transaction as the last batch of rows. Elements
+    added to a page later become new columns on the next sync.
+    """
+    def __init__(self, ifb, profile_id, path, *, batch_size=1000, reconcile_interval=86400):
+        self.__ifb = ifb
+        self.__profile_id = profile_id
+        self.__batch_size = batch_size
+        self.__reconcile_interval = reconcile_interval
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__pending = []
+
+        with self.__connection:
+            self.__connection.execute('CREATE TABLE IF NOT EXISTS zerion_watermarks (key TEXT PRIMARY KEY, watermark TEXT NOT NULL)')
+            self.__connection.execute('CREATE TABLE IF NOT EXISTS zerion_pages (page_id INTEGER PRIMARY KEY, table_name TEXT NOT NULL, parent_page_id INTEGER)')
+
+    def getConnection(self):
+        return self.__connection
+
+    def close(self):
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def query(self, sql, parameters=()):
+        """Run a SELECT against the mirror and return the rows as dicts"""
+        cursor = self.__connection.execute(sql, parameters)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def getTable(self, page_id):
+        row = self.__connection.execute('SELECT table_name FROM zerion_pages WHERE page_id = ?', (page_id,)).fetchone()
+        return row[0] if row else None
+
+    """
+    Watermark store interface for RecordSync, saving a watermark also commits the pending rows
+    """
+    def load(self, key):
+        row = self.__connection.execute('SELECT watermark FROM zerion_watermarks WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, key, watermark):
+        with self.__connection:
+            self.__flush()
+            self.__connection.execute('INSERT OR REPLACE INTO zerion_watermarks (key, watermark) VALUES (?, ?)', (key, json.dumps(watermark)))
+
+    def delete(self, key):
+        with self.__connection:
+            self.__connection.execute('DELETE FROM zerion_watermarks WHERE key = ?', (key,))
+
+    def __createTable(self, page_id, parent_page_id=None):
+        """Create or extend the table for a page, returns (table, data columns, subform page ids)"""
+        table = f'{getTableName(getPageName(self.__ifb, self.__profile_id, page_id))}_{page_id}'
+        stored = self.getTable(page_id)
+        elements = getElements(self.__ifb, self.__profile_id, page_id)
+        columns = {element['name']: COLUMN_TYPES[getValueType(element)] for element in elements if isDataElement(element)}
+        subforms = getSubformPageIds(elements)
+
+        with self.__connection:
+            if stored is not None and stored != table and self.__hasTable(stored):
+                # The page was renamed, its rows and watermark carry over to the new name
+                self.__connection.execute(f'ALTER TABLE {quote(stored)} RENAME TO {quote(table)}')
+                self.__connection.execute(f'DROP INDEX IF EXISTS {quote(f"{stored}_parent_record_id")}')
+
+            definitions = [f'{quote(name)} {type}' for name, type in SYSTEM_COLUMNS.items()]
+            definitions += [f'{quote(name)} {type}' for name, type in columns.items() if name not in SYSTEM_COLUMNS]
+            self.__connection.execute(f'CREATE TABLE IF NOT EXISTS {quote(table)} ({", ".join(definitions)})')
+
+            existing = {row[1] for row in self.__connection.execute(f'PRAGMA table_info({quote(table)})')}
+            for name, type in columns.items():
+                if name not in existing:
+                    self.__connection.execute(f'ALTER TABLE {quote(table)} ADD COLUMN {quote(name)} {type}')
+
+            if parent_page_id is not None:
+                self.__connection.execute(f'CREATE INDEX IF NOT EXISTS {quote(f"{table}_parent_record_id")} ON {quote(table)} (parent_record_id)')
+
+            self.__connection.execute('INSERT OR REPLACE INTO zerion_pages (page_id, table_name, parent_page_id) VALUES (?, ?, ?)', (page_id, table, parent_page_id))
+
+        return table, [name for name in columns if name not in SYSTEM_COLUMNS], subforms
+
+    def __hasTable(self, table):
+        return self.__connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+    def __flush(self):
+        """Write the pending upserts and deletes, the caller holds the transaction"""
+        for sql, rows in self.__pending:
+            self.__connection.executemany(sql, rows)
+        self.__pending = []
+
+    def __queue(self, sql, row):
+        if self.__pending and self.__pending[-1][0] == sql:
+            self.__pending[-1][1].append(row)
+        else:
+            self.__pending.append((sql, [row]))
+
+        if sum(len(rows) for _, rows in self.__pending) >= self.__batch_size:
+            with self.__connection:
+                self.__flush()
+
+    def __knownIds(self, table):
+        with self.__connection:
+            self.__flush()
+        return [row[0] for row in self.__connection.execute(f'SELECT id FROM {quote(table)}')]
+
+    def sync(self, page_id, *, recursive=True, parent_page_id=None):
+        """Load or update the table of a page and, if recursive, its subform tables
+        Returns {table name: {'insert': n, 'update': n, 'delete': n}}
+        """
+        table, data_columns, subforms = self.__createTable(page_id, parent_page_id)
+        columns = list(SYSTEM_COLUMNS) + data_columns
+        upsert = f'INSERT OR REPLACE INTO {quote(table)} ({", ".join(map(quote, columns))}) VALUES ({", ".join("?" * len(columns))})'
+        remove = f'DELETE FROM {quote(table)} WHERE id = ?'
+
+        counts = {'insert': 0, 'update': 0, 'delete': 0}
+        changes = RecordSync(
+            self.__ifb, self.__profile_id, page_id, self,
+            fields=(['parent_record_id'] if parent_page_id is not None else []) + data_columns,
+            known_ids=lambda: self.__knownIds(table),
+            reconcile_interval=self.__reconcile_interval,
+            key=f'mirror/{self.__ifb.getServer()}/{self.__profile_id}/{page_id}'
+        ).changes()
+
+        for kind, record in changes:
+            counts[kind] += 1
+            if kind == 'delete':
+                self.__queue(remove, (record['id'],))
+            else:
+                self.__queue(upsert, tuple(toColumn(record.get(column)) for column in columns))
+
+        results = {table: counts}
+        if recursive:
+            for subform_page_id in subforms:
+                results.update(self.sync(subform_page_id, recursive=True, parent_page_id=page_id))
+        return results
@@ -0,0 +1,131 @@
+from .transport import getPoolSize
+from .bulk import bulkWrite, parseCreated, parseUpdated, parseDeleted, getIdFilter
+
+OPTION_FIELDS = ('key_value', 'label', 'sort_order', 'condition_value')
+
+
+def normalize(value):
+    """Compare option values as text, so 1 and "1" are the same sort_order"""
+    return '' if value is None else str(value)
+
+
+class OptionDiff:
+    """Changes that turn the current options of a list into the desired ones
+
+    creates holds the desired options without a current key_value, updates
+    {'id': id, field: value} with only the fields that differ, deletes the
+    ids of current options whose key_value is no longer desired and of the
+    extra copies of a desired key_value.
+    """
+    def __init__(self, creates, updates, deletes, unchanged):
+        self.creates = creates
+        self.updates = updates
+        self.deletes = deletes
+        self.unchanged = unchanged
+
+    def __len__(self):
+        return len(self.creates) + len(self.updates) + len(self.deletes)
+
+    def __repr__(self):
+        return f'OptionDiff({len(self.creates)} creates, {len(self.updates)} updates, {len(self.deletes)} deletes, {self.unchanged} unchanged)'
+
+
+def diffOptions(current, desired, delete=True):
+    """Keyed diff of current options (carrying their id) against desired options on key_value
+
+    Only the OPTION_FIELDS a desired option carries are compared, so leaving
+    out e.g. condition_value keeps the current one. When the list already
+    holds several options with a desired key_value, the first is kept and
+    the others are deleted, even with delete=False. Raises ValueError on a
+    desired option without key_value or a key_value given twice.
+    """
+    existing = {}
+    for option in current:
+        existing.setdefault(normalize(option['key_value']), []).append(option)
+    creates, updates, seen = [], [], set()
+    unchanged = 0
+
+    for option in desired:
+        if option.get('key_value') is None:
+            raise ValueError(f'Option without key_value: {option}')
+        key = normalize(option['key_value'])
+        if key in seen:
+            raise ValueError(f'Duplicate key_value {key}')
+        seen.add(key)
+
+        option = {field: option[field] for field in OPTION_FIELDS if field in option}
+        if key not in existing:
+            creates.append(option)
+            continue
+
+        found = existing[key][0]
+        changed = {field: value for field, value in option.items() if normalize(value) != normalize(found.get(field))}
+        if changed:
+            updates.append(dict(changed, id=found['id']))
+        else:
+            unchanged += 1
+
+    deletes = []
+    for key, options in existing.items():
+        if key in seen:
+            deletes += [option['id'] for option in options[1:]]
+        elif delete:
+            deletes += [option['id'] for option in options]
+    return OptionDiff(creates, updates, deletes, unchanged)
+
+
+class OptionSyncReport:
+    """The applied OptionDiff with a bulk.BulkReport per kind of write, the reports are None for a dry run"""
+    def __init__(self, diff, created=None, updated=None, deleted=None):
+        self.diff = diff
+        self.created = created
+        self.updated = updated
+        self.deleted = deleted
+
+    @property
+    def ok(self):
+        return all(report.ok for report in (self.created, self.updated, self.deleted) if report is not None)
+
+    def getCounts(self):
+        """Number of options created, updated and deleted successfully, or planned for a dry run"""
+        planned = {'created': self.diff.creates, 'updated': self.diff.updates, 'deleted': self.diff.deletes}
+        return {
+            kind: len(getattr(self, kind).getSucceeded()) if getattr(self, kind) is not None else len(items)
+            for kind, items in planned.items()
+        }
+
+    def __repr__(self):
+        counts = self.getCounts()
+        return f'OptionSyncReport({counts["created"]} created, {counts["updated"]} updated, {counts["deleted"]} deleted, {self.diff.unchanged} unchanged)'
+
+
+def syncOptionList(ifb, profile_id, optionlist_id, desired, *, delete=True, dry_run=False, chunk_size=100,
+                   max_workers=None, page_size=1000):
+    """Bring an option list in line with desired options using the fewest writes
+
+    The current options are read with keyset pagination and diffed on
+    key_value, so options that did not change keep their ids and are not
+    touched. The creates, updates and deletes are sent one kind after the
+    other as chunked POST, PUT and DELETE requests, the chunks of each kind
+    on max_workers threads capped at the client's pool size; a rejected
+    chunk is bisected like any bulk write. delete=False keeps options
+    missing from desired. Returns an OptionSyncReport.
+    """
+    current = ifb.iter_options(profile_id, optionlist_id, fields=','.join(OPTION_FIELDS), page_size=page_size)
+    diff = diffOptions(current, desired, delete)
+    if dry_run:
+        return OptionSyncReport(diff)
+
+    max_workers = min(max_workers or ifb.getBatchWorkers(), getPoolSize(ifb.getParams()))
+    writes = {
+        'created': (lambda chunk: ifb.Options('POST', profile_id, optionlist_id, body=chunk), parseCreated, diff.creates),
+        'updated': (lambda chunk: ifb.Options('PUT', profile_id, optionlist_id, body=chunk), parseUpdated, diff.updates),
+        'deleted': (
+            lambda chunk: ifb.Options('DELETE', profile_id, optionlist_id, params={'fields': getIdFilter(chunk), 'limit': str(len(chunk))}),
+            parseDeleted, diff.deletes
+        )
+    }
+    return OptionSyncReport(diff, **{
+        kind: bulkWrite(request, parse, items, chunk_size, max_workers)
+        for kind, (request, parse, items) in writes.items()
+    })
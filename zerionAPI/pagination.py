@@ -0,0 +1,227 @@
+import re
+import math
+import queue
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ResponseError(Exception):
+    """Raised by the iterators when a page request does not return 200"""
+    def __init__(self, result):
+        super().__init__(f'{result.status_code} {result.response}')
+        self.result = result
+
+
+def splitFields(fields):
+    """Split a field grammar string on the commas that separate its terms"""
+    terms, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(fields):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            terms.append(fields[start:i])
+            start = i + 1
+    terms.append(fields[start:])
+    return [term.strip() for term in terms if term.strip()]
+
+
+def canUseKeyset(terms):
+    """Keyset pagination needs the id sort to itself, so fields must neither filter on id nor sort"""
+    for term in terms:
+        unquoted = re.sub(r'"[^"]*"', '""', term)
+        if re.match(r'id\b', unquoted) or re.search(r':[<>]', unquoted):
+            return False
+    return True
+
+
+def getTerms(fields):
+    """Terms of fields given as a string, a list of terms or a query.Query"""
+    if isinstance(fields, str):
+        return splitFields(fields)
+    if hasattr(fields, 'getTerms'):
+        return fields.getTerms()
+    return list(fields or [])
+
+
+def getIdTerm(last_id=None, low=None, high=None):
+    """Ascending id sort, limited to ids after last_id (or from low) and below high"""
+    bounds = []
+    if last_id is not None:
+        bounds.append(f'>"{last_id}"')
+    elif low is not None:
+        bounds.append(f'>="{low}"')
+    if high is not None:
+        bounds.append(f'<"{high}"')
+    return f'id:<({"&".join(bounds)})' if bounds else 'id:<'
+
+
+def iterBatches(fetch, fields=None, page_size=100, keyset=None, params=None, id_range=None, window=None):
+    """Yield the items of a list resource one page (list) at a time
+
+    fetch(params) performs the GET for one page. With keyset pagination
+    each page asks for `id:<(>"<last id>")`, so deep pages cost the same as
+    the first; otherwise pages are read by offset. keyset=None picks keyset
+    whenever fields allow it. Iteration stops on an empty page or once
+    Total-Count shows nothing is left. Raises ResponseError on a failed page.
+
+    id_range (low, high) limits a keyset scan to low <= id < high and window
+    (start, stop) limits an offset scan to those offsets, either bound may
+    be None.
+    """
+    terms = getTerms(fields)
+    if keyset is None:
+        keyset = id_range is not None or (window is None and canUseKeyset(terms))
+    elif keyset and not canUseKeyset(terms):
+        raise ValueError('Keyset pagination cannot be combined with id predicates or sorting in fields')
+
+    low, high = id_range or (None, None)
+    start, stop = window or (0, None)
+    params = dict(params or {}, limit=str(page_size))
+    last_id = None
+    offset = start or 0
+
+    while True:
+        if keyset:
+            params['fields'] = ','.join([getIdTerm(last_id, low, high)] + terms)
+        else:
+            if stop is not None:
+                if offset >= stop:
+                    return
+                params['limit'] = str(min(page_size, stop - offset))
+            if terms:
+                params['fields'] = ','.join(terms)
+            params['offset'] = str(offset)
+
+        result = fetch(params)
+        if result.status_code != 200:
+            raise ResponseError(result)
+
+        page = result.response or []
+        if len(page) == 0:
+            return
+
+        yield page
+
+        total = result.headers.get('Total-Count')
+        if keyset:
+            # Total-Count counts the items matching the id predicate, i.e. those from this page on
+            if total is not None and len(page) >= int(total):
+                return
+            last_id = page[-1]['id']
+        else:
+            offset += len(page)
+            if total is not None and offset >= int(total):
+                return
+
+
+def iterItems(fetch, fields=None, page_size=100, keyset=None, params=None):
+    """Yield the items of a list resource one at a time, see iterBatches"""
+    for page in iterBatches(fetch, fields, page_size, keyset, params):
+        yield from page
+
+
+def getFirst(fetch, terms, params, id_term=None):
+    """Fetch the first item matching terms, returns (item, Total-Count)"""
+    result = fetch(dict(params or {}, fields=','.join(([id_term] if id_term else []) + terms), limit='1'))
+    if result.status_code != 200:
+        raise ResponseError(result)
+
+    total = result.headers.get('Total-Count')
+    page = result.response or []
+    return (page[0] if page else None), (int(total) if total is not None else None)
+
+
+def planPartitions(fetch, fields=None, page_size=100, partitions=10, params=None):
+    """Split a list resource into independent page iterators for scanBatches
+
+    When fields allow keyset pagination the id range between the smallest
+    and largest matching id is cut into equal id ranges. Otherwise Total-Count
+    is cut into offset windows. No more partitions are made than there are
+    pages to read.
+    """
+    terms = getTerms(fields)
+
+    if canUseKeyset(terms):
+        first, total = getFirst(fetch, terms, params, 'id:<')
+        if first is None:
+            return []
+        last, _ = getFirst(fetch, terms, params, 'id:>')
+        low, high = int(first['id']), int(last['id'])
+
+        count = min(partitions, high - low + 1, math.ceil(total / page_size) if total is not None else partitions)
+        bounds = sorted({low + (high - low + 1) * i // count for i in range(1, count)})
+        ranges = zip([None] + bounds, bounds + [None])
+        return [partial(iterBatches, fetch, terms, page_size, True, params, id_range=id_range) for id_range in ranges]
+
+    _, total = getFirst(fetch, terms, params)
+    if total is None:
+        return [partial(iterBatches, fetch, terms, page_size, False, params)]
+    if total == 0:
+        return []
+
+    size = max(page_size, math.ceil(total / partitions))
+    windows = [(start, start + size) for start in range(0, total, size)]
+    # Items added while scanning land after the last window
+    windows[-1] = (windows[-1][0], None)
+    return [partial(iterBatches, fetch, terms, page_size, False, params, window=window) for window in windows]
+
+
+def scanBatches(sources, max_workers=10, ordered=False, buffer_size=2):
+    """Run page iterators concurrently on a thread pool and yield their pages as one stream
+
+    sources are callables returning page iterators, such as the partitions
+    from planPartitions. Pages are yielded as they arrive, or in source
+    order when ordered is set. At most buffer_size pages per worker are held
+    ahead of the consumer. The first failure is raised to the consumer and
+    stops the scan, as does closing the generator.
+    """
+    stop = threading.Event()
+    shared = queue.Queue(buffer_size * max_workers)
+    queues = [queue.Queue(buffer_size) for _ in sources] if ordered else [shared] * len(sources)
+
+    def put(target, item):
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run(target, source):
+        if stop.is_set():
+            return
+        try:
+            for page in source():
+                if not put(target, ('page', page)):
+                    return
+        except Exception as e:
+            put(target, ('error', e))
+        else:
+            put(target, ('done', None))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for target, source in zip(queues, sources):
+            executor.submit(run, target, source)
+
+        remaining = len(sources)
+        for target in (queues if ordered else [shared] * len(sources)):
+            while remaining:
+                kind, value = target.get()
+                if kind == 'error':
+                    raise value
+                if kind == 'done':
+                    remaining -= 1
+                    break
+                yield value
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
@@ -0,0 +1,235 @@
+import warnings
+import itertools
+from datetime import date, datetime
+from .pagination import iterBatches
+from .elements import isDataElement, getValueType
+
+# Record fields that exist on every page besides its elements
+SYSTEM_FIELDS = (
+    'id', 'parent_record_id', 'parent_page_id', 'parent_element_id', 'version',
+    'created_date', 'created_by', 'created_location', 'created_device_id',
+    'modified_date', 'modified_by', 'modified_location', 'modified_device_id', 'server_modified_date'
+)
+NUMERIC_FIELDS = ('id', 'parent_record_id', 'parent_page_id', 'parent_element_id', 'version')
+COMPARISONS = ('=', '!=', '<', '>', '<=', '>=', '~')
+
+
+class QueryWarning(UserWarning):
+    """Issued when a query fetches columns that were not declared as used"""
+
+
+def quoteValue(value):
+    """Field grammar literal for a value, dates are written in ISO 8601"""
+    if isinstance(value, bool):
+        value = int(value)
+    elif isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    text = str(value)
+    if '"' in text:
+        raise ValueError(f'Field grammar values cannot contain double quotes: {text}')
+    return f'"{text}"'
+
+
+def isNumber(value):
+    if isinstance(value, bool):
+        return False
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class Condition:
+    """One predicate on a column, compiled to alternatives of conjunctive (operator, value) conditions"""
+    def __init__(self, name, operator, value=None):
+        operator = operator.lower()
+        if operator in COMPARISONS:
+            alternatives = [[(operator, value)]]
+        elif operator == 'in':
+            alternatives = [[('=', item)] for item in value]
+        elif operator == 'not in':
+            alternatives = [[('!=', item) for item in value]]
+        elif operator == 'between':
+            low, high = value
+            alternatives = [[('>=', low), ('<=', high)]]
+        elif operator == 'is null':
+            alternatives = [[('=', '')]]
+        elif operator == 'not null':
+            alternatives = [[('!=', '')]]
+        else:
+            raise ValueError(f'Unsupported operator {operator}')
+
+        if not alternatives or not all(alternatives):
+            raise ValueError(f'{operator} on {name} needs at least one value')
+
+        self.name = name
+        self.operator = operator
+        self.alternatives = alternatives
+
+    def getValues(self):
+        return [value for conditions in self.alternatives for operator, value in conditions if operator != '~' and value != '']
+
+    def compile(self, nested=False):
+        """Predicate text, alternatives are each parenthesised as in bulk.getIdFilter, (="a")|(="b"),
+        and wrapped once more when nested among other conditions
+        """
+        texts = ['&'.join(f'{operator}{quoteValue(value)}' for operator, value in conditions) for conditions in self.alternatives]
+        if len(texts) == 1:
+            return texts[0]
+        text = '|'.join(f'({text})' for text in texts)
+        return f'({text})' if nested else text
+
+
+class Query:
+    """Builds the IFB field grammar of a records request
+
+        query = Query().select('name', 'score').where('score', '>', 50).where('status', 'in', ['open', 'closed'])
+        query.orderBy('score', descending=True).limit(100)
+        query.getFields()    # 'score:>(>"50"),name,status((="open")|(="closed"))'
+
+    Each column becomes one term, so a column that is filtered or sorted on
+    is also returned. A term is written name:sort(predicate), the order
+    pagination.getIdTerm uses as well. Several where() calls on one column are joined with &.
+    Values are quoted by the query, only double quotes cannot be expressed.
+
+    With a schema.SchemaIndex and a page_id every column is checked against
+    the page's elements when the query is compiled: unknown columns,
+    elements without data and non-numeric values for number elements raise
+    ValueError. uses() declares the columns the caller reads; compiling
+    then warns with QueryWarning about selected columns outside them.
+    """
+    def __init__(self, page_id=None, schema=None):
+        self.__page_id = page_id
+        self.__schema = schema
+        self.__columns = []
+        self.__conditions = {}
+        self.__sorts = []
+        self.__used = None
+        self.__limit = None
+        self.__offset = None
+
+    def __addColumn(self, name):
+        if name not in self.__columns:
+            self.__columns.append(name)
+
+    def select(self, *names):
+        for name in names:
+            self.__addColumn(name)
+        return self
+
+    def selectAll(self):
+        """Select every data element of the page, needs a schema"""
+        if self.__schema is None or self.__page_id is None:
+            raise ValueError('selectAll needs a schema and a page_id')
+        return self.select(*(element['name'] for element in self.__schema.getDataElements(self.__page_id)))
+
+    def where(self, name, operator, value=None):
+        """Filter on a column with one of =, !=, <, >, <=, >=, ~ (like, % as wildcard),
+        in, not in, between (a (low, high) pair), is null and not null
+        """
+        self.__addColumn(name)
+        self.__conditions.setdefault(name, []).append(Condition(name, operator, value))
+        return self
+
+    def orderBy(self, name, descending=False):
+        """Sort on a column, earlier calls take precedence"""
+        if name in (sort[0] for sort in self.__sorts):
+            raise ValueError(f'{name} is already sorted on')
+        self.__addColumn(name)
+        self.__sorts.append((name, '>' if descending else '<'))
+        return self
+
+    def limit(self, count, offset=None):
+        self.__limit = count
+        self.__offset = offset
+        return self
+
+    def uses(self, *names):
+        self.__used = set(self.__used or ()) | set(names)
+        return self
+
+    def getColumns(self):
+        return list(self.__columns)
+
+    def validate(self, schema=None, page_id=None):
+        """Check the columns and values against the page's elements, raises ValueError listing every problem"""
+        schema = schema or self.__schema
+        page_id = page_id or self.__page_id
+        if schema is None or page_id is None:
+            raise ValueError('validate needs a schema and a page_id')
+        if not schema.hasPage(page_id):
+            raise ValueError(f'Page {page_id} is not in the schema index')
+
+        problems = []
+        for name in self.__columns:
+            if name in SYSTEM_FIELDS:
+                numeric = name in NUMERIC_FIELDS
+            else:
+                element = schema.getElement(page_id, name)
+                if element is None:
+                    problems.append(f'{name} is not an element of page {page_id}')
+                    continue
+                if not isDataElement(element):
+                    problems.append(f'{name} holds no record data')
+                    continue
+                numeric = getValueType(element) != 'str'
+
+            if numeric:
+                for condition in self.__conditions.get(name, []):
+                    problems += [f'{name} is numeric, {value!r} is not a number' for value in condition.getValues() if not isNumber(value)]
+
+        if problems:
+            raise ValueError('Invalid query: ' + '; '.join(problems))
+        return self
+
+    def __compile(self):
+        sorts = dict(self.__sorts)
+        terms = []
+        for name in [sort[0] for sort in self.__sorts] + [name for name in self.__columns if name not in sorts]:
+            conditions = self.__conditions.get(name, [])
+            if name == 'id' and not conditions and name not in sorts:
+                continue
+            predicate = '&'.join(condition.compile(len(conditions) > 1) for condition in conditions)
+            terms.append(name + (f':{sorts[name]}' if name in sorts else '') + (f'({predicate})' if predicate else ''))
+        return terms
+
+    def getTerms(self):
+        """The field grammar terms, sorted columns first in sort order
+        id is only included when filtered or sorted on, IFB always returns it
+        """
+        if self.__schema is not None and self.__page_id is not None:
+            self.validate()
+
+        if self.__used is not None:
+            unused = [name for name in self.__columns if name not in self.__used and name not in self.__conditions and name != 'id']
+            if unused:
+                warnings.warn(f'Query fetches columns that are not used: {", ".join(unused)}', QueryWarning, stacklevel=3)
+
+        return self.__compile()
+
+    def getFields(self):
+        return ','.join(self.getTerms())
+
+    def getParams(self):
+        """params for a single Records, Users or Elements GET"""
+        params = {'fields': self.getFields()}
+        if self.__limit is not None:
+            params['limit'] = str(self.__limit)
+        if self.__offset is not None:
+            params['offset'] = str(self.__offset)
+        return params
+
+    def records(self, ifb, profile_id, page_id=None, *, page_size=1000):
+        """Yield the matching records of a page, honouring limit and offset across pages"""
+        page_id = page_id or self.__page_id
+        fetch = lambda p: ifb.Records('GET', profile_id, page_id, params=p)
+        window = (self.__offset, self.__offset + self.__limit if self.__limit is not None else None) if self.__offset else None
+        if self.__limit is not None:
+            page_size = min(page_size, self.__limit)
+
+        records = itertools.chain.from_iterable(iterBatches(fetch, self.getTerms(), page_size, window=window))
+        return itertools.islice(records, self.__limit)
+
+    def __repr__(self):
+        return f'Query({",".join(self.__compile())!r})'
@@ -0,0 +1,133 @@
+import time
+import threading
+import email.utils
+
+# Longest pause of a RateLimiter after a 429 that came without Retry-After
+MAX_BACKOFF = 60
+
+
+def parseRetryAfter(value):
+    """Return the number of seconds described by a Retry-After header, or None"""
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by any number of clients
+
+    rate is the sustained number of requests per second and burst the number
+    of requests allowed back to back. When the server reports its own limits
+    through response headers the sustained rate is lowered to match them,
+    never raised above the configured rate.
+    """
+    def __init__(self, rate=10.0, burst=None):
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0')
+
+        self.__max_rate = float(rate)
+        self.__rate = float(rate)
+        self.__burst = float(burst if burst is not None else max(1, rate))
+        self.__tokens = self.__burst
+        self.__updated = time.monotonic()
+        self.__blocked_until = 0.0
+        self.__lock = threading.Lock()
+
+    def __refill(self, now):
+        self.__tokens = min(self.__burst, self.__tokens + (now - self.__updated) * self.__rate)
+        self.__updated = now
+
+    def getRate(self):
+        return self.__rate
+
+    def getBurst(self):
+        return self.__burst
+
+    def reserve(self):
+        """Take a token if one is available
+        Returns 0 on success, else the number of seconds to wait before trying again
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__refill(now)
+
+            if self.__blocked_until > now:
+                return self.__blocked_until - now
+
+            if self.__tokens >= 1:
+                self.__tokens -= 1
+                return 0
+
+            return (1 - self.__tokens) / self.__rate
+
+    def acquire(self):
+        """Block until a request may be sent, returns the total seconds waited"""
+        waited = 0.0
+
+        while (wait := self.reserve()) > 0:
+            time.sleep(wait)
+            waited += wait
+
+        return waited
+
+    def pause(self, seconds):
+        """Stop handing out tokens for the given number of seconds"""
+        with self.__lock:
+            now = time.monotonic()
+            self.__blocked_until = max(self.__blocked_until, now + seconds)
+            self.__tokens = 0
+
+    def updateFromHeaders(self, headers):
+        """Adapt to Retry-After and X-RateLimit-* / RateLimit-* response headers"""
+        retry_after = parseRetryAfter(headers.get('Retry-After'))
+        if retry_after is not None:
+            self.pause(retry_after)
+
+        remaining = headers.get('X-RateLimit-Remaining', headers.get('RateLimit-Remaining'))
+        reset = headers.get('X-RateLimit-Reset', headers.get('RateLimit-Reset'))
+
+        if remaining is None or reset is None:
+            return
+
+        try:
+            remaining = float(remaining)
+            reset = float(reset)
+        except ValueError:
+            return
+
+        # Reset is either seconds until the window resets or an epoch timestamp
+        if reset > 1e9:
+            reset -= time.time()
+        reset = max(reset, 0.001)
+
+        if remaining <= 0:
+            self.pause(reset)
+        else:
+            with self.__lock:
+                self.__refill(time.monotonic())
+                self.__rate = min(self.__max_rate, remaining / reset)
+
+
+def getRateLimitWait(headers, limiter, attempt):
+    """Seconds to wait before resending a request rejected with 429 on its attempt-th (0-based) rate limited try
+
+    With a limiter the wait is applied as a pause of the limiter, which all of
+    its clients respect, and 0 is returned. The limiter already paused for a
+    Retry-After header; without one it pauses 1, 2, 4, ... seconds up to
+    MAX_BACKOFF. Without a limiter Retry-After is returned, or 60 seconds.
+    """
+    wait = parseRetryAfter(headers.get('Retry-After'))
+    if limiter is not None:
+        if wait is None:
+            limiter.pause(min(MAX_BACKOFF, 2 ** attempt))
+        return 0
+    return 60 if wait is None else wait
@@ -0,0 +1,208 @@
+import sys
+import json
+import math
+from array import array
+from collections.abc import Mapping
+
+TYPECODES = {
+    'int': 'q',
+    'float': 'd'
+}
+
+
+def requireModule(name, extra):
+    try:
+        return __import__(name)
+    except ImportError:
+        raise ImportError(f'{name} is required for this conversion: pip install {extra}') from None
+
+
+class Column:
+    """Values of one field, in a typed array for int and float columns
+
+    Typed columns keep a validity byte per row, so missing values cost one
+    byte; missing floats also read as NaN. A value that does not fit the
+    column's type turns it into a plain list. Strings are interned, so
+    repeated values such as choice list keys are stored once.
+    """
+    def __init__(self, type='str', length=0):
+        self.type = type if type in TYPECODES else 'object'
+        if self.type == 'object':
+            self.values = [None] * length
+            self.valid = None
+        else:
+            self.values = array(TYPECODES[self.type], [0] * length) if self.type == 'int' else array('d', [math.nan] * length)
+            self.valid = bytearray(length)
+
+    def __convert(self, value):
+        if self.type == 'float':
+            return float(value)
+        if isinstance(value, int):
+            return int(value)
+        number = float(value)
+        if not number.is_integer():
+            raise ValueError(f'{value} is not an integer')
+        return int(number)
+
+    def __demote(self):
+        self.values = [self.values[i] if self.valid[i] else None for i in range(len(self.values))]
+        self.valid = None
+        self.type = 'object'
+
+    def append(self, value):
+        if self.valid is not None:
+            if value is None or value == '':
+                self.values.append(0 if self.type == 'int' else math.nan)
+                self.valid.append(0)
+                return
+            try:
+                self.values.append(self.__convert(value))
+                self.valid.append(1)
+                return
+            except (TypeError, ValueError, OverflowError):
+                self.__demote()
+
+        self.values.append(sys.intern(value) if isinstance(value, str) else value)
+
+    def get(self, index):
+        if self.valid is not None and not self.valid[index]:
+            return None
+        return self.values[index]
+
+    def hasNulls(self):
+        return self.valid is not None and 0 in self.valid
+
+    def toList(self):
+        if self.valid is None:
+            return list(self.values)
+        return [value if valid else None for value, valid in zip(self.values, self.valid)]
+
+
+class RecordView(Mapping):
+    """Read-only dict-like view of one row of a RecordSet"""
+    def __init__(self, columns, index):
+        self.__columns = columns
+        self.__index = index
+
+    def __getitem__(self, name):
+        return self.__columns[name].get(self.__index)
+
+    def __iter__(self):
+        return iter(self.__columns)
+
+    def __len__(self):
+        return len(self.__columns)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class RecordSet:
+    """Column-wise store for large numbers of records
+
+    types maps field names to 'int', 'float' or 'str', usually derived from
+    the page's element data types; untyped fields are stored as lists.
+    Rows are read as RecordView mappings, columns as lists or, when the
+    libraries are installed, as NumPy arrays, a pandas DataFrame or an Arrow
+    table. NumPy and pandas share the memory of typed columns, so the set
+    cannot grow while such arrays are alive.
+    """
+    def __init__(self, records=(), types=None):
+        self.__types = dict(types or {})
+        self.__columns = {}
+        self.__length = 0
+        self.extend(records)
+
+    def append(self, record):
+        for name in record:
+            if name not in self.__columns:
+                self.__columns[name] = Column(self.__types.get(name, 'object'), self.__length)
+
+        for name, column in self.__columns.items():
+            column.append(record.get(name))
+        self.__length += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def getColumns(self):
+        return list(self.__columns)
+
+    def getTypes(self):
+        return {name: column.type for name, column in self.__columns.items()}
+
+    def column(self, name):
+        """Values of one field as a list, None where missing"""
+        return self.__columns[name].toList()
+
+    def row(self, index):
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError('RecordSet index out of range')
+        return RecordView(self.__columns, index)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, slice):
+            return RecordSet((self.row(i) for i in range(*key.indices(self.__length))), self.getTypes())
+        return self.row(key)
+
+    def __iter__(self):
+        for index in range(self.__length):
+            yield RecordView(self.__columns, index)
+
+    def __len__(self):
+        return self.__length
+
+    def __repr__(self):
+        return f'RecordSet({self.__length} records, {len(self.__columns)} columns)'
+
+    def filter(self, predicate):
+        """New RecordSet of the rows for which predicate(row) is true"""
+        return RecordSet((row for row in self if predicate(row)), self.getTypes())
+
+    def toRecords(self):
+        return [dict(row) for row in self]
+
+    def toNumpy(self, name):
+        """One column as a NumPy array, a masked array if a typed column has missing values"""
+        numpy = requireModule('numpy', 'numpy')
+        column = self.__columns[name]
+        if column.valid is None:
+            return numpy.array(column.values, dtype=object)
+
+        values = numpy.frombuffer(column.values, dtype='int64' if column.type == 'int' else 'float64')
+        if column.hasNulls():
+            return numpy.ma.MaskedArray(values, mask=numpy.frombuffer(column.valid, dtype='uint8') == 0)
+        return values
+
+    def toPandas(self):
+        pandas = requireModule('pandas', 'pandas')
+        numpy = requireModule('numpy', 'numpy')
+        data = {}
+        for name, column in self.__columns.items():
+            if column.type == 'int':
+                values = numpy.frombuffer(column.values, dtype='int64')
+                data[name] = pandas.arrays.IntegerArray(values, numpy.frombuffer(column.valid, dtype='uint8') == 0) if column.hasNulls() else values
+            elif column.type == 'float':
+                data[name] = numpy.frombuffer(column.values, dtype='float64')
+            else:
+                data[name] = column.values
+        return pandas.DataFrame(data, copy=False)
+
+    def toArrow(self):
+        pyarrow = requireModule('pyarrow', 'zerionAPI[parquet]')
+        arrays = []
+        for column in self.__columns.values():
+            if column.valid is not None and not column.hasNulls():
+                type = pyarrow.int64() if column.type == 'int' else pyarrow.float64()
+                arrays.append(pyarrow.Array.from_buffers(type, len(column.values), [None, pyarrow.py_buffer(column.values)]))
+                continue
+            try:
+                arrays.append(pyarrow.array(column.toList()))
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+                arrays.append(pyarrow.array([None if value is None else json.dumps(value) for value in column.values]))
+        return pyarrow.Table.from_arrays(arrays, names=list(self.__columns))
@@ -0,0 +1,102 @@
+import inspect
+import functools
+import urllib.parse
+
+@functools.lru_cache(maxsize=4096)
+def quoteParam(value):
+    """Percent-encoded query value, cached as the same fields and limits are sent over and over"""
+    return urllib.parse.quote(value)
+
+
+def ifbQuery(params):
+    """?key=value&... query string, skipping None values"""
+    query = '&'.join([f'{key}={quoteParam(str(value))}' for key, value in params.items() if value is not None])
+    return f'?{query}' if query else ''
+
+
+def dfaQuery(params):
+    """/key/value/... path suffix, skipping None values"""
+    return ''.join(f'/{key}/{value}' for key, value in params.items() if value is not None)
+
+
+def getSignature(path_args, id_arg, keywords):
+    """inspect.Signature of a resource method, self and method first, then the entry's arguments"""
+    positional = inspect.Parameter.POSITIONAL_OR_KEYWORD
+    parameters = [inspect.Parameter(name, positional) for name in ('self', 'method') + tuple(path_args)]
+    if id_arg is not None:
+        parameters.append(inspect.Parameter(id_arg, positional, default=None))
+    parameters += [inspect.Parameter(keyword, inspect.Parameter.KEYWORD_ONLY, default=None if keyword == 'body' else {}) for keyword in keywords]
+    return inspect.Signature(parameters)
+
+
+def compileResourceMethod(name, resource, host, query):
+    """Build the method for one resource table entry
+
+    The entry's Path names the arguments substituted into URI, Id the
+    optional trailing id argument and Keywords which of body and params the
+    method accepts. The URI template and the allowed methods are prepared
+    once here, so a call costs one set lookup and one string build before
+    reaching API.call. The method carries the entry's signature and a
+    docstring, so help() and IDEs show its arguments.
+    """
+    path_args = tuple(resource.get('Path', ()))
+    id_arg = resource.get('Id')
+    keywords = resource.get('Keywords', ('body', 'params'))
+    signature = getSignature(path_args, id_arg, keywords)
+    arguments = getSignature(path_args, id_arg, ())
+    uri = resource['URI']
+    uri_with_id = f'{uri}/%s'
+    count = len(path_args)
+    lengths = frozenset(range(count, count + 2 if id_arg is not None else count + 1))
+    methods = resource['Methods']
+    allowed = frozenset((methods,) if isinstance(methods, str) else methods)
+    accepted = allowed | {method.lower() for method in allowed}
+    unexpected = [keyword for keyword in ('body', 'params') if keyword not in keywords]
+
+    def resourceMethod(self, method, *args, body=None, params=None, **named):
+        if named or len(args) not in lengths:
+            # Arguments given by name, or a wrong number of them, bind the slow way and raise TypeError like a def would
+            bound = arguments.bind(self, method, *args, **named)
+            args = tuple(bound.arguments.get(arg) for arg in path_args + ((id_arg,) if id_arg is not None else ()))
+        if unexpected:
+            for keyword, value in (('body', body), ('params', params)):
+                if value is not None and keyword in unexpected:
+                    raise TypeError(f"{name}() got an unexpected keyword argument '{keyword}'")
+        if method not in accepted and method.upper() not in allowed:
+            raise ValueError(f'The "{method}" method is not allowed for {name}')
+
+        if len(args) == count:
+            request = f'{getattr(self, host)}/{uri % args}'
+        elif args[count] is not None:
+            request = f'{getattr(self, host)}/{uri_with_id % args}'
+        else:
+            request = f'{getattr(self, host)}/{uri % args[:count]}'
+        if params:
+            request += query(params)
+        return self.call(method, request, body)
+
+    path = uri.replace('%s', '{%s}') % path_args + (f'[/{{{id_arg}}}]' if id_arg is not None else '')
+    resourceMethod.__name__ = name
+    resourceMethod.__signature__ = signature
+    resourceMethod.__doc__ = f'{", ".join(sorted(allowed))} {path}' + ''.join(
+        {'body': '\nbody is sent as the JSON request body', 'params': '\nparams are added to the URL, None values are skipped'}[keyword]
+        for keyword in keywords
+    )
+    return resourceMethod
+
+
+def resourceMethods(query):
+    """Class decorator that adds a method for every entry of the class's private __resources table
+
+    Entries whose method is already defined in the class body are left alone.
+    """
+    def decorate(cls):
+        host = f'_{cls.__name__}__host'
+        for name, resource in getattr(cls, f'_{cls.__name__}__resources').items():
+            if name not in cls.__dict__:
+                method = compileResourceMethod(name, resource, host, query)
+                method.__qualname__ = f'{cls.__name__}.{name}'
+                method.__module__ = cls.__module__
+                setattr(cls, name, method)
+        return cls
+    return decorate
@@ -0,0 +1,97 @@
+import time
+import random
+import threading
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open"""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient failures
+
+    Only methods listed in `methods` are retried. POST is not idempotent and
+    is left out unless retry_post is set, since a retried POST can create
+    duplicate records.
+    """
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30, jitter=True,
+                 status_forcelist=(502, 503, 504), methods=('GET', 'PUT', 'DELETE'), retry_post=False):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_forcelist = frozenset(status_forcelist)
+        self.methods = frozenset(m.upper() for m in methods) | ({'POST'} if retry_post else set())
+
+    def shouldRetry(self, method, attempt, status_code=None):
+        """Whether a request that failed on the given 0-based attempt may be sent again
+        status_code is None when the request raised a connection error or timeout
+        """
+        if attempt >= self.max_retries or method.upper() not in self.methods:
+            return False
+        return status_code is None or status_code in self.status_forcelist
+
+    def getBackoff(self, attempt):
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures instead of waiting on a dead backend
+
+    After failure_threshold consecutive failures the circuit opens and every
+    request raises CircuitOpenError. Once recovery_timeout seconds have passed
+    a single trial request is let through. Its success closes the circuit and
+    its failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30):
+        self.__failure_threshold = failure_threshold
+        self.__recovery_timeout = recovery_timeout
+        self.__failures = 0
+        self.__state = CircuitBreaker.CLOSED
+        self.__opened_at = None
+        self.__trial_in_flight = False
+        self.__lock = threading.Lock()
+
+    def getState(self):
+        return self.__state
+
+    def before(self):
+        """Raise CircuitOpenError unless a request may be sent, returns True if it is the half-open trial request"""
+        with self.__lock:
+            if self.__state == CircuitBreaker.CLOSED:
+                return False
+
+            if self.__state == CircuitBreaker.OPEN and time.monotonic() - self.__opened_at >= self.__recovery_timeout:
+                self.__state = CircuitBreaker.HALF_OPEN
+                self.__trial_in_flight = False
+
+            if self.__state == CircuitBreaker.HALF_OPEN and not self.__trial_in_flight:
+                self.__trial_in_flight = True
+                return True
+
+            raise CircuitOpenError(f'Circuit open after {self.__failures} consecutive failures')
+
+    def release(self):
+        """Free the trial slot of a trial request that ended without a success or failure, e.g. an invalid URL"""
+        with self.__lock:
+            if self.__state == CircuitBreaker.HALF_OPEN:
+                self.__trial_in_flight = False
+
+    def recordSuccess(self):
+        with self.__lock:
+            self.__failures = 0
+            self.__state = CircuitBreaker.CLOSED
+            self.__trial_in_flight = False
+
+    def recordFailure(self):
+        with self.__lock:
+            self.__failures += 1
+            if self.__state == CircuitBreaker.HALF_OPEN or self.__failures >= self.__failure_threshold:
+                self.__state = CircuitBreaker.OPEN
+                self.__opened_at = time.monotonic()
+                self.__trial_in_flight = False
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from .elements import isDataElement, getSubformPageIds, getValueType
+
+PAGE_FIELDS = 'name,version,modified_date'
+ELEMENT_FIELDS = 'name,label,data_type,data_size,sort_order'
+
+
+class SchemaIndex:
+    """In-memory index of the pages and elements of one profile
+
+    refresh() lists the profile's pages and reads the elements of pages that
+    are new or whose version or modified_date changed, concurrently on
+    max_workers threads. Lookups never call the API. With a path the index
+    is saved after every refresh and loaded when created, so a later process
+    only reads the pages that changed in between.
+    """
+    def __init__(self, ifb, profile_id, *, path=None, max_workers=None):
+        self.__ifb = ifb
+        self.__profile_id = profile_id
+        self.__path = path
+        self.__max_workers = max_workers or ifb.getBatchWorkers()
+        self.__lock = threading.Lock()
+        self.__pages = {}
+        self.__refreshed_at = None
+        self.__index()
+
+        if path is not None:
+            self.__load()
+
+    def __index(self):
+        """Rebuild the derived lookups from self.__pages"""
+        self.__page_ids = {page['name']: page_id for page_id, page in self.__pages.items()}
+        self.__elements = {
+            page_id: {element['name']: element for element in page['elements']}
+            for page_id, page in self.__pages.items()
+        }
+        self.__children = {page_id: getSubformPageIds(page['elements']) for page_id, page in self.__pages.items()}
+        self.__parents = {}
+        for page_id, children in self.__children.items():
+            for child in children:
+                self.__parents.setdefault(child, []).append(page_id)
+
+    def __load(self):
+        try:
+            with open(self.__path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if cached.get('profile_id') == self.__profile_id:
+            self.__pages = {int(page_id): page for page_id, page in cached['pages'].items()}
+            self.__refreshed_at = cached.get('refreshed_at')
+            self.__index()
+
+    def __save(self):
+        directory = os.path.dirname(os.path.abspath(self.__path))
+        os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'profile_id': self.__profile_id, 'refreshed_at': self.__refreshed_at, 'pages': self.__pages}, f)
+            os.replace(path, self.__path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            raise
+
+    def __readElements(self, page_id):
+        elements = list(self.__ifb.iter_elements(self.__profile_id, page_id, fields=ELEMENT_FIELDS))
+        return sorted(elements, key=lambda element: element.get('sort_order') or 0)
+
+    def refresh(self, force=False):
+        """Re-read the page list and the elements of changed pages, returns the ids of the pages read"""
+        with self.__lock:
+            listed = {page['id']: page for page in self.__ifb.iter_pages(self.__profile_id, fields=PAGE_FIELDS)}
+            changed = [
+                page_id for page_id, page in listed.items()
+                if force or page_id not in self.__pages
+                or (self.__pages[page_id].get('version'), self.__pages[page_id].get('modified_date')) != (page.get('version'), page.get('modified_date'))
+            ]
+
+            with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+                elements = dict(zip(changed, executor.map(self.__readElements, changed)))
+
+            pages = {}
+            for page_id, page in listed.items():
+                pages[page_id] = {
+                    'name': page.get('name'),
+                    'version': page.get('version'),
+                    'modified_date': page.get('modified_date'),
+                    'elements': elements[page_id] if page_id in elements else self.__pages[page_id]['elements']
+                }
+
+            self.__pages = pages
+            self.__refreshed_at = time.time()
+            self.__index()
+
+            if self.__path is not None:
+                self.__save()
+
+        return changed
+
+    def getProfileId(self):
+        return self.__profile_id
+
+    def getRefreshedAt(self):
+        return self.__refreshed_at
+
+    def hasPage(self, page_id):
+        return page_id in self.__pages
+
+    def getPageIds(self):
+        return list(self.__pages)
+
+    def getPageId(self, name):
+        """Id of the page called name, None if there is none"""
+        return self.__page_ids.get(name)
+
+    def getPageName(self, page_id):
+        return self.__pages[page_id]['name']
+
+    def getPage(self, page_id):
+        return self.__pages[page_id]
+
+    def getElements(self, page_id):
+        """Elements of a page in form order"""
+        return self.__pages[page_id]['elements']
+
+    def getElement(self, page_id, name):
+        return self.__elements[page_id].get(name)
+
+    def getDataElements(self, page_id):
+        return [element for element in self.getElements(page_id) if isDataElement(element)]
+
+    def getElementType(self, page_id, name):
+        """data_type of an element, None if the page has no such element"""
+        element = self.getElement(page_id, name)
+        return element['data_type'] if element is not None else None
+
+    def getValueTypes(self, page_id):
+        """{element name: 'int', 'float' or 'str'} for the data elements of a page"""
+        return {element['name']: getValueType(element) for element in self.getDataElements(page_id)}
+
+    def getChildren(self, page_id):
+        """Page ids of the subforms on a page"""
+        return list(self.__children.get(page_id, []))
+
+    def getParents(self, page_id):
+        """Page ids of the pages that use page_id as a subform"""
+        return list(self.__parents.get(page_id, []))
+
+    def getDescendants(self, page_id):
+        """Page ids of every nested subform below a page, breadth first"""
+        seen, queue = [], list(self.getChildren(page_id))
+        while queue:
+            child = queue.pop(0)
+            if child not in seen and child != page_id:
+                seen.append(child)
+                queue += self.getChildren(child)
+        return seen
+
+    def getRootPages(self):
+        """Page ids that are not used as a subform"""
+        return [page_id for page_id in self.__pages if page_id not in self.__parents]
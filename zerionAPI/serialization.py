@@ -0,0 +1,180 @@
+import json
+import gzip
+import zlib
+import codecs
+
+try:
+    import orjson
+    BACKEND = 'orjson'
+    loads = orjson.loads
+
+    def dumps(value):
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    try:
+        import ujson
+        BACKEND = 'ujson'
+        loads = ujson.loads
+    except ImportError:
+        BACKEND = 'json'
+        loads = json.loads
+
+    def dumps(value):
+        return json.dumps(value).encode('utf-8')
+
+WHITESPACE = ' \t\n\r'
+DECODER = json.JSONDecoder()
+
+
+def iterArray(chunks):
+    """Yield the top-level elements of a JSON array read from an iterable of byte chunks
+
+    Only the unparsed tail of the document and the element being decoded are
+    held in memory. A document that is not an array yields its single value.
+    """
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    started = False
+    finished = False
+    chunks = iter(chunks)
+
+    while True:
+        if not finished:
+            chunk = next(chunks, None)
+            if chunk is None:
+                finished = True
+                buffer += text.decode(b'', final=True)
+            else:
+                buffer += text.decode(chunk)
+
+        while True:
+            while pos < len(buffer) and (buffer[pos] in WHITESPACE or (started and buffer[pos] == ',')):
+                pos += 1
+
+            if pos >= len(buffer):
+                break
+
+            if not started:
+                if buffer[pos] != '[':
+                    if finished:
+                        yield DECODER.decode(buffer[pos:])
+                        return
+                    break
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                value, end = DECODER.raw_decode(buffer, pos)
+            except ValueError:
+                if finished:
+                    raise
+                break
+
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(buffer) and not finished:
+                break
+
+            yield value
+            pos = end
+
+        buffer = buffer[pos:]
+        pos = 0
+
+        if finished:
+            if buffer.strip():
+                raise ValueError('Unexpected end of JSON array')
+            return
+
+
+def iterDumps(value, chunk_size=65536):
+    """Yield the JSON encoding of value as byte chunks of about chunk_size
+
+    Lists and tuples are encoded one element at a time, so only the current
+    chunk is held in memory next to the Python objects. Other values are
+    encoded in one piece.
+    """
+    if not isinstance(value, (list, tuple)):
+        yield dumps(value)
+        return
+
+    buffer = [b'[']
+    size = 1
+    for i, item in enumerate(value):
+        if i:
+            buffer.append(b',')
+            size += 1
+        encoded = dumps(item)
+        buffer.append(encoded)
+        size += len(encoded)
+
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+
+    buffer.append(b']')
+    yield b''.join(buffer)
+
+
+def gzipChunks(chunks, level=6):
+    """Gzip an iterable of byte chunks without joining them"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class RequestBody:
+    """JSON request body, either encoded once or streamed again on every send
+
+    compress gzips bodies of at least min_size bytes and sets
+    Content-Encoding. stream sends list bodies with chunked transfer encoding
+    straight from iterDumps instead of building the whole document first.
+    `size` is the number of bytes sent by the last getData() once consumed.
+    """
+    def __init__(self, body, compress=False, min_size=1024, level=6, stream=False, chunk_size=65536):
+        self.__body = body
+        self.__level = level
+        self.__chunk_size = chunk_size
+        self.__stream = stream and isinstance(body, (list, tuple))
+        self.__data = None
+        self.headers = {}
+        self.size = 0
+
+        if self.__stream:
+            self.__compress = compress
+        else:
+            self.__data = dumps(body)
+            self.__compress = compress and len(self.__data) >= min_size
+            if self.__compress:
+                self.__data = gzip.compress(self.__data, level)
+            self.size = len(self.__data)
+
+        if self.__compress:
+            self.headers['Content-Encoding'] = 'gzip'
+
+    def isStream(self):
+        return self.__stream
+
+    def __count(self, chunks):
+        self.size = 0
+        for chunk in chunks:
+            self.size += len(chunk)
+            yield chunk
+
+    def getData(self):
+        """Bytes for a buffered body, a fresh chunk generator for a streamed one"""
+        if not self.__stream:
+            return self.__data
+
+        chunks = iterDumps(self.__body, self.__chunk_size)
+        if self.__compress:
+            chunks = gzipChunks(chunks, self.__level)
+        return self.__count(chunks)
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+import contextlib
+from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
+from .pagination import getTerms, iterBatches, iterItems
+
+
+class FileWatermarkStore:
+    """Watermarks for any number of pages kept in one JSON file, replaced atomically on every save"""
+    def __init__(self, path):
+        self.__path = path
+        self.__lock = threading.Lock()
+
+    def __read(self):
+        try:
+            with open(self.__path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __write(self, watermarks):
+        directory = os.path.dirname(os.path.abspath(self.__path))
+        os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(watermarks, f, indent=2)
+            os.replace(path, self.__path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            raise
+
+    def load(self, key):
+        with self.__lock:
+            return self.__read().get(key)
+
+    def save(self, key, watermark):
+        with self.__lock:
+            watermarks = self.__read()
+            watermarks[key] = watermark
+            self.__write(watermarks)
+
+    def delete(self, key):
+        with self.__lock:
+            watermarks = self.__read()
+            if watermarks.pop(key, None) is not None:
+                self.__write(watermarks)
+
+
+class SQLiteWatermarkStore:
+    """Watermarks kept in a table of a SQLite database, which may be shared with the synced data"""
+    def __init__(self, path, table='zerion_watermarks'):
+        self.__path = path
+        self.__table = table
+
+        with self.__connect() as connection:
+            connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (key TEXT PRIMARY KEY, watermark TEXT NOT NULL)')
+
+    @contextlib.contextmanager
+    def __connect(self):
+        connection = sqlite3.connect(self.__path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def load(self, key):
+        with self.__connect() as connection:
+            row = connection.execute(f'SELECT watermark FROM "{self.__table}" WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, key, watermark):
+        with self.__connect() as connection:
+            connection.execute(f'INSERT OR REPLACE INTO "{self.__table}" (key, watermark) VALUES (?, ?)', (key, json.dumps(watermark)))
+
+    def delete(self, key):
+        with self.__connect() as connection:
+            connection.execute(f'DELETE FROM "{self.__table}" WHERE key = ?', (key,))
+
+
+def parseDate(value):
+    """Timezone aware datetime from an IFB ISO 8601 date, None if it cannot be parsed"""
+    try:
+        date = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return date if date.tzinfo is not None else date.replace(tzinfo=timezone.utc)
+
+
+def getServerTime(result):
+    """Server clock from a response's Date header, the local clock if there is none"""
+    try:
+        return parsedate_to_datetime(result.headers['Date'])
+    except (KeyError, TypeError, ValueError):
+        return datetime.now(timezone.utc)
+
+
+class RecordSync:
+    """Streams the records of one page that changed since the previous run
+
+    changes() yields ('insert', record), ('update', record) and
+    ('delete', {'id': id}) tuples. In modified_date mode the records with a
+    modified_date at or after the stored watermark are read; the next
+    watermark is the server time the run started, less overlap seconds to
+    absorb clock skew, so changes made during a run are picked up again by
+    the next one. Consumers should therefore apply changes as upserts. In id
+    mode only records with an id above the highest id seen are read, which
+    suits pages that are only ever appended to.
+
+    Deletions are found by reconciliation: every reconcile_interval seconds
+    the ids of known_ids() are compared against an id-only scan of the page.
+    The first run reads the whole page and only starts that interval. The
+    watermark is saved to store only after the stream was fully consumed.
+    """
+    def __init__(self, ifb, profile_id, page_id, store, *, fields=None, mode='modified_date', page_size=1000,
+                 overlap=60, known_ids=None, reconcile_interval=None, key=None):
+        if mode not in ('modified_date', 'id'):
+            raise ValueError('mode must be modified_date or id')
+
+        self.__ifb = ifb
+        self.__profile_id = profile_id
+        self.__page_id = page_id
+        self.__store = store
+        self.__terms = [term for term in getTerms(fields) if term not in ('created_date', 'modified_date')]
+        self.__mode = mode
+        self.__page_size = page_size
+        self.__overlap = overlap
+        self.__known_ids = known_ids
+        self.__reconcile_interval = reconcile_interval
+        self.__key = key or f'{ifb.getServer()}/{profile_id}/{page_id}'
+
+    def getKey(self):
+        return self.__key
+
+    def getWatermark(self):
+        return self.__store.load(self.__key)
+
+    def reset(self):
+        """Forget the watermark, the next run reads the whole page again"""
+        self.__store.delete(self.__key)
+
+    def __fetch(self, params):
+        return self.__ifb.Records('GET', self.__profile_id, self.__page_id, params=params)
+
+    def reconcile(self, known_ids):
+        """Return the ids in known_ids that no longer exist on the page"""
+        present = {str(record['id']) for record in iterItems(self.__fetch, None, self.__page_size, True)}
+        return [id for id in known_ids if str(id) not in present]
+
+    def __iterModified(self, watermark, state):
+        since = watermark.get('modified_date')
+        since_date = parseDate(since) if since is not None else None
+        started = []
+
+        def fetch(params):
+            result = self.__fetch(params)
+            if not started:
+                started.append(getServerTime(result))
+            return result
+
+        terms = self.__terms + ['created_date', f'modified_date(>="{since}")' if since is not None else 'modified_date']
+        for page in iterBatches(fetch, terms, self.__page_size, True):
+            for record in page:
+                created = parseDate(record.get('created_date'))
+                is_new = since_date is None or created is None or created >= since_date
+                yield ('insert' if is_new else 'update'), record
+
+        state['modified_date'] = (started[0] - timedelta(seconds=self.__overlap)).isoformat(timespec='seconds')
+
+    def __iterAppended(self, watermark, state):
+        since = watermark.get('id')
+        id_range = (int(since) + 1, None) if since is not None else None
+
+        for page in iterBatches(self.__fetch, self.__terms, self.__page_size, True, id_range=id_range):
+            for record in page:
+                yield 'insert', record
+            state['id'] = page[-1]['id']
+
+    def changes(self):
+        watermark = self.getWatermark() or {}
+        state = dict(watermark)
+
+        if self.__mode == 'modified_date':
+            yield from self.__iterModified(watermark, state)
+        else:
+            yield from self.__iterAppended(watermark, state)
+
+        if not watermark:
+            state['reconciled_at'] = time.time()
+        elif (self.__known_ids is not None and self.__reconcile_interval is not None and
+                time.time() - watermark.get('reconciled_at', 0) >= self.__reconcile_interval):
+            for id in self.reconcile(self.__known_ids()):
+                yield 'delete', {'id': id}
+            state['reconciled_at'] = time.time()
+
+        self.__store.save(self.__key, state)
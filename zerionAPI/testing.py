@@ -0,0 +1,426 @@
+import re
+import json
+import time
+import gzip
+import hashlib
+import secrets
+import threading
+import itertools
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from .ifb import IFB
+from .dfa import DFA
+
+IFB_PREFIX = re.compile(r'^/exzact/api/v(?P<version>\d+)/(?P<server>[^/]+)/(?P<path>.*)$')
+DFA_PREFIX = re.compile(r'^/zcrypt/v1\.0/(?P<path>.*)$')
+CONDITION = re.compile(r'^(<=|>=|!=|=|<|>|~)\s*(.*)$')
+
+
+def compileResources(client_class):
+    """Turn a client's resource table into (name, methods, regex) routes, most specific first"""
+    routes = []
+    table = getattr(client_class, f'_{client_class.__name__}__resources')
+    for name, resource in table.items():
+        methods = resource['Methods'] if isinstance(resource['Methods'], tuple) else (resource['Methods'],)
+        pattern = re.escape(resource['URI']).replace('%s', '([^/]+)')
+        routes.append((len(resource['URI'].split('/')), name, methods, re.compile(f'^({pattern})(?:/([^/]+))?/?$')))
+    return [route[1:] for route in sorted(routes, key=lambda route: -route[0])]
+
+
+def splitTopLevel(text, separators):
+    """Split text on separator characters that are outside quotes and parentheses"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char in separators:
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+
+def unwrap(text):
+    text = text.strip()
+    while text.startswith('(') and text.endswith(')') and balanced(text[1:-1]):
+        text = text[1:-1].strip()
+    return text
+
+
+def balanced(text):
+    depth = 0
+    for char in text:
+        depth += char == '('
+        depth -= char == ')'
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+def compare(value, operator, expected):
+    if operator == '~':
+        pattern = re.escape(expected).replace('%', '.*')
+        return value is not None and re.fullmatch(pattern, str(value), re.IGNORECASE) is not None
+
+    if value is None:
+        return operator == '!=' and expected != ''
+
+    try:
+        left, right = float(value), float(expected)
+    except (TypeError, ValueError):
+        left, right = str(value), expected
+
+    return {
+        '=': left == right,
+        '!=': left != right,
+        '<': left < right,
+        '>': left > right,
+        '<=': left <= right,
+        '>=': left >= right
+    }[operator]
+
+
+def parsePredicate(text):
+    """Compile the parenthesised part of a field grammar term into a function of one value"""
+    alternatives = []
+    for alternative in splitTopLevel(unwrap(text), '|'):
+        conditions = []
+        for condition in splitTopLevel(unwrap(alternative), '&'):
+            match = CONDITION.match(unwrap(condition))
+            if match is None:
+                raise ValueError(f'Invalid field grammar condition: {condition}')
+            operator, expected = match.groups()
+            conditions.append((operator, expected.strip().strip('"')))
+        alternatives.append(conditions)
+
+    return lambda value: any(all(compare(value, op, expected) for op, expected in conditions) for conditions in alternatives)
+
+
+def parseFields(fields):
+    """Parse an IFB field grammar string into [(name, sort, predicate)]
+
+    Supports comma separated names with an optional `:<` / `:>` sort and a
+    parenthesised predicate of =, !=, <, >, <=, >= and ~ conditions joined
+    by | and &. Terms are written name:sort(predicate), the order of the
+    IFB v8 field grammar documentation (e.g. id:<(>"1000")); a sort after
+    the predicate raises ValueError.
+    """
+    terms = []
+    for term in splitTopLevel(fields, ','):
+        term = term.strip()
+        if not term:
+            continue
+
+        name, _, rest = term.partition('(')
+        predicate = f'({rest}' if rest else None
+        sort = None
+
+        if ':' in name:
+            name, sort = name.split(':', 1)
+            if sort not in ('<', '>'):
+                raise ValueError(f'Invalid field grammar sort: {term}')
+        if predicate is not None and not predicate.endswith(')'):
+            raise ValueError(f'Invalid field grammar term, the sort goes before the predicate: {term}')
+
+        terms.append((name.strip(), sort, parsePredicate(predicate) if predicate else None))
+    return terms
+
+
+class FakeZerionServer:
+    """In-process stand-in for the iFormBuilder v8 and DFA zcrypt/v1.0 APIs
+
+    Routes are generated from the IFB and DFA resource tables and every
+    resource is backed by an in-memory collection. It implements the OAuth
+    token endpoints, offset/limit pagination with a Total-Count header, the
+    basic field grammar, ETags, injected 429 responses and a fixed latency
+    per request.
+
+        with FakeZerionServer(latency=0.005) as server:
+            server.seed('profiles/1/pages/2/records', [{'name': 'a'}])
+            ifb = IFB('fake', 'key', 'secret', {'base_url': server.base_url})
+    """
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, rate_limit_every=0, retry_after=0, max_limit=1000):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.max_limit = max_limit
+        self.request_count = 0
+        self.collections = {}
+        self.tokens = set()
+        self.__ids = itertools.count(1000)
+        self.__lock = threading.RLock()
+        self.__ifb_routes = compileResources(IFB)
+        self.__dfa_routes = compileResources(DFA)
+        self.__httpd = ThreadingHTTPServer((host, port), self.__handler())
+        self.__httpd.daemon_threads = True
+        self.__thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.__httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.__httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__httpd.shutdown()
+        self.__httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def nextId(self):
+        return next(self.__ids)
+
+    def seed(self, path, items):
+        """Add items to the collection at path, e.g. 'profiles/1/pages/2/records', and return their ids"""
+        with self.__lock:
+            return [self.__create(path.strip('/'), dict(item), 'records' in path)['id'] for item in items]
+
+    def getCollection(self, path):
+        return self.collections.setdefault(path.strip('/'), {})
+
+    def __create(self, path, item, is_record=False, id_key='id'):
+        collection = self.getCollection(path)
+        if id_key == '_id':
+            item[id_key] = secrets.token_hex(12)
+        else:
+            item[id_key] = self.nextId()
+
+        if is_record:
+            now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            item.setdefault('created_date', now)
+            item.setdefault('modified_date', now)
+            item.setdefault('version', 1)
+
+        collection[item[id_key]] = item
+        return item
+
+    def __handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self, 'GET')
+
+            def do_POST(self):
+                server.handle(self, 'POST')
+
+            def do_PUT(self):
+                server.handle(self, 'PUT')
+
+            def do_DELETE(self):
+                server.handle(self, 'DELETE')
+
+        return Handler
+
+    def __send(self, handler, status, payload=None, headers={}):
+        body = b'' if payload is None else json.dumps(payload).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+
+        if handler.command == 'GET' and status == 200 and handler.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+
+        if 'gzip' in handler.headers.get('Accept-Encoding', '') and len(body) > 1024:
+            body = gzip.compress(body, compresslevel=1)
+            headers = dict(headers, **{'Content-Encoding': 'gzip'})
+
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        if handler.command == 'GET' and status in (200, 304):
+            handler.send_header('ETag', etag)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def __readBody(self, handler):
+        length = int(handler.headers.get('Content-Length') or 0)
+        if handler.headers.get('Transfer-Encoding') == 'chunked':
+            raw = b''
+            while (size := int(handler.rfile.readline().strip() or b'0', 16)) > 0:
+                raw += handler.rfile.read(size)
+                handler.rfile.readline()
+            handler.rfile.readline()
+        else:
+            raw = handler.rfile.read(length)
+
+        if handler.headers.get('Content-Encoding') == 'gzip':
+            raw = gzip.decompress(raw)
+        return raw
+
+    def handle(self, handler, method):
+        raw = self.__readBody(handler)
+
+        with self.__lock:
+            self.request_count += 1
+            count = self.request_count
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.rate_limit_every and count % self.rate_limit_every == 0:
+            return self.__send(handler, 429, {'error': 'Too Many Requests'}, {'Retry-After': str(self.retry_after)})
+
+        url = urlsplit(handler.path)
+        path = unquote(url.path)
+
+        if method == 'POST' and (path == '/oauth2/token' or path.endswith('/oauth/token')):
+            form = parse_qs(raw.decode())
+            if form.get('grant_type') != ['urn:ietf:params:oauth:grant-type:jwt-bearer'] or not form.get('assertion'):
+                return self.__send(handler, 400, {'error': 'invalid_grant'})
+            token = secrets.token_hex(16)
+            self.tokens.add(token)
+            return self.__send(handler, 200, {'access_token': token, 'token_type': 'bearer', 'expires_in': 3600})
+
+        if handler.headers.get('Authorization', '').replace('Bearer ', '') not in self.tokens:
+            return self.__send(handler, 401, {'error': 'invalid_token'})
+
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            return self.__send(handler, 400, {'error': 'Invalid JSON body'})
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if (match := IFB_PREFIX.match(path)) is not None:
+            return self.__route(handler, method, match['path'], self.__ifb_routes, body, query, 'id')
+        if (match := DFA_PREFIX.match(path)) is not None:
+            return self.__handleDFA(handler, method, match['path'], body)
+
+        return self.__send(handler, 404, {'error': 'Not Found'})
+
+    def __route(self, handler, method, path, routes, body, query, id_key):
+        for name, methods, pattern in routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+
+            if method not in methods:
+                return self.__send(handler, 405, {'error': f'{method} is not allowed for {name}'})
+
+            collection_path, item_id = match.group(1), match.groups()[-1]
+            with self.__lock:
+                try:
+                    return self.__dispatch(handler, method, collection_path, item_id, body, query, id_key, name == 'Records')
+                except ValueError as e:
+                    return self.__send(handler, 400, {'error': str(e)})
+
+        return self.__send(handler, 404, {'error': 'Not Found'})
+
+    def __select(self, collection, query):
+        items = list(collection.values())
+        terms = parseFields(query.get('fields', ''))
+
+        for name, sort, predicate in terms:
+            if predicate is not None:
+                items = [item for item in items if predicate(item.get(name))]
+
+        for name, sort, predicate in reversed(terms):
+            if sort is not None:
+                items.sort(key=lambda item: (item.get(name) is None, item.get(name)), reverse=sort == '>')
+
+        return items, [name for name, sort, predicate in terms]
+
+    def __project(self, item, names, id_key):
+        if not names:
+            return {key: item[key] for key in (id_key, 'name') if key in item}
+        projected = {id_key: item[id_key]}
+        projected.update({name: item.get(name) for name in names})
+        return projected
+
+    def __dispatch(self, handler, method, path, item_id, body, query, id_key, is_record):
+        collection = self.getCollection(path)
+
+        if item_id is not None:
+            key = int(item_id) if item_id.isdigit() else item_id
+            item = collection.get(key)
+            if item is None:
+                return self.__send(handler, 404, {'error': 'Not Found'})
+
+            if method == 'GET':
+                names = [name for name, sort, predicate in parseFields(query.get('fields', ''))]
+                return self.__send(handler, 200, self.__project(item, names, id_key) if names else item)
+            if method == 'PUT':
+                item.update({k: v for k, v in (body or {}).items() if k != id_key})
+                if is_record:
+                    item['modified_date'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+                    item['version'] = item.get('version', 1) + 1
+                return self.__send(handler, 200, {id_key: key})
+            if method == 'DELETE':
+                del collection[key]
+                return self.__send(handler, 200, {id_key: key})
+            return self.__send(handler, 405, {'error': 'Method Not Allowed'})
+
+        if method == 'POST':
+            if isinstance(body, list):
+                return self.__send(handler, 201, [{id_key: self.__create(path, dict(item), is_record, id_key)[id_key]} for item in body])
+            return self.__send(handler, 201, {id_key: self.__create(path, dict(body or {}), is_record, id_key)[id_key]})
+
+        items, names = self.__select(collection, query)
+        total = len(items)
+        offset = int(query.get('offset', 0))
+        limit = min(int(query.get('limit', 100)), self.max_limit)
+        page = items[offset:offset + limit]
+
+        if method == 'GET':
+            return self.__send(handler, 200, [self.__project(item, names, id_key) for item in page], {'Total-Count': str(total)})
+
+        if method == 'PUT':
+            updated = []
+            for change in body if isinstance(body, list) else [dict(body or {}, **{id_key: item[id_key]}) for item in page]:
+                item = collection.get(change.get(id_key))
+                if item is not None:
+                    item.update({k: v for k, v in change.items() if k != id_key})
+                    if is_record:
+                        item['modified_date'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+                        item['version'] = item.get('version', 1) + 1
+                    updated.append({id_key: item[id_key]})
+            return self.__send(handler, 200, updated)
+
+        if method == 'DELETE':
+            for item in page:
+                del collection[item[id_key]]
+            return self.__send(handler, 200, [{id_key: item[id_key]} for item in page])
+
+    def __handleDFA(self, handler, method, path, body):
+        segments = path.strip('/').split('/')
+
+        with self.__lock:
+            if segments[:2] == ['dataflows', 'count'] and method == 'GET':
+                name = '/'.join(segments[2:])
+                count = sum(1 for dataflow in self.getCollection('dataflows').values() if dataflow.get('name') == name)
+                return self.__send(handler, 200, {'count': count})
+
+            if segments == ['dataflows', 'import'] and method == 'POST':
+                dataflow = json.loads(body['content'])
+                dataflow.pop('_id', None)
+                return self.__send(handler, 200, {'dataflowId': self.__create('dataflows', dataflow, id_key='_id')['_id']})
+
+            if len(segments) == 3 and segments[0] == 'dataflows' and segments[2] == 'export' and method == 'POST':
+                dataflow = self.getCollection('dataflows').get(segments[1])
+                if dataflow is None:
+                    return self.__send(handler, 404, {'error': 'Not Found'})
+                return self.__send(handler, 200, dict(dataflow))
+
+        return self.__route(handler, method, path, self.__dfa_routes, body, {}, '_id')
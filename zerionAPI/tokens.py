@@ -0,0 +1,212 @@
+import os
+import time
+import json
+import hashlib
+import tempfile
+import threading
+import contextlib
+import jwt
+from .transport import createSession
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class TokenProvider:
+    """Lazily acquires and refreshes an access token for one app on one server
+
+    Nothing is requested until the first call to getToken(). A fresh token is
+    fetched again refresh_margin seconds before it expires, in a background
+    thread when background_refresh is set. With a cache_dir the token is also
+    stored on disk under a file lock, keyed by token URL and client key, so
+    several processes share one token instead of each minting their own.
+    A failed token request is retried on a later getToken() call, after a
+    cooldown that doubles with each failure from retry_backoff up to
+    max_retry_backoff seconds.
+    """
+    __shared = {}
+    __shared_lock = threading.Lock()
+
+    def __init__(self, url, client_key, client_secret, *, session=None, cache_dir=None,
+                 lifetime=3300, refresh_margin=300, background_refresh=True, timeout=(5, 5),
+                 retry_backoff=1, max_retry_backoff=60):
+        self.__url = url
+        self.__client_key = client_key
+        self.__client_secret = client_secret
+        self.__session = session if session is not None else createSession()
+        self.__cache_dir = cache_dir
+        self.__lifetime = lifetime
+        self.__refresh_margin = refresh_margin
+        self.__background_refresh = background_refresh
+        self.__timeout = timeout
+        self.__retry_backoff = retry_backoff
+        self.__max_retry_backoff = max_retry_backoff
+        self.__access_token = None
+        self.__expiration = None
+        self.__failures = 0
+        self.__retry_at = 0
+        self.__timer = None
+        self.__lock = threading.RLock()
+
+        if cache_dir is not None:
+            key = hashlib.sha256(f'{url}|{client_key}'.encode()).hexdigest()[:32]
+            self.__cache_path = os.path.join(cache_dir, f'zerion-token-{key}.json')
+        else:
+            self.__cache_path = None
+
+    @classmethod
+    def getShared(cls, url, client_key, client_secret, **kwargs):
+        """Return the provider every client in this process uses for these credentials and settings
+
+        Every keyword argument is part of the sharing key, so clients with a
+        different cache_dir, background_refresh or session get their own
+        provider. Without a session the provider sends its token requests
+        through a pooled session of its own.
+        """
+        key = (url, client_key, hashlib.sha256(client_secret.encode()).hexdigest(), tuple(sorted(kwargs.items())))
+        with cls.__shared_lock:
+            provider = cls.__shared.get(key)
+            if provider is None:
+                provider = cls(url, client_key, client_secret, **kwargs)
+                cls.__shared[key] = provider
+            return provider
+
+    def getURL(self):
+        return self.__url
+
+    def getSession(self):
+        return self.__session
+
+    def peek(self):
+        """Return the current (token, expiration) without any network or disk access"""
+        return self.__access_token, self.__expiration
+
+    def __isFresh(self, expiration):
+        return expiration is not None and time.time() < expiration - self.__refresh_margin
+
+    def getToken(self):
+        """Return a valid access token, fetching one if needed
+        Returns None if the token request failed, a new request is only made once its cooldown has passed
+        """
+        with self.__lock:
+            if self.__access_token is not None and time.time() < self.__expiration:
+                return self.__access_token
+
+            if time.time() < self.__retry_at:
+                return None
+
+            return self.refresh(force=False)
+
+    def renew(self, rejected):
+        """Replace a token the server rejected, unless another thread already did"""
+        with self.__lock:
+            if self.__access_token is not None and self.__access_token != rejected and time.time() < self.__expiration:
+                return self.__access_token
+            return self.refresh()
+
+    def refresh(self, force=True):
+        """Fetch a new token, or adopt a fresher one another process wrote to the cache"""
+        with self.__lock, self.__fileLock():
+            if not force or self.__cache_path is not None:
+                token, expiration = self.__readCache()
+                if token is not None and self.__isFresh(expiration) and (not force or token != self.__access_token):
+                    self.__setToken(token, expiration)
+                    return token
+
+            try:
+                token, expiration = self.__requestToken()
+            except Exception as e:
+                print(f'Exception: {e}')
+                self.__retry_at = time.time() + min(self.__max_retry_backoff, self.__retry_backoff * 2 ** self.__failures)
+                self.__failures += 1
+                return None
+
+            self.__setToken(token, expiration)
+            self.__writeCache(token, expiration)
+            return token
+
+    def invalidate(self):
+        with self.__lock:
+            self.__access_token = None
+            self.__expiration = None
+            self.__failures = 0
+            self.__retry_at = 0
+            if self.__timer is not None:
+                self.__timer.cancel()
+
+    def __requestToken(self):
+        jwt_payload = {
+            'iss': self.__client_key,
+            'aud': self.__url,
+            'iat': time.time(),
+            'exp': time.time() + 300
+        }
+
+        encoded_jwt = jwt.encode(
+            jwt_payload, self.__client_secret, algorithm='HS256')
+        token_body = {
+            'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer',
+            'assertion': encoded_jwt
+        }
+
+        result = self.__session.post(self.__url, data=token_body, timeout=self.__timeout,
+                      headers={'Content-Type': 'application/x-www-form-urlencoded', 'Authorization': None})
+        result.raise_for_status()
+
+        return result.json()['access_token'], time.time() + self.__lifetime
+
+    def __setToken(self, token, expiration):
+        self.__access_token = token
+        self.__expiration = expiration
+        self.__failures = 0
+        self.__retry_at = 0
+
+        if self.__background_refresh:
+            if self.__timer is not None:
+                self.__timer.cancel()
+            self.__timer = threading.Timer(max(0, expiration - self.__refresh_margin - time.time()), self.refresh)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    @contextlib.contextmanager
+    def __fileLock(self):
+        if self.__cache_path is None or fcntl is None:
+            yield
+            return
+
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        with open(f'{self.__cache_path}.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __readCache(self):
+        if self.__cache_path is None:
+            return None, None
+
+        try:
+            with open(self.__cache_path) as f:
+                cached = json.load(f)
+            return cached['access_token'], cached['expiration']
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def __writeCache(self, token, expiration):
+        if self.__cache_path is None:
+            return
+
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.__cache_dir)
+        try:
+            os.chmod(path, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'access_token': token, 'expiration': expiration}, f)
+            os.replace(path, self.__cache_path)
+        except OSError as e:
+            print(f'Exception: {e}')
+            with contextlib.suppress(OSError):
+                os.remove(path)
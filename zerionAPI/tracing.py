@@ -0,0 +1,87 @@
+import time
+import queue
+import random
+import logging
+import threading
+import logging.handlers
+from collections import deque
+
+logger = logging.getLogger('zerionAPI.trace')
+
+
+class Tracer:
+    """Keeps summaries of a sample of requests in a bounded ring buffer
+
+    sample_rate is the fraction of requests traced, between 0 and 1. Traced
+    requests are also logged to the `zerionAPI.trace` logger at DEBUG level,
+    which costs nothing unless the application enabled that logger.
+    """
+    def __init__(self, sample_rate=1.0, buffer_size=1000):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate must be between 0 and 1')
+
+        self.__sample_rate = sample_rate
+        self.__traces = deque(maxlen=buffer_size)
+        self.__lock = threading.Lock()
+
+    def __sampled(self):
+        return self.__sample_rate >= 1 or random.random() < self.__sample_rate
+
+    def __record(self, trace):
+        with self.__lock:
+            self.__traces.append(trace)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%(method)s %(url)s %(status_code)s %(elapsed).3fs %(bytes_in)s bytes', trace)
+
+    def onResponse(self, method, url, result):
+        if self.__sampled():
+            self.__record({
+                'time': time.time(),
+                'method': method,
+                'url': url,
+                'status_code': result.status_code,
+                'elapsed': result.elapsed.total_seconds(),
+                'bytes_in': len(result.content),
+                'error': None
+            })
+
+    def onError(self, method, url, error):
+        if self.__sampled():
+            self.__record({
+                'time': time.time(),
+                'method': method,
+                'url': url,
+                'status_code': None,
+                'elapsed': 0.0,
+                'bytes_in': 0,
+                'error': repr(error)
+            })
+
+    def getTraces(self, limit=None):
+        """Return the most recent traces, oldest first"""
+        with self.__lock:
+            traces = list(self.__traces)
+        return traces if limit is None else traces[-limit:]
+
+    def clear(self):
+        with self.__lock:
+            self.__traces.clear()
+
+
+def enableQueueLogging(handler, level=logging.DEBUG, name='zerionAPI'):
+    """Send the library's log records to handler from a background thread
+
+    Request threads only put records on an in-memory queue, so slow handlers
+    such as files or network sinks never block a request. Returns the
+    started QueueListener; call its stop() method to flush before exiting.
+    """
+    records = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+
+    target = logging.getLogger(name)
+    target.addHandler(logging.handlers.QueueHandler(records))
+    target.setLevel(level)
+
+    listener.start()
+    return listener
@@ -0,0 +1,63 @@
+import socket
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+ACCEPT_ENCODING = 'gzip, deflate'
+
+
+def getSocketOptions(idle=60, interval=15, count=4):
+    """TCP keep-alive socket options, using the per-connection timers where the platform has them"""
+    options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+    for name, value in (('TCP_KEEPIDLE', idle), ('TCP_KEEPINTVL', interval), ('TCP_KEEPCNT', count)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+
+    return options
+
+
+class PoolAdapter(HTTPAdapter):
+    """HTTPAdapter that can enable TCP keep-alive on pooled connections"""
+    def __init__(self, *args, socket_options=None, **kwargs):
+        self.__socket_options = socket_options
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.__socket_options is not None:
+            kwargs['socket_options'] = self.__socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def getPoolSize(params={}):
+    """Connections kept per host, the pool_maxsize param or enough for batch_workers threads"""
+    return params.get('pool_maxsize', max(10, params.get('batch_workers', 10)))
+
+
+def createSession(params={}):
+    """Build the pooled requests.Session used for all traffic of one client
+
+    Reads pool_connections, pool_maxsize, pool_block, keep_alive and
+    tcp_keepalive from params.
+    """
+    session = requests.Session()
+    session.headers.update({'Content-Type': 'application/json', 'Accept-Encoding': ACCEPT_ENCODING})
+
+    if not params.get('keep_alive', True):
+        session.headers.update({'Connection': 'close'})
+
+    adapter = PoolAdapter(
+        pool_connections=params.get('pool_connections', 10),
+        pool_maxsize=getPoolSize(params),
+        pool_block=params.get('pool_block', False),
+        socket_options=getSocketOptions() if params.get('tcp_keepalive', False) else None
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def getTimeout(params={}):
+    """(connect, read) timeout tuple from the connect_timeout and read_timeout params"""
+    return (params.get('connect_timeout', 10), params.get('read_timeout', 120))